@@ -0,0 +1,320 @@
+
+import math
+
+import numpy as np
+
+from artist import Artist
+from colormap import getColormap
+
+def clipSegments(segments, width, height):
+    """
+    Clip line segments to the rectangle from (0, 0) to (width, height) with
+    the Liang-Barsky algorithm, for all the segments at once.
+
+    segments is a numpy array of shape (n, 4), where each row holds the end
+    points (sx, sy, ex, ey) of one segment. Return an array of the same form
+    with the parts of the segments that are inside the rectangle; segments
+    that are entirely outside of it are dropped. Any columns after the
+    first four are kept as they are, so they can tell which segment is
+    which.
+    """
+
+    (sx, sy, ex, ey) = segments.T[:4]
+    dx = ex - sx
+    dy = ey - sy
+
+    start = np.zeros(len(segments))
+    end = np.ones(len(segments))
+    outside = np.zeros(len(segments), dtype=bool)
+
+    # For each edge, p is how fast the segment moves out of the rectangle
+    # and q is how far inside of the edge it starts
+    for (p, q) in ((-dx, sx), (dx, width - sx), (-dy, sy), (dy, height - sy)):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = q / p
+        outside |= (p == 0) & (q < 0)
+        start = np.where(p < 0, np.maximum(start, t), start)
+        end = np.where(p > 0, np.minimum(end, t), end)
+
+    keep = ~outside & (start <= end)
+    (start, end) = (start[keep], end[keep])
+    (sx, sy, dx, dy) = (sx[keep], sy[keep], dx[keep], dy[keep])
+    return np.column_stack((sx + start * dx, sy + start * dy, sx + end * dx, sy + end * dy,
+                            segments[keep, 4:]))
+
+def accumulateLines(points, width, height, antialiased=False, grid=None):
+    """
+    Rasterize lines into an accumulation grid, and return the grid.
+
+    points is a numpy array of shape (k, 2) of (x, y) coordinates in pixels,
+    with (0, 0) at the corner of pixel [0, 0] of the grid. Consecutive
+    points are joined by a line, and a row that contains NaN ends the
+    current line, like for the canvas' drawPolyline(). A point that is not
+    joined to any other point is counted on its own.
+
+    The grid is a numpy array of floats of shape (height, width), with row 0
+    at y = 0. Every pixel that a line passes through is increased by 1, so
+    the grid counts how many lines go through each pixel; a line that has
+    many points or segments in one pixel still only counts once there. If
+    grid is given, then the lines are added to it.
+
+    The lines are rasterized for all the segments at once: each segment is
+    clipped to the grid and then sampled once per pixel along its longer
+    direction, like Bresenham's algorithm. If antialiased is True, then each
+    sample is split between the two pixels nearest to it across the line,
+    like Wu's algorithm, and a line adds the largest of its weights in a
+    pixel. The samples are then sorted to count each line once per pixel,
+    so the work grows with the number of points and the length of the lines
+    in pixels, not with the number of lines.
+    """
+
+    width = int(width)
+    height = int(height)
+    if grid is None:
+        grid = np.zeros((height, width))
+    if width <= 0 or height <= 0:
+        return grid
+
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) == 0:
+        return grid
+
+    finite = np.all(np.isfinite(points), axis=1)
+    joined = finite[:-1] & finite[1:]
+
+    # Each line is numbered by the number of gaps before it
+    lineIds = np.cumsum(~finite)
+
+    # The points that do not start a segment are counted on their own, so
+    # that the last point of each line, and points that are not joined to
+    # anything, are drawn. Each segment covers its start but not its end.
+    single = finite & ~np.concatenate((joined, [False]))
+    (singleLines, single) = (lineIds[single], points[single])
+
+    segments = np.column_stack((points[:-1][joined], points[1:][joined], lineIds[:-1][joined]))
+    segments = clipSegments(segments.reshape(-1, 5), width, height)
+
+    (sx, sy, ex, ey, segmentLines) = segments.T
+    dx = ex - sx
+    dy = ey - sy
+    steps = np.maximum(np.ceil(np.maximum(np.abs(dx), np.abs(dy))), 1).astype(np.intp)
+
+    # The samples of all the segments, end to end
+    owner = np.repeat(np.arange(len(segments)), steps)
+    starts = np.cumsum(steps) - steps
+    t = (np.arange(len(owner)) - starts[owner]) / steps[owner].astype(float)
+
+    x = np.concatenate((sx[owner] + t * dx[owner], single[:, 0]))
+    y = np.concatenate((sy[owner] + t * dy[owner], single[:, 1]))
+    lines = np.concatenate((segmentLines[owner], singleLines))
+
+    if not antialiased:
+        _count(grid, np.floor(x), np.floor(y), lines, None)
+        return grid
+
+    # Split each sample between the two pixel centers on either side of it,
+    # across the line: vertically for lines that are more horizontal, and
+    # horizontally for the rest
+    steep = np.concatenate(((np.abs(dy) > np.abs(dx))[owner], np.zeros(len(single), dtype=bool)))
+    across = np.where(steep, x, y) - 0.5
+    low = np.floor(across)
+    fraction = across - low
+    along = np.floor(np.where(steep, y, x))
+
+    columns = np.concatenate((np.where(steep, low, along), np.where(steep, low + 1, along)))
+    rows = np.concatenate((np.where(steep, along, low), np.where(steep, along, low + 1)))
+    _count(grid, columns, rows, np.concatenate((lines, lines)), np.concatenate((1 - fraction, fraction)))
+    return grid
+
+def _count(grid, columns, rows, lines, weights):
+    """
+    Add weights (or 1 if weights is None) to grid at the pixels (rows,
+    columns), leaving out the pixels that are outside of the grid. Each
+    line, numbered by lines, is only counted once in a pixel, with the
+    largest of its weights there.
+    """
+
+    (height, width) = grid.shape
+    size = width * height
+    inside = (columns >= 0) & (columns < width) & (rows >= 0) & (rows < height)
+    index = (rows[inside] * width + columns[inside]).astype(np.int64)
+    if len(index) == 0:
+        return
+
+    # Sort the samples by line and then by pixel, and keep one per run
+    keys = lines[inside].astype(np.int64) * size + index
+    order = np.argsort(keys, kind='mergesort')
+    keys = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+    if weights is not None:
+        weights = np.maximum.reduceat(weights[inside][order], starts)
+    grid += np.bincount((keys[starts] % size).astype(np.intp), weights, minlength=size).reshape(height, width)
+
+
+class Accumulation(Artist):
+    """
+    Draw the lines of a plot's data as a single image, by counting how many
+    lines go through each pixel of the axes region and coloring the counts
+    with a Colormap.
+
+    This is used by CartesianPlot when its data rendering is 'accumulate'
+    (see CartesianPlot.setDataRendering()). Thousands of overlapping series
+    then show where they are dense instead of being drawn over each other,
+    and drawing them costs one canvas item whatever the number of series.
+
+    The lines are taken from every visible DataPair, in the plot coordinates
+    that the DataPair would draw, and from every DataArtist that has lines
+    to accumulate, such as a LineCollection; see DataPair.linePoints(). A
+    DataPair whose lines are hidden is counted as points. Markers are not
+    drawn.
+
+    The counts are cached until the lines or the size of the axes region
+    change, and the image until the counts or the coloring change.
+    """
+
+    def __init__(self, canvas, plot, colormap='viridis', scale='log', antialiased=False, **kwprops):
+        """
+        **Constructor**
+
+        plot
+            The CartesianPlot whose data is accumulated.
+
+        colormap
+            A Colormap, or the name of one, to color the counts with. Pixels
+            that no line goes through are left transparent.
+
+        scale
+            How counts are mapped to colors, either 'linear' or 'log'.
+
+        antialiased
+            Whether the lines are antialiased; see accumulateLines().
+        """
+
+        Artist.__init__(self, canvas, **kwprops)
+
+        self._plot = plot
+        self._colormap = getColormap(colormap)
+        self._antialiased = bool(antialiased)
+
+        # Each cache holds its key together with the result, so that it can
+        # be used from the thread that prepares the Figure
+        self._grid = None    # (key, grid)
+        self._image = None   # (key, image)
+
+        self.setScale(scale)
+
+    def setColormap(self, colormap):
+        """
+        Set the Colormap. colormap can be a Colormap instance or the name of
+        one.
+        """
+        self._colormap = getColormap(colormap)
+
+    def colormap(self):
+        """Return the Colormap instance."""
+        return self._colormap
+
+    def setScale(self, scale):
+        """
+        Set how counts are mapped to colors, either 'linear' or 'log'. Raise
+        a ValueError for anything else.
+        """
+        if scale not in ('linear', 'log'):
+            raise ValueError("scale must be 'linear' or 'log', not %r" % (scale,))
+        self._scale = scale
+
+    def scale(self):
+        return self._scale
+
+    def setAntialiased(self, antialiased=True):
+        """Set whether the lines are antialiased."""
+        self._antialiased = bool(antialiased)
+
+    def antialiased(self):
+        return self._antialiased
+
+    def sources(self, prepared={}):
+        """
+        Return the list of the DataPairs and DataArtists of the plot whose
+        lines are accumulated. See Accumulation.grid() for prepared.
+        """
+
+        sources = [dp for dp in self._plot._datapairs if dp.isVisible()]
+        sources += [artist for artist in self._plot._dataArtists
+                    if artist.linePoints(*artist.preparedAxes(prepared)) is not None]
+        return sources
+
+    def grid(self, prepared={}):
+        """
+        Return the counts as a numpy array of shape (height, width), with one
+        entry per pixel of the axes region and row 0 at the bottom.
+
+        The lines are mapped with the snapshots of the axes in prepared, if
+        there are any; see Axis.prepareMapping().
+        """
+
+        (ox, oy, w, h) = self._plot.axesRegion()
+        width = max(int(math.ceil(w)), 0)
+        height = max(int(math.ceil(h)), 0)
+
+        # The sources cache their lines, so the same arrays come back until
+        # the data or the axes change
+        lines = [source.linePoints(*source.preparedAxes(prepared)) for source in self.sources(prepared)]
+        key = (width, height, self._antialiased)
+        cached = self._grid
+        if cached is not None and key == cached[0][0] and len(lines) == len(cached[0][1]) \
+                and all(a is b for (a, b) in zip(lines, cached[0][1])):
+            return cached[1]
+
+        grid = np.zeros((height, width))
+        for points in lines:
+            if points is not None:
+                accumulateLines(points, width, height, self._antialiased, grid)
+
+        self._grid = ((key, lines), grid)
+        return grid
+
+    def image(self, prepared={}):
+        """
+        Return the counts colored with the Colormap as a 2-D numpy array of
+        32-bit 0xAARRGGBB colors with the top row first, or None if there is
+        nothing to draw. See Accumulation.grid() for prepared.
+        """
+
+        grid = self.grid(prepared)
+        key = (grid, self._colormap, self._scale)
+        cached = self._image
+        if cached is not None and all(a is b for (a, b) in zip(key, cached[0])):
+            return cached[1]
+
+        image = None
+        if grid.size > 0 and grid.max() > 0:
+            values = np.where(grid > 0, grid, np.nan)
+            if self._scale == 'log':
+                values = np.log1p(values)
+            image = self._colormap.argb(values[::-1], np.nanmin(values), np.nanmax(values))
+
+        self._image = (key, image)
+        return image
+
+    def prepare(self, prepared):
+        """
+        Count the lines and color the counts for the current axes, and store
+        the image in the prepared dictionary.
+        """
+        prepared[self] = self.image(prepared)
+
+    def _draw(self, prepared=None):
+        if prepared is not None and self in prepared:
+            image = prepared[self]
+        else:
+            image = self.image()
+
+        if image is None:
+            return None
+
+        (height, width) = image.shape
+        region = self._plot.axesRegion()
+        return self.canvas().drawImage(0, 0, width, height, region[0], region[1], image=image,
+                                       clipPath=region, item=self._oldItem())
@@ -61,6 +61,7 @@ class Artist(PObject, Parent):
 
         self._canvas = canvas
         self._item = None
+        self._group = None
         self._clipPath = None
 
         self.setOrigin()
@@ -197,12 +198,29 @@ class Artist(PObject, Parent):
         visible, this method calls _draw. If subclassing Artist,
         drawing should be done entirely in _draw(), and draw()
         should not be overridden.
+
+        The drawing is done inside a canvas frame, so any Artists drawn by
+        _draw() do not repaint the canvas; it is repainted once, when the
+        outermost draw() is done.
+
+        The items from the last draw are not removed before _draw() is
+        called. _draw() can pass them to the canvas (see _oldItem()) to be
+        updated in place, and only the ones it does not return again are
+        removed afterwards.
         """
 
-        self.remove()
-        if self.isVisible():
-            self._item = self._draw(*args, **kwargs)
-            self.canvas().update()
+        canvas = self.canvas()
+        canvas.beginFrame()
+        try:
+            if self.isVisible():
+                old = self._item
+                self._item = self._draw(*args, **kwargs)
+                self._removeItems(old, keep=self._item)
+                canvas.update()
+            else:
+                self.remove()
+        finally:
+            canvas.endFrame()
 
     def _draw(self, *args, **kwargs):
         """
@@ -211,20 +229,60 @@ class Artist(PObject, Parent):
         """
         pass
 
-    def remove(self):
+    def canvasGroup(self):
         """
-        Remove this Artist from the canvas, but do not delete the Artist.
+        Return the canvas group that this Artist draws its children into,
+        making it the first time this is called. See
+        Qt4PySideCanvas.makeGroup().
         """
-        
-        if self._item is not None:
+        if self._group is None:
+            self._group = self.canvas().makeGroup()
+        return self._group
+
+    def _oldItem(self, i=0):
+        """
+        Return the i-th canvas item that this Artist was last drawn with, or
+        None. _draw() passes it to the canvas, so that the item is updated in
+        place instead of being made again.
+        """
+
+        item = self._item
+        if isinstance(item, list) or isinstance(item, tuple):
+            if i < len(item):
+                return item[i]
+            return None
+        if i == 0:
+            return item
+        return None
+
+    def _removeItems(self, item, keep=None):
+        """
+        Remove item, or each item in it if it is a list or tuple, from the
+        canvas, except for the ones that are also in keep.
+        """
+
+        if item is None:
+            return
+        if not (isinstance(item, list) or isinstance(item, tuple)):
+            item = [item]
+        if keep is None:
+            keep = []
+        elif not (isinstance(keep, list) or isinstance(keep, tuple)):
+            keep = [keep]
+
+        for i in item:
+            if i is None or any(i is k for k in keep):
+                continue
             try:
-                if isinstance(self._item, list) or isinstance(self._item, tuple):
-                    for i in self._item:
-                        self.canvas().remove(i)
-                else:
-                    self.canvas().remove(self._item)
+                self.canvas().remove(i)
             except:
                 # Don't worry if it cannot be deleted; it probably doesn't exist anymore
                 pass
 
+    def remove(self):
+        """
+        Remove this Artist from the canvas, but do not delete the Artist.
+        """
+        self._removeItems(self._item)
+
 
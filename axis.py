@@ -1,6 +1,9 @@
 
+import copy
 import math
 
+import numpy as np
+
 from artist import Artist
 from line import Line
 from text import Text
@@ -8,6 +11,33 @@ from font import Font
 from ticker import *
 from base import Parent
 
+def symlogTransform(values, base, linearThreshold):
+    """
+    Apply the symmetric log transform to values, which can be a number or a
+    numpy array.
+
+    Values between -linearThreshold and linearThreshold are scaled linearly
+    to between -1 and 1. Beyond that, each factor of base adds 1, so the
+    transform is continuous and keeps the sign of its input.
+    """
+
+    values = np.asarray(values, dtype=float)
+    scaled = values / linearThreshold
+    magnitude = np.abs(scaled)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logs = np.sign(scaled) * (1 + np.log(magnitude) / math.log(base))
+        return np.where(magnitude <= 1, scaled, logs)
+
+def symlogInverse(values, base, linearThreshold):
+    """The inverse of symlogTransform()."""
+
+    values = np.asarray(values, dtype=float)
+    magnitude = np.abs(values)
+    with np.errstate(over='ignore', invalid='ignore'):
+        exps = np.sign(values) * np.power(float(base), magnitude - 1)
+        return linearThreshold * np.where(magnitude <= 1, values, exps)
+
+
 class Axis(Line):
     """
     Represent an axis on a Plot.
@@ -19,7 +49,10 @@ class Axis(Line):
     that it represents.
 
     The scaling of an Axis can either be 'linear', 'log', or 'symlog'. If it is 'log'
-    or 'semilog', then logBase is used to specify the log's base.
+    or 'symlog', then logBase is used to specify the log's base. A 'symlog' Axis
+    is linear between -linearThreshold and linearThreshold and logarithmic
+    beyond, so it can show data of both signs that spans many orders of
+    magnitude; see symlogTransform().
 
     The orientation of an Axis can either be 'horizontal' or 'vertical'.
 
@@ -49,7 +82,7 @@ class Axis(Line):
     if Axis objects are slaved such that Axis1->Axis2->Axis1 occur.
     """
 
-    def __init__(self, canvas, plot, orientation='horizontal', inside='up', scaling='linear', logBase=10, **kwprops):
+    def __init__(self, canvas, plot, orientation='horizontal', inside='up', scaling='linear', logBase=10, linearThreshold=1.0, **kwprops):
 
         # Need to define the label before init'ing the Line. This is because we
         # override Line.setOrigin to include the label, but setOrigin is called
@@ -88,9 +121,8 @@ class Axis(Line):
         self._autoscaled = True  # holds whether this Axis is currently being autoscaled to the data
 
         # Setup the major and minor ticks
-        self._majorTicks = Ticks(self.canvas(), self, 'major', labeler=FormatLabeler())
-        self._minorTicks = Ticks(self.canvas(), self, 'minor', labeler=NullLabeler())
-        self._minorTicks.setLocator(num=3)
+        self._majorTicks = Ticks(self.canvas(), self, 'major', locator=AutoLocator(), labeler=FormatLabeler())
+        self._minorTicks = Ticks(self.canvas(), self, 'minor', locator=AutoLocator(), labeler=NullLabeler())
         self._minorTicks.setLength(3)
         self._minorTicks._labelProps.update(visible=False)
 
@@ -112,7 +144,9 @@ class Axis(Line):
         # Scaling value. Can be 'linear', 'log', or 'symlog'
         self._scaling = None
         self._logBase = 10
-        self.setScaling(scaling, logBase=logBase)
+        self._linearThreshold = 1.0
+        self._symlogKey = None
+        self.setScaling(scaling, logBase=logBase, linearThreshold=linearThreshold)
 
     def setOrigin(self, x=0, y=0):
         """
@@ -141,11 +175,13 @@ class Axis(Line):
 
         For a logarithmic scaling, the algorithm performed is the same as for linear
         scaling, except that it is done with the logarithms of ds, de, and value.
+        For a symlog scaling, it is done with symlogTransform() of them.
         """
 
-        # TODO need to take care of symlog
-
-        if self.scaling() == 'linear':
+        if self.scaling() == 'symlog':
+            ds, dl = self._scaledDataRange()
+            value = symlogTransform(value, self.logBase(), self._linearThreshold)
+        elif self.scaling() == 'linear':
             ds = self._dataStart
             dl = self._dataLength
         elif self.scaling() == 'log':
@@ -173,31 +209,186 @@ class Axis(Line):
             val = 0
         return val
 
-# THIS IS NOT USED, MAYBE WE CAN JUST GET RID OF IT
-#    def mapPlotToData(self, value):
-#        """
-#        Convert value from plot coordinates to data coordinates. If the axis has
-#        no length (probably because it has not yet been attached to a Plot),
-#        then this will always return 0.
-#
-#        The algorithm performed is:
-#
-#        | ds = dataStart
-#        | de = dataEnd
-#        | dl = de - ds = dataLength
-#        | ps = plotStart
-#        | pe = plotEnd
-#        | pl = pe - ps = plotLength
-#
-#        return = ds + dl * (value - ps) / pl
-#        """
-#
-#        try:
-#            val = self._dataStart + self._dataLength * \
-#                    (float(value) - self._plotStart) / self._plotLength
-#        except ZeroDivisionError:
-#            val = 0
-#        return val
+    def mapDataArrayToPlot(self, values):
+        """
+        Vectorized version of mapDataToPlot. values can be any sequence of
+        numbers, and a numpy array of plot coordinates is returned.
+
+        Values that cannot be mapped (such as non-positive values on a log
+        Axis) are returned as NaN instead of raising an error.
+        """
+
+        values = np.asarray(values, dtype=float)
+        ds, dl = self._scaledDataRange()
+
+        if dl == 0:
+            return np.zeros(values.shape)
+
+        if self.scaling() == 'log':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.log(values) / math.log(self.logBase())
+                values[~np.isfinite(values)] = np.nan
+        elif self.scaling() == 'symlog':
+            values = symlogTransform(values, self.logBase(), self._linearThreshold)
+
+        return self._plotStart + self._plotLength * (values - ds) / dl
+
+    def mapPlotToData(self, value):
+        """
+        Convert value from plot coordinates to data coordinates. This is the
+        inverse of mapDataToPlot. If the axis has no length (probably because
+        it has not yet been attached to a Plot), then this will always return
+        the start of the data range.
+
+        For a linear scaling, the algorithm performed is:
+
+        | ds = dataStart
+        | de = dataEnd
+        | dl = de - ds = dataLength
+        | ps = plotStart
+        | pe = plotEnd
+        | pl = pe - ps = plotLength
+        | return = ds + dl * (value - ps) / pl
+
+        For a logarithmic scaling, the same is done in log space, and then
+        logBase is raised to the result. For a symlog scaling, symlogInverse()
+        is applied to the result.
+        """
+
+        ds, dl = self._scaledDataRange()
+
+        try:
+            val = ds + dl * (float(value) - self._plotStart) / self._plotLength
+        except ZeroDivisionError:
+            val = ds
+
+        if self.scaling() == 'log':
+            val = pow(self.logBase(), val)
+        elif self.scaling() == 'symlog':
+            val = float(symlogInverse(val, self.logBase(), self._linearThreshold))
+        return val
+
+    def mapPlotArrayToData(self, values):
+        """
+        Vectorized version of mapPlotToData. values can be any sequence of
+        numbers, and a numpy array of data coordinates is returned.
+        """
+
+        values = np.asarray(values, dtype=float)
+        ds, dl = self._scaledDataRange()
+
+        if self._plotLength == 0:
+            return np.zeros(values.shape) + ds
+
+        values = ds + dl * (values - self._plotStart) / self._plotLength
+
+        if self.scaling() == 'log':
+            values = np.power(float(self.logBase()), values)
+        elif self.scaling() == 'symlog':
+            values = symlogInverse(values, self.logBase(), self._linearThreshold)
+        return values
+
+    def mappingKey(self):
+        """
+        Return a tuple that identifies how this Axis maps data coordinates to
+        plot coordinates. Two calls return equal tuples if and only if
+        mapDataArrayToPlot() would map the same values to the same plot
+        coordinates in between, so it can be used as a cache key.
+        """
+        return (self._dataStart, self._dataEnd, self._scaling, self._logBase, self._linearThreshold,
+                self._plotStart, self._plotEnd)
+
+    def snapshot(self):
+        """
+        Return a copy of this Axis that maps data to plot coordinates the way
+        this Axis does now, and that does not change when this Axis does. The
+        copy is not slaved to any Axis and has no slaves, so its data range
+        can be set on its own.
+
+        A snapshot is only meant for mapping data, such as while a Figure is
+        prepared outside the GUI thread (see Axis.prepareMapping()). It must
+        not be drawn.
+        """
+
+        snapshot = copy.copy(self)
+        snapshot._slavedTo = None
+        snapshot._masterOf = []
+        return snapshot
+
+    def prepareMapping(self, prepared):
+        """
+        Return a snapshot of this Axis (see Axis.snapshot()) with the data
+        range it will have when the data in prepared is drawn, and store it
+        in prepared under this Axis.
+
+        If this Axis is autoscaled, then the snapshot is autoscaled instead
+        of this Axis, and if it is slaved, the snapshot has the data range of
+        the master's snapshot. Nothing is changed on this Axis, so this can
+        be run outside the GUI thread. Axis.applyMapping() sets the data
+        range found here, in the GUI thread.
+        """
+
+        if self in prepared:
+            return prepared[self]
+
+        snapshot = self.snapshot()
+        if self._slavedTo is not None:
+            master = self._slavedTo.prepareMapping(prepared)
+            snapshot.setDataRange(*master.dataRange(), autoscaled=master.autoscaled())
+        elif self._autoscaled:
+            snapshot.setDataRange(*self.autoscaledRange(), autoscaled=True)
+
+        prepared[self] = snapshot
+        return snapshot
+
+    def applyMapping(self, prepared):
+        """
+        Set the data range that Axis.prepareMapping() found for this Axis, if
+        the Axis is still autoscaled and is not slaved (a slave gets the data
+        range from its master). This must be called in the GUI thread.
+        """
+
+        snapshot = prepared.get(self)
+        if snapshot is None or self._slavedTo is not None:
+            return
+        if self._autoscaled and snapshot.autoscaled():
+            self.setDataRange(*snapshot.dataRange(), autoscaled=True)
+
+    def mappingMatches(self, prepared):
+        """
+        Return whether this Axis maps data the same way as its snapshot in
+        prepared, so that data prepared with the snapshot can be drawn on it.
+        This is False if the Axis was zoomed, panned or resized since the
+        snapshot was taken.
+        """
+
+        snapshot = prepared.get(self)
+        return snapshot is not None and snapshot.mappingKey() == self.mappingKey()
+
+    def _scaledDataRange(self):
+        """
+        Return (start, length) of the data range after the Axis scaling has
+        been applied to it. For a log scaling, a non-positive start or end
+        is clamped to 1e-7 so that the range can still be mapped. For a
+        symlog scaling, the result is cached until the data range or the
+        scaling changes.
+        """
+
+        if self.scaling() == 'symlog':
+            key = (self._dataStart, self._dataEnd, self._logBase, self._linearThreshold)
+            if key != self._symlogKey:
+                (ds, de) = symlogTransform([self._dataStart, self._dataEnd], self._logBase,
+                                           self._linearThreshold)
+                self._symlogRange = (float(ds), float(de - ds))
+                self._symlogKey = key
+            return self._symlogRange
+
+        if self.scaling() == 'log':
+            base = self.logBase()
+            ds = math.log(max(self._dataStart, 1e-7), base)
+            de = math.log(max(self._dataEnd, 1e-7), base)
+            return ds, de - ds
+        return self._dataStart, self._dataLength
 
     def slaveTo(self, other):
         """
@@ -233,7 +424,7 @@ class Axis(Line):
             if ret:
                 # Now that we have slaved, initialize the data range and scaling
                 self.setDataRange(other._dataStart, other._dataEnd, True, other._autoscaled)
-                self.setScaling(other.scaling(), other.logBase(), True)
+                self.setScaling(other.scaling(), other.logBase(), True, other.linearThreshold())
             else:
                 # The other Axis did not add this axis to its _masterOf list for some reason,
                 # then we need to revert what we have already done
@@ -288,6 +479,12 @@ class Axis(Line):
         """Return the log base of the Axis."""
         return self._logBase
 
+    def linearThreshold(self):
+        """
+        Return the value below which, in magnitude, a symlog Axis is linear.
+        """
+        return self._linearThreshold
+
     def setOrientation(self, o):
         """
         Set the orientation of this Axis. Valid values are 'horizontal' and 'vertical'.
@@ -341,7 +538,7 @@ class Axis(Line):
         self._majorTicks.determineAxisPosition()
         self._minorTicks.determineAxisPosition()
 
-    def setScaling(self, s, logBase=10, fromMaster=False):
+    def setScaling(self, s, logBase=10, fromMaster=False, linearThreshold=None):
         """
         Set the scaling of the Axis.
         If an invalid value is passed, then nothing happens unless the current
@@ -353,12 +550,17 @@ class Axis(Line):
             Valid values are 'linear', 'log', and 'symlog'.
 
         logBase
-            float value, specifying the base if using a log scaling. Otherwise
-            this value is ignored.
+            float value, specifying the base if using a log or symlog scaling.
+            Otherwise this value is ignored.
 
         fromMaster
             boolean specifying whether this method was called from the Axis'
             master. Users should leave this set to its default.
+
+        linearThreshold
+            positive float value, specifying where a symlog scaling changes
+            from linear to logarithmic. If None, then the current value is
+            kept.
         """
 
         # Do not change the scaling if this axis is slaved, unless
@@ -373,8 +575,11 @@ class Axis(Line):
                 self._scaling = 'linear'
                 self._logBase = logBase
 
+            if isinstance(linearThreshold, (int, float)) and linearThreshold > 0:
+                self._linearThreshold = float(linearThreshold)
+
             for axis in self._masterOf:
-                axis.setScaling(s, logBase, True)
+                axis.setScaling(s, logBase, True, linearThreshold)
 
     def setLog(self, logBase=10):
         """
@@ -389,6 +594,34 @@ class Axis(Line):
         self.setTicksLabeler('major', FormatLabeler('%.2g'), True)
         self.setTicksLabeler('minor', NullLabeler(), True)
 
+    def setSymlog(self, logBase=10, linearThreshold=1.0):
+        """
+        Convenient way to make this axis symmetrically logarithmically scaled.
+
+        Sets the scaling, and the major and minor ticks locators and labelers.
+        """
+
+        self.setScaling('symlog', logBase, linearThreshold=linearThreshold)
+        self.setTicksLocator('major', SymlogLocator(logBase, linearThreshold, [1]), True)
+        self.setTicksLocator('minor', SymlogLocator(logBase, linearThreshold, range(1, int(logBase))), True)
+        self.setTicksLabeler('major', FormatLabeler('%.2g'), True)
+        self.setTicksLabeler('minor', NullLabeler(), True)
+
+    def setTime(self, maxTicks=7):
+        """
+        Convenient way to make this axis show time data, given as seconds
+        since the Unix epoch (UTC). See ticker.epochSeconds() for converting
+        datetimes.
+
+        Sets a linear scaling, a DateLocator and DateLabeler for the major
+        ticks, and no minor ticks.
+        """
+
+        self.setScaling('linear')
+        self.setTicksLocator('major', DateLocator(maxTicks), True)
+        self.setTicksLocator('minor', NullLocator(), True)
+        self.setTicksLabeler('major', DateLabeler(), True)
+        self.setTicksLabeler('minor', NullLabeler(), True)
 
     def setPlotRange(self, anchor, start, end):
         """
@@ -796,39 +1029,50 @@ class Axis(Line):
     def autoscale(self):
         """
         Autoscale the Axis' data range so that it fits all the data attached
-        to the Axis.
+        to the Axis. See Axis.autoscaledRange().
+        """
+
+        self.setDataRange(*self.autoscaledRange(), autoscaled=True)
+
+    def autoscaledRange(self):
+        """
+        Return a 2-tuple of the (start, end) data range that fits all the
+        data attached to the Axis, without setting it.
+
+        The extents are cached by the DataPairs and DataArtists until their
+        data changes, so autoscaling again without changing the data does
+        not scan it.
         """
 
         start = None
         end = None
 
-        datapairs = self._plot._datapairs
+        # DataArtists report their extents the same way DataPairs do, but
+        # may return None if they have no data.
+        dataObjects = self._plot._datapairs + self._plot._dataArtists
 
         # Find the minimum and maximum values attached to this Axis. It is
         # possible that Axis acts as an X axis for some data, and a y axis
         # for other data.
-        for dp in datapairs:
-            if dp._xaxis == self:
-                if start is None:
-                    start = dp.minXValue(True)
-                else:
-                    start = min(start, dp.minXValue(True))
-                
-                if end is None:
-                    end = dp.maxXValue(True)
-                else:
-                    end = max(end, dp.maxXValue(True))
-
-            if dp._yaxis == self:
-                if start is None:
-                    start = dp.minYValue(True)
-                else:
-                    start = min(start, dp.minYValue(True))
-                
-                if end is None:
-                    end = dp.maxYValue(True)
-                else:
-                    end = max(end, dp.maxYValue(True))
+        for dp in dataObjects:
+            values = []
+            if dp.xAxis() == self:
+                values.append(dp.xExtent(True))
+            if dp.yAxis() == self:
+                values.append(dp.yExtent(True))
+
+            for (low, high) in values:
+                if low is not None:
+                    if start is None:
+                        start = low
+                    else:
+                        start = min(start, low)
+
+                if high is not None:
+                    if end is None:
+                        end = high
+                    else:
+                        end = max(end, high)
 
         # If there is no data, then default to a range of [0, 10]
         if start is None:
@@ -836,7 +1080,7 @@ class Axis(Line):
         if end is None:
             end = 10.0
 
-        self.setDataRange(start, end, autoscaled=True)
+        return (start, end)
 
     def setTicksLocator(self, which='major', locator=None, applyToSlaves=False, **kwprops):
         """
@@ -937,17 +1181,36 @@ class Axis(Line):
         elif which == 'minor':
             return self._minorTicks
 
-    def drawTicks(self):
+    def prepare(self, prepared):
+        """
+        Compute the locations and labels of the major and minor Ticks for the
+        data range that the Axis will have when prepared is drawn (see
+        Axis.prepareMapping()), and store them in the prepared dictionary.
+        This does not use the canvas or change the Axis, so it can be run
+        outside the GUI thread.
+        """
+        mapping = self.prepareMapping(prepared)
+        prepared[self._majorTicks] = self._majorTicks.prepare(mapping)
+        prepared[self._minorTicks] = self._minorTicks.prepare(mapping)
+
+    def drawTicks(self, prepared={}):
         """
         Draw all the Ticks, if this Axis is visible.
 
         If some of the Ticks have been set to be invisible,
         then they will not be drawn.
+
+        prepared is a dictionary filled in by Axis.prepare(). If it does not
+        contain the Ticks, then their locations are computed here.
         """
         if self.isVisible():
             # hide minor ticks behind major ticks if they overlap
-            self._minorTicks.draw()
-            self._majorTicks.draw()
+            with self.canvas().group(self.canvasGroup()):
+                self._minorTicks.draw(prepared.get(self._minorTicks))
+                self._majorTicks.draw(prepared.get(self._majorTicks))
+        else:
+            self._minorTicks.removeTicks()
+            self._majorTicks.removeTicks()
 
     def draw(self, *args, **kwargs):
         """
@@ -955,8 +1218,20 @@ class Axis(Line):
 
         Does not draw the Ticks. See Axis.drawTicks() for that.
         """
-        Line.draw(self, *args, **kwargs)
-        self._label.draw(*args, **kwargs)
+        with self.canvas().group(self.canvasGroup()):
+            Line.draw(self, *args, **kwargs)
+            self._label.draw(*args, **kwargs)
+
+    def clear(self):
+        """
+        Remove the Axis line, its label and its Ticks from the canvas. They
+        are all drawn into the Axis' canvas group, so it is removed with one
+        call.
+        """
+        if self._group is None:
+            Line.clear(self)
+        else:
+            self.canvas().removeGroup(self._group)
 
 
 
@@ -1153,28 +1428,25 @@ class Ticks(Parent):
         """
         self._labelProps.update(kwprops)
 
-    def makeTicks(self):
+    def prepare(self, axis=None):
         """
-        Create the individual Tick instances, but do not actually draw them.
+        Compute the locations and labels of the ticks for the current data
+        range of the attached Axis, without creating any Tick instances. If
+        axis is given, such as a snapshot of the attached Axis (see
+        Axis.snapshot()), then its data range is used instead.
 
         If these Ticks are minor ticks, then this method computes the current positions
         of the major ticks (i.e. it does not look up the current major tick locations)
         so that it can space the minor ticks according to the major tick locations.
-        Because of this, Ticks.makeTicks() should be be called for both the major and
-        minor ticks in close succession.
 
-        Because Ticks.draw() calls Ticks.makeTicks(), it should not be necessary for the
-        user to ever call this method.
+        Returns a 2-tuple of (locations, labels) containing only the ticks that
+        are within the data range.
         """
 
-        # Get rid of the current ticks
-        self.removeTicks()
-        self._delTicks()
-        self._ticks = []
-
         # Get the start and end data locations for the attached Axis
-        start = self._axis._dataStart
-        end = self._axis._dataEnd
+        if axis is None:
+            axis = self._axis
+        (start, end) = axis.dataRange()
 
         # Compute the locations of the ticks
         if self._type == 'minor':
@@ -1189,22 +1461,59 @@ class Ticks(Parent):
         # Compute the labels for the ticks
         labels = self._labeler.labels(locations)
 
-        # Create the ticks
-        for loc, lab in zip(locations, labels):
-            # Do not create a tick if it is outside of the plot range to be displayed
-            if (loc < start) or (loc > end):
-                continue
+        # Do not create a tick if it is outside of the plot range to be displayed
+        ticks = [(loc, lab) for loc, lab in zip(locations, labels) if start <= loc <= end]
+        return [loc for loc, lab in ticks], [lab for loc, lab in ticks]
+
+    def makeTicks(self, prepared=None):
+        """
+        Create the individual Tick instances, but do not actually draw them.
+
+        The Tick instances from the last call are moved to the new locations
+        and given the new labels, so that their canvas items are updated in
+        place when they are drawn. Ticks are only created or removed when the
+        number of ticks changes.
 
+        prepared is the (locations, labels) 2-tuple returned by Ticks.prepare().
+        If it is None, then Ticks.prepare() is called here. Because Ticks.prepare()
+        computes the major tick locations for minor ticks, Ticks.makeTicks() should
+        be be called for both the major and minor ticks in close succession.
+
+        Because Ticks.draw() calls Ticks.makeTicks(), it should not be necessary for the
+        user to ever call this method.
+        """
+
+        if prepared is None:
+            prepared = self.prepare()
+        locations, labels = prepared
+
+        # Get rid of the ticks that are not needed anymore
+        n = min(len(locations), len(labels))
+        for tick in self._ticks[n:]:
+            tick.remove()
+            self.delChild(tick)
+        del self._ticks[n:]
+
+        # Update the ticks that are left, and create the rest
+        for i, (loc, lab) in enumerate(zip(locations, labels)):
             self._labelProps.update(text=str(lab))
-            tick = Tick(self.canvas(),
-                        self._axis,
-                        loc,
-                        self._length,
-                        self._direction,
-                        self._tickMarkProps,
-                        self._labelProps)
-            self._ticks.append(tick)
-            self.addChild(tick)
+            if i < len(self._ticks):
+                tick = self._ticks[i]
+                tick.setDataLocation(loc)
+                tick.setLength(self._length)
+                tick.setDirection(self._direction)
+                tick.setTickMarkProps(**self._tickMarkProps)
+                tick.setLabel(**self._labelProps)
+            else:
+                tick = Tick(self.canvas(),
+                            self._axis,
+                            loc,
+                            self._length,
+                            self._direction,
+                            self._tickMarkProps,
+                            self._labelProps)
+                self._ticks.append(tick)
+                self.addChild(tick)
 
     def removeTicks(self):
         """
@@ -1214,16 +1523,20 @@ class Ticks(Parent):
         for tick in self._ticks:
             tick.remove()
 
-    def draw(self):
+    def draw(self, prepared=None):
         """
         Make the individual ticks, and then draw them.
+
+        prepared is passed on to Ticks.makeTicks().
         """
 
         if self.isVisible():
-            self.makeTicks()
+            self.makeTicks(prepared)
             for tick in self._ticks:
                 tick.setTickPosition()
                 tick.draw()
+        else:
+            self.removeTicks()
 
 class Tick(Parent):
     """
@@ -1286,6 +1599,14 @@ class Tick(Parent):
             kwprops['text'] = text
         self._label.setProps(**kwprops)
 
+    def setDataLocation(self, dataLoc):
+        """Set the data coordinate that this tick is located at."""
+        self._dataLocation = dataLoc
+
+    def dataLocation(self):
+        """Return the data coordinate that this tick is located at."""
+        return self._dataLocation
+
     def setLength(self, length):
         """
         Update the length of the tick mark. The length must be an int.
@@ -0,0 +1,248 @@
+
+import numpy as np
+
+from dataartist import DataArtist
+from colormap import getColormap
+from color import Color
+
+class Bars(DataArtist):
+    """
+    Draw one or more series of bars over a set of categories, either stacked
+    on top of each other or side by side.
+
+    The heights are a 2-D array with one row per series and one column per
+    category. The bottoms of stacked bars are found for all the series at
+    once; positive heights are stacked upwards from 0 and negative heights
+    downwards. All the bars of a series are drawn as a single canvas item, so
+    the number of items drawn does not depend on the number of categories.
+
+    The bars are kept in plot coordinates until the axes or the data change,
+    so redrawing a plot that has not changed does not compute anything.
+
+    ======================  =================   =======
+    Property                Possible Values     Description
+    ======================  =================   =======
+    color                   | Color             The color of the edges of the bars.
+                            | Color format
+    width                   int (1)             The width of the edges of the bars.
+    ======================  =================   =======
+    """
+
+    def __init__(self, canvas, categories, heights, stacked=True, barWidth=0.8, colors=None, xaxis=None, yaxis=None, plot=None, **kwprops):
+        """
+        **Constructor**
+
+        categories
+            A sequence with one entry per category. If the entries are
+            numbers, then they are the x positions of the categories.
+            Otherwise they are labels, and the categories are put at
+            0, 1, 2, ...; see Bars.labels().
+
+        heights
+            A sequence of heights with one entry per category, or a 2-D
+            array of them with one row per series. Heights that are not
+            finite are drawn as 0.
+
+        stacked
+            If True, then the series are stacked on top of each other.
+            Otherwise they are put side by side within each category.
+
+        barWidth
+            The width of the bars of one category, as a fraction of the
+            smallest distance between two categories.
+
+        colors
+            A list with one Color, or Color format, per series. If it is
+            None, then the colors are taken evenly from the viridis
+            Colormap.
+        """
+
+        initialProperties = {'width': 1}
+        initialProperties.update(kwprops)
+
+        DataArtist.__init__(self, canvas, xaxis, yaxis, plot, **initialProperties)
+
+        self._version = 0
+
+        self._stacked = bool(stacked)
+        self._barWidth = 0.8
+        self._colorSpec = colors
+
+        self.setData(categories, heights)
+        self.setBarWidth(barWidth)
+
+    def setData(self, categories, heights):
+        """Set the categories and the heights. See the constructor."""
+
+        heights = np.array(heights, dtype=float, ndmin=2)
+        heights[~np.isfinite(heights)] = 0
+
+        categories = list(categories)
+        try:
+            positions = np.array(categories, dtype=float)
+            labels = None
+        except (TypeError, ValueError):
+            positions = np.arange(len(categories), dtype=float)
+            labels = map(str, categories)
+
+        n = min(len(positions), heights.shape[1])
+        self._positions = positions[:n]
+        self._heights = heights[:, :n]
+        self._labels = labels[:n] if labels is not None else None
+
+        # The distance that the bars of one category can take up
+        self._spacing = 1.0
+        if n > 1:
+            gaps = np.diff(np.sort(self._positions))
+            gaps = gaps[gaps > 0]
+            if len(gaps) > 0:
+                self._spacing = gaps.min()
+
+        self._stack()
+        self.setColors(self._colorSpec)
+
+    def _stack(self):
+        """Find the bottoms and tops of every bar in data coordinates."""
+
+        heights = self._heights
+        if self._stacked:
+            positive = np.cumsum(np.maximum(heights, 0), axis=0)
+            negative = np.cumsum(np.minimum(heights, 0), axis=0)
+            self._tops = np.where(heights >= 0, positive, negative)
+        else:
+            self._tops = heights.copy()
+        self._bottoms = self._tops - heights
+
+        self._version += 1
+
+    def setStacked(self, stacked):
+        """Set whether the series are stacked or side by side."""
+        self._stacked = bool(stacked)
+        self._stack()
+
+    def setBarWidth(self, barWidth):
+        """
+        Set the width of the bars of one category, as a fraction of the
+        smallest distance between two categories.
+        """
+        if isinstance(barWidth, (int, float)) and barWidth > 0:
+            self._barWidth = float(barWidth)
+            self._version += 1
+
+    def setColors(self, colors=None):
+        """Set the colors of the series. See the constructor."""
+
+        self._colorSpec = colors
+        m = self.numSeries()
+        if colors is None:
+            colormap = getColormap('viridis')
+            if m == 1:
+                self._colors = [Color('blue')]
+            else:
+                self._colors = [colormap.color(i, 0, m - 1) for i in range(m)]
+        else:
+            colors = [Color(color) for color in colors]
+            self._colors = [colors[i % len(colors)] for i in range(m)]
+
+    def colors(self):
+        """Return the list of the Colors of the series."""
+        return self._colors
+
+    def numSeries(self):
+        """Return the number of series."""
+        return self._heights.shape[0]
+
+    def positions(self):
+        """Return the numpy array of the x positions of the categories."""
+        return self._positions
+
+    def labels(self):
+        """
+        Return the list of the labels of the categories, or None if the
+        categories were given as positions.
+        """
+        return self._labels
+
+    def dataExtent(self):
+        if len(self._positions) == 0:
+            return None
+
+        half = self._spacing * self._barWidth / 2.0
+        bottom = min(self._bottoms.min(), self._tops.min())
+        top = max(self._bottoms.max(), self._tops.max())
+
+        yaxis = self.yAxis()
+        if yaxis is not None and yaxis.scaling() == 'log':
+            positive = self._tops[self._tops > 0]
+            if len(positive) == 0:
+                return None
+            bottom = positive.min() / yaxis.logBase()
+
+        return (self._positions.min() - half, self._positions.max() + half, bottom, top)
+
+    def bars(self, xaxis=None, yaxis=None):
+        """
+        Return the bars that can be seen as a list with one entry per
+        series. Each entry is a numpy array of shape (n, 4), where each row
+        holds the corners (sx, sy, ex, ey) of one bar in plot coordinates.
+
+        xaxis and yaxis are the axes to map with, if not the axes of this
+        DataArtist; see DataArtist.preparedAxes().
+        """
+        return self.compute(xaxis, yaxis)
+
+    def cacheKey(self, xaxis, yaxis):
+        return DataArtist.cacheKey(self, xaxis, yaxis) + (self._version,)
+
+    def _compute(self, xaxis, yaxis):
+        m = self.numSeries()
+        if len(self._positions) == 0:
+            return [np.zeros((0, 4))] * m
+
+        # The left and right edges of every bar, one row per series
+        width = self._spacing * self._barWidth
+        left = self._positions - width / 2.0
+        if self._stacked:
+            left = np.tile(left, (m, 1))
+            right = left + width
+        else:
+            width /= m
+            left = left[np.newaxis, :] + width * np.arange(m)[:, np.newaxis]
+            right = left + width
+
+        shape = left.shape
+        left = xaxis.mapDataArrayToPlot(left.ravel()).reshape(shape)
+        right = xaxis.mapDataArrayToPlot(right.ravel()).reshape(shape)
+        bottom = yaxis.mapDataArrayToPlot(self._bottoms.ravel()).reshape(shape)
+        top = yaxis.mapDataArrayToPlot(self._tops.ravel()).reshape(shape)
+
+        # On a log Axis, 0 cannot be mapped, so those bars start at the bottom
+        bottom[np.isnan(bottom)] = yaxis._plotStart
+
+        # Drop the empty bars and the bars outside of the x Axis, and keep
+        # the rest from reaching far past the edges of the axes
+        with np.errstate(invalid='ignore'):
+            keep = (self._heights != 0) & (right >= xaxis._plotStart) & (left <= xaxis._plotEnd) \
+                    & np.isfinite(left + right + top)
+
+        rects = np.empty(shape + (4,))
+        rects[..., 0] = np.clip(left, xaxis._plotStart - 1, xaxis._plotEnd + 1)
+        rects[..., 1] = np.clip(bottom, yaxis._plotStart - 1, yaxis._plotEnd + 1)
+        rects[..., 2] = np.clip(right, xaxis._plotStart - 1, xaxis._plotEnd + 1)
+        rects[..., 3] = np.clip(top, yaxis._plotStart - 1, yaxis._plotEnd + 1)
+
+        return [rects[i][keep[i]] for i in range(m)]
+
+    def _draw(self, prepared=None):
+        series = self.preparedResult(prepared)
+        region = self.plot().axesRegion()
+
+        props = dict(self.props())
+        items = []
+        for (rects, color) in zip(series, self._colors):
+            if len(rects) == 0:
+                continue
+            props.update(fillcolor=color)
+            items.append(self.canvas().drawRects(rects, region[0], region[1], clipPath=region,
+                                                 item=self._oldItem(len(items)), **props))
+        return items
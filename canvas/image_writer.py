@@ -0,0 +1,235 @@
+
+
+import struct
+import zlib
+
+import numpy as np
+
+
+class ImageWriter(object):
+    """
+    Abstract class for writing an RGBA image to a file one strip of rows at a
+    time, so that the whole image never has to be held in memory.
+
+    Writing a strip is split into ImageWriter.encode(), which does the
+    expensive work and can be run in any thread, and
+    ImageWriter.writeEncoded(), which must be called with the encoded strips
+    in order, from top to bottom.
+    """
+
+    def __init__(self, filename, width, height):
+        """
+        **Constructor**
+
+        filename
+            The file to write to. It can also be an open file object.
+
+        width, height
+            The size of the image, in pixels.
+        """
+
+        if isinstance(filename, basestring):
+            self._file = open(filename, 'wb')
+            self._ownsFile = True
+        else:
+            self._file = filename
+            self._ownsFile = False
+
+        self._width = int(width)
+        self._height = int(height)
+        self._rowsWritten = 0
+
+    def encode(self, rows):
+        """
+        Encode a strip of rows. rows is a numpy uint8 array of shape
+        (nRows, width, 4) holding RGBA values. Must be overwritten in the
+        subclass.
+        """
+        pass
+
+    def writeEncoded(self, encoded):
+        """
+        Write a strip returned by ImageWriter.encode(). Must be overwritten
+        in the subclass.
+        """
+        pass
+
+    def write(self, rows):
+        """Encode and write a strip of rows."""
+        self.writeEncoded(self.encode(rows))
+
+    def close(self):
+        """Finish the file and close it if it was opened by this writer."""
+        if self._ownsFile:
+            self._file.close()
+
+
+class PngWriter(ImageWriter):
+    """
+    Write an 8-bit RGBA PNG file strip by strip.
+
+    Each strip is deflated on its own, ending on a byte boundary, so strips
+    can be compressed in parallel and concatenated into a single zlib
+    stream. Each strip is written as its own IDAT chunk.
+    """
+
+    def __init__(self, filename, width, height, level=6):
+        ImageWriter.__init__(self, filename, width, height)
+
+        self._level = level
+        self._adler = 1
+
+        self._file.write('\x89PNG\r\n\x1a\n')
+        self._writeChunk('IHDR', struct.pack('>IIBBBBB', self._width, self._height, 8, 6, 0, 0, 0))
+
+        # zlib header for the deflate stream that is spread over the IDAT chunks
+        self._writeChunk('IDAT', '\x78\x9c')
+
+    def _writeChunk(self, kind, data):
+        self._file.write(struct.pack('>I', len(data)))
+        self._file.write(kind)
+        self._file.write(data)
+        self._file.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    def encode(self, rows):
+        """
+        Return (adler32, length, number of rows, compressed data) for a strip
+        of rows.
+        Every row gets the PNG 'None' filter.
+        """
+
+        (n, width, depth) = rows.shape
+        filtered = np.zeros((n, width * depth + 1), np.uint8)
+        filtered[:, 1:] = rows.reshape(n, width * depth)
+        raw = filtered.tostring()
+
+        compressor = zlib.compressobj(self._level, zlib.DEFLATED, -15)
+        data = compressor.compress(raw) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        return (zlib.adler32(raw, 1) & 0xffffffff, len(raw), n, data)
+
+    def writeEncoded(self, encoded):
+        (adler, length, n, data) = encoded
+        self._adler = _adler32Combine(self._adler, adler, length)
+        self._rowsWritten += n
+        self._writeChunk('IDAT', data)
+
+    def close(self):
+        # End the deflate stream with an empty final block, then the checksum
+        final = zlib.compressobj(self._level, zlib.DEFLATED, -15).flush(zlib.Z_FINISH)
+        self._writeChunk('IDAT', final + struct.pack('>I', self._adler))
+        self._writeChunk('IEND', '')
+        ImageWriter.close(self)
+
+
+class TiffWriter(ImageWriter):
+    """
+    Write an uncompressed 8-bit RGBA TIFF file strip by strip.
+
+    Because the strips are not compressed, their sizes and offsets are known
+    before any of them is written, so the header is written first and the file
+    does not need to be seekable.
+    """
+
+    def __init__(self, filename, width, height, rowsPerStrip=256):
+        ImageWriter.__init__(self, filename, width, height)
+
+        rowBytes = self._width * 4
+        nStrips = max((self._height + rowsPerStrip - 1) // rowsPerStrip, 1)
+        counts = [rowsPerStrip * rowBytes] * nStrips
+        counts[-1] = (self._height - rowsPerStrip * (nStrips - 1)) * rowBytes
+
+        nEntries = 11
+        ifdOffset = 8
+        bitsOffset = ifdOffset + 2 + 12 * nEntries + 4
+        offsetsOffset = bitsOffset + 8
+        countsOffset = offsetsOffset + 4 * nStrips
+        dataOffset = countsOffset + 4 * nStrips
+
+        offsets = []
+        for count in counts:
+            offsets.append(dataOffset)
+            dataOffset += count
+
+        # Arrays of a single LONG are stored in the entry itself
+        if nStrips == 1:
+            offsetsField = offsets[0]
+            countsField = counts[0]
+        else:
+            offsetsField = offsetsOffset
+            countsField = countsOffset
+
+        SHORT = 3
+        LONG = 4
+        entries = [(256, LONG, 1, self._width),         # ImageWidth
+                   (257, LONG, 1, self._height),        # ImageLength
+                   (258, SHORT, 4, bitsOffset),         # BitsPerSample
+                   (259, SHORT, 1, 1),                  # Compression: none
+                   (262, SHORT, 1, 2),                  # PhotometricInterpretation: RGB
+                   (273, LONG, nStrips, offsetsField),  # StripOffsets
+                   (277, SHORT, 1, 4),                  # SamplesPerPixel
+                   (278, LONG, 1, rowsPerStrip),        # RowsPerStrip
+                   (279, LONG, nStrips, countsField),   # StripByteCounts
+                   (284, SHORT, 1, 1),                  # PlanarConfiguration: chunky
+                   (338, SHORT, 1, 2),                  # ExtraSamples: unassociated alpha
+                  ]
+
+        f = self._file
+        f.write(struct.pack('<2sHI', 'II', 42, ifdOffset))
+        f.write(struct.pack('<H', nEntries))
+        for (tag, kind, count, value) in entries:
+            if kind == SHORT and count == 1:
+                f.write(struct.pack('<HHIHH', tag, kind, count, value, 0))
+            else:
+                f.write(struct.pack('<HHII', tag, kind, count, value))
+        f.write(struct.pack('<I', 0))
+        f.write(struct.pack('<4H', 8, 8, 8, 8))
+        if nStrips > 1:
+            f.write(struct.pack('<%dI' % nStrips, *offsets))
+            f.write(struct.pack('<%dI' % nStrips, *counts))
+
+    def encode(self, rows):
+        return rows.tostring()
+
+    def writeEncoded(self, encoded):
+        # The strips in the file do not have to line up with the strips that
+        # are passed in, since the rows are stored one after another.
+        self._file.write(encoded)
+        self._rowsWritten += len(encoded) // (self._width * 4)
+
+
+def openImageWriter(filename, width, height, rowsPerStrip=256):
+    """
+    Return an ImageWriter for filename, chosen by its extension, or None if
+    the format cannot be written in strips.
+    """
+
+    extension = filename.split('.')[-1].lower()
+    if extension == 'png':
+        return PngWriter(filename, width, height)
+    elif extension in ('tif', 'tiff'):
+        return TiffWriter(filename, width, height, rowsPerStrip)
+    return None
+
+def _adler32Combine(adler1, adler2, length2):
+    """
+    Return the Adler-32 checksum of two pieces of data joined together, given
+    the checksum of each piece and the length of the second piece. This is
+    the same as zlib's adler32_combine.
+    """
+
+    BASE = 65521
+    rem = length2 % BASE
+    sum1 = adler1 & 0xffff
+    sum2 = (rem * sum1) % BASE
+    sum1 += (adler2 & 0xffff) + BASE - 1
+    sum2 += ((adler1 >> 16) & 0xffff) + ((adler2 >> 16) & 0xffff) + BASE - rem
+    if sum1 >= BASE:
+        sum1 -= BASE
+    if sum1 >= BASE:
+        sum1 -= BASE
+    if sum2 >= (BASE << 1):
+        sum2 -= (BASE << 1)
+    if sum2 >= BASE:
+        sum2 -= BASE
+    return sum1 | (sum2 << 16)
@@ -1,8 +1,17 @@
 
 from PySide.QtGui import *
-from PySide.QtCore import Qt, QPointF, Signal
+from PySide.QtCore import Qt, QObject, QPointF, QRectF, QTimer, Signal, QByteArray, QDataStream
+
+from multiprocessing.pool import ThreadPool
+from contextlib import contextmanager
+import weakref
+import struct
+
+import numpy as np
 
 from base_canvas import BaseCanvas
+from image_writer import openImageWriter
+from recording_canvas import _encode
 
 
 
@@ -98,12 +107,273 @@ class GraphicsPolygonItem(QGraphicsPolygonItem):
             painter.setClipRect(*self._clipPath)
         QGraphicsPolygonItem.paint(self, painter, option, widget)
 
+class GraphicsPathItem(QGraphicsPathItem):
+    """
+    A QGraphicsPathItem that has a clip path.
+    """
+
+    def __init__(self, *args):
+        self._clipPath = None
+        QGraphicsPathItem.__init__(self, *args)
+
+    def setClipRect(self, clipPath=None):
+        self._clipPath = clipPath
+
+    def paint(self, painter, option, widget=0):
+        if self._clipPath is not None:
+            painter.setClipRect(*self._clipPath)
+        QGraphicsPathItem.paint(self, painter, option, widget)
+
+class AliasedGraphicsPathItem(GraphicsPathItem):
+    """
+    A GraphicsPathItem that will always be drawn non-antialiased.
+    """
+
+    def __init__(self, *args):
+        GraphicsPathItem.__init__(self, *args)
+
+    def paint(self, painter, option, widget=0):
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing, False)
+        GraphicsPathItem.paint(self, painter, option, widget)
+
+class GraphicsImageItem(QGraphicsItem):
+    """
+    An item that draws an image, scaled to fill a rectangle, with a clip path.
+
+    The image is a 2-D numpy array of 32-bit 0xAARRGGBB colors. It is wrapped
+    in a QImage without being copied, so the item keeps a reference to the
+    array for as long as the QImage is used.
+    """
+
+    def __init__(self, array, rect):
+        QGraphicsItem.__init__(self)
+        self._clipPath = None
+        self._rect = rect
+        self._wrap(array)
+
+    def _wrap(self, array):
+        self._array = np.ascontiguousarray(array, dtype=np.uint32)
+        (height, width) = self._array.shape
+        self._image = QImage(self._array.data, width, height, width * 4, QImage.Format_ARGB32)
+
+    def setImage(self, array, rect):
+        """Draw array instead, scaled to fill rect."""
+        if rect != self._rect:
+            self.prepareGeometryChange()
+            self._rect = rect
+        if array is not self._array:
+            self._wrap(array)
+        self.update()
+
+    def setClipRect(self, clipPath=None):
+        self._clipPath = clipPath
+
+    def boundingRect(self):
+        return self._rect
+
+    def paint(self, painter, option, widget=0):
+        if self._clipPath is not None:
+            painter.setClipRect(*self._clipPath)
+        painter.drawImage(self._rect, self._image)
+
+class GraphicsGroupItem(QGraphicsItem):
+    """
+    An item that draws nothing itself, and holds other items as its children.
+    Removing or hiding the group removes or hides all of them at once.
+
+    Unlike a QGraphicsItemGroup, it does not recompute its bounding rect or
+    remap the transform of each item that is put in it.
+    """
+
+    def __init__(self):
+        QGraphicsItem.__init__(self)
+        self.setFlag(QGraphicsItem.ItemHasNoContents)
+
+    def container(self):
+        """Return the item that the items put in this group are children of."""
+        return self
+
+    def boundingRect(self):
+        return QRectF()
+
+    def paint(self, painter, option, widget=0):
+        pass
+
+class LayerScene(QGraphicsScene):
+    """
+    The private scene that holds the items of a GraphicsLayerItem.
+    """
+
+    def __init__(self, layer):
+        QGraphicsScene.__init__(self)
+        self.setItemIndexMethod(QGraphicsScene.NoIndex)
+        self._layer = weakref.ref(layer)
+
+    def layer(self):
+        """Return the GraphicsLayerItem this scene belongs to."""
+        return self._layer()
+
+class GraphicsLayerItem(GraphicsGroupItem):
+    """
+    A group whose items are painted once into a pixmap, and then drawn from
+    the pixmap until the layer is invalidated.
+
+    The items are kept in a private scene, not in the canvas's scene. When
+    the canvas is rendered to a file, they are painted directly instead of
+    from the pixmap, so that they are not pixelated at higher scales.
+    """
+
+    def __init__(self):
+        GraphicsGroupItem.__init__(self)
+        self.setFlag(QGraphicsItem.ItemHasNoContents, False)
+
+        self._layerScene = LayerScene(self)
+        self._root = GraphicsGroupItem()
+        self._layerScene.addItem(self._root)
+
+        self._pixmap = None
+        self._rect = QRectF()
+        self._rectValid = True
+
+    def container(self):
+        return self._root
+
+    def invalidate(self):
+        """
+        Throw away the pixmap, so that the items are painted again the next
+        time the layer is painted.
+        """
+        if self._pixmap is None and not self._rectValid:
+            return
+        self.prepareGeometryChange()
+        self._pixmap = None
+        self._rectValid = False
+        self.update()
+
+        # A layer in a layer is painted into the outer layer's pixmap
+        if isinstance(self.scene(), LayerScene):
+            self.scene().layer().invalidate()
+
+    def boundingRect(self):
+        if not self._rectValid:
+            self._rect = self._layerScene.itemsBoundingRect()
+            self._rectValid = True
+        return self._rect
+
+    def paint(self, painter, option, widget=0):
+        rect = self.boundingRect()
+        if rect.isEmpty():
+            return
+
+        if not widget:
+            # Rendered to a file
+            self._layerScene.render(painter, rect, rect)
+            return
+
+        if self._pixmap is None:
+            self._pixmapRect = rect.toAlignedRect()
+            self._pixmap = QPixmap(self._pixmapRect.size())
+            self._pixmap.fill(Qt.transparent)
+            pixmapPainter = QPainter(self._pixmap)
+            pixmapPainter.setRenderHints(painter.renderHints())
+            self._layerScene.render(pixmapPainter, QRectF(self._pixmap.rect()), QRectF(self._pixmapRect))
+            pixmapPainter.end()
+
+        painter.drawPixmap(self._pixmapRect.topLeft(), self._pixmap)
+
+
+class GuiInvoker(QObject):
+    """
+    Calls functions in the thread that this object was created in, which is
+    the GUI thread. Emitting a signal from another thread queues the call in
+    the GUI thread's event loop.
+    """
+
+    invoked = Signal(object)
+
+    def __init__(self):
+        QObject.__init__(self)
+        self.invoked.connect(self._call, Qt.QueuedConnection)
+
+    def _call(self, call):
+        (func, args) = call
+        func(*args)
 
 class GraphicsView(QGraphicsView):
+    """
+    A QGraphicsView that reports resizing and mouse navigation as signals.
+
+    All positions in the navigation signals are in scene coordinates.
+    A drag with the left mouse button pans. A drag with the right mouse
+    button, or with the left mouse button while shift is held, selects a
+    region to zoom to.
+    """
+
     viewResized = Signal(int, int)
+    wheelScrolled = Signal(float, float, int)
+    dragStarted = Signal(float, float, bool)
+    dragMoved = Signal(float, float)
+    dragFinished = Signal(float, float)
+
+    def __init__(self, *args):
+        QGraphicsView.__init__(self, *args)
+        self._dragging = False
+        self._snapshot = None
+
+    def setSnapshot(self, pixmap=None):
+        """
+        Show pixmap, scaled to fill the view, instead of the scene. This
+        is used while the view is being resized. If pixmap is None, then
+        the scene is shown again.
+        """
+        self._snapshot = pixmap
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        if self._snapshot is not None:
+            painter = QPainter(self.viewport())
+            painter.setRenderHint(QPainter.SmoothPixmapTransform)
+            painter.drawPixmap(self.viewport().rect(), self._snapshot)
+            painter.end()
+        else:
+            QGraphicsView.paintEvent(self, event)
+
     def resizeEvent(self, event):
         self.viewResized.emit(event.size().width(), event.size().height())
 
+    def wheelEvent(self, event):
+        pos = self.mapToScene(event.pos())
+        self.wheelScrolled.emit(pos.x(), pos.y(), event.delta())
+        event.accept()
+
+    def mousePressEvent(self, event):
+        boxZoom = event.button() == Qt.RightButton or \
+                (event.button() == Qt.LeftButton and event.modifiers() & Qt.ShiftModifier)
+        if event.button() in (Qt.LeftButton, Qt.RightButton):
+            self._dragging = True
+            pos = self.mapToScene(event.pos())
+            self.dragStarted.emit(pos.x(), pos.y(), bool(boxZoom))
+            event.accept()
+        else:
+            QGraphicsView.mousePressEvent(self, event)
+
+    def mouseMoveEvent(self, event):
+        if self._dragging:
+            pos = self.mapToScene(event.pos())
+            self.dragMoved.emit(pos.x(), pos.y())
+            event.accept()
+        else:
+            QGraphicsView.mouseMoveEvent(self, event)
+
+    def mouseReleaseEvent(self, event):
+        if self._dragging:
+            self._dragging = False
+            pos = self.mapToScene(event.pos())
+            self.dragFinished.emit(pos.x(), pos.y())
+            event.accept()
+        else:
+            QGraphicsView.mouseReleaseEvent(self, event)
+
 class Qt4PySideCanvas(BaseCanvas):
     """
     Abstract class representing all the methods a canvas must implement.
@@ -118,14 +388,105 @@ class Qt4PySideCanvas(BaseCanvas):
         self._figure = figure
 
         self._scene = QGraphicsScene(0, 0, width, height)
+
+        # How the scene indexes its items. See setItemIndexMethod() and
+        # setBulkInsert().
+        self._indexMethod = 'bsp'
+        self._bspTreeDepth = 0
+        self._bulkInsert = False
+        self._scene.setItemIndexMethod(self._indexMethods[self._indexMethod])
+        self._scene.setBspTreeDepth(self._bspTreeDepth)
+
+        # Calls to update() while a frame is open are held back until the
+        # outermost frame ends. See beginFrame().
+        self._frameDepth = 0
+        self._frameDirty = False
+        self._bulkDepth = 0     # the depth of the frame that holds back the index, or 0
+
+        # Everything drawn is also passed to the recorder, if there is one.
+        # See setRecorder().
+        self._recorder = None
+        self._recorded = {}   # item -> recorder handle
+
+        # Items are stacked in the order they are drawn, whether they are new
+        # or are updated in place. See _addItem().
+        self._stackCount = 0
+
+        # The groups opened by beginGroup() that have not been ended yet
+        self._groups = []
+
+        # The key of the last drawing call of each item in a cached layer
+        self._layerKeys = {}
+
+        # Used to hand work from background threads to the GUI thread
+        self._invoker = GuiInvoker()
+
+        # Resize events are coalesced, and the figure is only redrawn once
+        # the size has not changed for resizeDelay milliseconds.
+        self._resizeDelay = 150
+        self._pendingSize = None
+        self._resizeTimer = QTimer()
+        self._resizeTimer.setSingleShot(True)
+        self._resizeTimer.timeout.connect(self._resizeSettled)
+
+        # PNG and TIFF images with more pixels than this are saved in strips,
+        # so that the whole image is never held in memory at once.
+        self._tiledSaveThreshold = 4096 * 4096
+
+        # Mouse navigation state
+        self._navigation = True
+        self._zoomFactor = 1.2      # zoom per wheel step
+        self._dragPlot = None       # the Plot being panned or zoomed
+        self._dragStart = None      # (x, y) in figure coords where the drag began
+        self._dragLast = None       # (x, y) in figure coords of the last drag event
+        self._boxZoom = False       # whether the drag selects a region to zoom to
+        self._zoomBox = None        # rubber band item shown while box zooming
+
+        self._view = None
+        self.makeView()
+
+    def makeView(self):
+        """
+        Create a new view of the scene, to show it in a window of its own,
+        and close the old view. plotter.show() does this every time a figure
+        is shown. The scene, everything drawn on it, and the options set on
+        the canvas are kept.
+        """
+
+        if self._view is not None:
+            self._disconnectView()
+            self._view.close()
+
         self._view = GraphicsView(self._scene)
         self._view.setAlignment(Qt.AlignLeft | Qt.AlignTop)
         self._view.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing)
 
         self._view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self._view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        
+
         self._view.viewResized.connect(self.updateFigureSize)
+        self._view.wheelScrolled.connect(self._wheelScrolled)
+        self._view.dragStarted.connect(self._dragStarted)
+        self._view.dragMoved.connect(self._dragMoved)
+        self._view.dragFinished.connect(self._dragFinished)
+
+    def _disconnectView(self):
+        """
+        Disconnect the view's signals from the canvas, so that the view does
+        not call back into the canvas, or keep it alive.
+        """
+
+        connections = ((self._view.viewResized, self.updateFigureSize),
+                       (self._view.wheelScrolled, self._wheelScrolled),
+                       (self._view.dragStarted, self._dragStarted),
+                       (self._view.dragMoved, self._dragMoved),
+                       (self._view.dragFinished, self._dragFinished))
+        for (signal, slot) in connections:
+            try:
+                signal.disconnect(slot)
+            except (RuntimeError, TypeError):
+                # Already disconnected
+                pass
 
     def show(self):
         self._view.show()
@@ -147,17 +508,199 @@ class Qt4PySideCanvas(BaseCanvas):
         fw = self._view.frameWidth()
         self._view.setGeometry(0, 0, width+2*fw, height+2*fw)
 
+    def setResizeDelay(self, delay):
+        """
+        Set how long, in milliseconds, the view size must stay the same
+        before the figure is laid out and redrawn at the new size. Until
+        then, the last drawn image is scaled to fit the view.
+
+        If delay is 0, then the figure is redrawn on every resize event.
+        """
+        if isinstance(delay, int) and delay >= 0:
+            self._resizeDelay = delay
+
+    def resizeDelay(self):
+        """Return the resize delay, in milliseconds."""
+        return self._resizeDelay
+
+    _indexMethods = {'bsp': QGraphicsScene.BspTreeIndex,
+                     'none': QGraphicsScene.NoIndex,
+                    }
+
+    def setItemIndexMethod(self, method='bsp', depth=None):
+        """
+        Set how the scene indexes its items, which it uses to find the items
+        in a region.
+
+        'bsp', the default, keeps the items in a BSP tree, which is best for
+        interactive figures. 'none' keeps no index, so adding and moving
+        items is cheaper, but finding them is slower; it is best for figures
+        that are only drawn and saved.
+
+        depth is the depth of the BSP tree. If it is 0, then Qt chooses the
+        depth from the number of items. If it is None, then the depth is not
+        changed.
+        """
+
+        if method in self._indexMethods:
+            self._indexMethod = method
+            if not self._deferringIndex():
+                self._scene.setItemIndexMethod(self._indexMethods[method])
+
+        if isinstance(depth, int) and depth >= 0:
+            self._bspTreeDepth = depth
+            self._scene.setBspTreeDepth(depth)
+
+    def itemIndexMethod(self):
+        """Return the item index method, 'bsp' or 'none'."""
+        return self._indexMethod
+
+    def bspTreeDepth(self):
+        """Return the depth of the BSP tree, or 0 if Qt chooses it."""
+        return self._scene.bspTreeDepth()
+
+    def setBulkInsert(self, enabled=True):
+        """
+        Set whether the items drawn in a bulk frame are indexed all at once
+        when the frame ends, instead of one at a time as they are added or
+        moved. See beginFrame().
+
+        While a bulk frame is open, the scene keeps no index, and the BSP
+        tree is built again over every item when the frame ends. This is
+        much faster when the frame adds or moves many items, such as when a
+        Figure is drawn, but would not be for a single Artist, so other
+        frames are not affected. It has no effect if the item index method
+        is 'none'.
+        """
+
+        if isinstance(enabled, bool):
+            if self._deferringIndex() and not enabled:
+                self._scene.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+                self._bulkDepth = 0
+            self._bulkInsert = enabled
+
+    def bulkInsert(self):
+        """Return whether bulk insertion is on."""
+        return self._bulkInsert
+
+    def _deferringIndex(self):
+        """Return True if the index is held back until a bulk frame ends."""
+        return self._bulkDepth > 0
+
     def updateFigureSize(self, width, height):
         """
         Update the figure's size to match the new scene rect.
 
         This is called whenever the user manually adjusts the scene's size (i.e.
-        if they adjust the window size).
+        if they adjust the window size). Consecutive calls are coalesced; see
+        setResizeDelay().
+        """
+
+        if self._resizeDelay == 0:
+            self._pendingSize = (width, height)
+            self._resizeSettled()
+            return
+
+        if not self._resizeTimer.isActive():
+            if int(width) == int(self._scene.width()) and int(height) == int(self._scene.height()):
+                return
+
+            # Keep showing what is drawn now, scaled to the new size, until
+            # the resizing settles
+            self._view.setSnapshot(QPixmap.grabWidget(self._view.viewport()))
+
+        self._pendingSize = (width, height)
+        self._resizeTimer.start(self._resizeDelay)
+
+    def _resizeSettled(self):
+        """
+        Lay out and redraw the figure at the last size that was requested.
         """
+
+        self._view.setSnapshot(None)
+
+        if self._pendingSize is None:
+            return
+        (width, height) = self._pendingSize
+        self._pendingSize = None
+
         if self._figure.setSize(width, height, False):
             # There was an actual size change
             self._figure.draw()
 
+    def setNavigation(self, enabled=True, zoomFactor=None):
+        """
+        Set whether the user can zoom and pan the plots with the mouse.
+
+        zoomFactor is how much one step of the mouse wheel zooms by. If it is
+        None, the current factor is kept.
+        """
+
+        self._navigation = bool(enabled)
+        if zoomFactor is not None and zoomFactor > 0:
+            self._zoomFactor = float(zoomFactor)
+
+    def _wheelScrolled(self, x, y, delta):
+        """Zoom the plot under the cursor. One wheel step is 120 units."""
+
+        if not self._navigation:
+            return
+
+        (x, y) = self.canvasToFigure(x, y)
+        plot = self._figure.plotAt(x, y)
+        if plot is not None:
+            plot.zoom(pow(self._zoomFactor, delta / 120.), x, y)
+            plot.updateView()
+
+    def _dragStarted(self, x, y, boxZoom):
+        if not self._navigation:
+            return
+
+        (x, y) = self.canvasToFigure(x, y)
+        self._dragPlot = self._figure.plotAt(x, y)
+        self._dragStart = (x, y)
+        self._dragLast = (x, y)
+        self._boxZoom = boxZoom
+
+    def _dragMoved(self, x, y):
+        if self._dragPlot is None:
+            return
+
+        (x, y) = self.canvasToFigure(x, y)
+
+        if self._boxZoom:
+            # Show the region that will be zoomed to
+            self.remove(self._zoomBox)
+            (sx, sy) = self._dragStart
+            self._zoomBox = self.drawRect(sx, sy, x, y, fillstyle='none')
+        else:
+            (lx, ly) = self._dragLast
+            self._dragPlot.pan(x - lx, y - ly)
+            self._dragPlot.updateView()
+
+        self._dragLast = (x, y)
+
+    def _dragFinished(self, x, y):
+        if self._dragPlot is None:
+            return
+
+        if self._boxZoom:
+            self.remove(self._zoomBox)
+            self._zoomBox = None
+            (x, y) = self.canvasToFigure(x, y)
+            (sx, sy) = self._dragStart
+            self._dragPlot.zoomToRegion(sx, sy, x, y)
+            self._dragPlot.updateView()
+
+        self._dragPlot = None
+
+    def callInGuiThread(self, func, *args):
+        """
+        Call func(*args) in the GUI thread. This may be called from any
+        thread, and returns without waiting for func to run.
+        """
+        self._invoker.invoked.emit((func, args))
+
     def figureToCanvas(self, x, y, ox=0, oy=0):
         """
         Convert from figure coords to canvas coords.
@@ -191,7 +734,7 @@ class Qt4PySideCanvas(BaseCanvas):
         return (x, y)
 
 
-    def drawLine(self, sx, sy, ex, ey, ox=0, oy=0, aliased=False, clipPath=None, **kwargs):
+    def drawLine(self, sx, sy, ex, ey, ox=0, oy=0, aliased=False, clipPath=None, item=None, **kwargs):
         """
         Draw a line from (sx, sy) to (ex, ey).
         The local origin is at (ox, oy).
@@ -206,17 +749,30 @@ class Qt4PySideCanvas(BaseCanvas):
         the clipPath will not be drawn. clipPath can be either None, in which case
         there will be no clipping, or a 4-tuple of the form (x, y, width, height).
         x and y must be in figure coordinates.
+
+        item is an item returned by an earlier drawLine() call. If it is
+        given, then it is moved and restyled instead of making a new item.
         """
 
+        handle = self._record('drawLine', sx, sy, ex, ey, ox, oy, aliased, clipPath, **kwargs)
+        key = self._layerKey('drawLine', (sx, sy, ex, ey, ox, oy, aliased, clipPath), kwargs)
+        if self._unchanged(item, key):
+            return self._addItem(self._reuseItem(item, type(item)), handle, key)
+
         (sx, sy) = self.figureToCanvas(sx, sy, ox, oy)
         (ex, ey) = self.figureToCanvas(ex, ey, ox, oy)
 
         if aliased:
-            line = AliasedGraphicsLineItem(sx, sy, ex, ey)
-            line.setPen(makePen(**kwargs))
+            lineClass = AliasedGraphicsLineItem
+        else:
+            lineClass = GraphicsLineItem
+
+        line = self._reuseItem(item, lineClass)
+        if line is None:
+            line = lineClass(sx, sy, ex, ey)
         else:
-            line = GraphicsLineItem(sx, sy, ex, ey)
-            line.setPen(makePen(**kwargs))
+            line.setLine(sx, sy, ex, ey)
+        line.setPen(makePen(**kwargs))
 
         if clipPath is not None:
             (csx, csy, w, h) = clipPath
@@ -232,42 +788,61 @@ class Qt4PySideCanvas(BaseCanvas):
 
             line.setFlags(QGraphicsItem.ItemClipsToShape)
             line.setClipRect([csx, csy, w, h])
+        elif line is item:
+            line.setFlag(QGraphicsItem.ItemClipsToShape, False)
+            line.setClipRect(None)
 
-        self._scene.addItem(line)
-        return line
+        return self._addItem(line, handle, key)
 
 
 
-    def drawRect(self, sx, sy, ex, ey, ox=0, oy=0, **kwargs):
+    def drawRect(self, sx, sy, ex, ey, ox=0, oy=0, item=None, **kwargs):
         """
         Draw a rectangle with corners (sx, sy) and (ex, ey).
         The local origin is at (ox, oy).
 
         The origin is defined as the bottom left corner, so this will transform
         to the top-left corner to display in Qt4.
+
+        item is an item returned by an earlier drawRect() call; see drawLine().
         """
 
+        handle = self._record('drawRect', sx, sy, ex, ey, ox, oy, **kwargs)
+        key = self._layerKey('drawRect', (sx, sy, ex, ey, ox, oy), kwargs)
+        if self._unchanged(item, key):
+            return self._addItem(self._reuseItem(item, type(item)), handle, key)
+
         (sx, sy) = self.figureToCanvas(sx, sy, ox, oy)
         (ex, ey) = self.figureToCanvas(ex, ey, ox, oy)
 
-        rect = AliasedGraphicsRectItem(sx, sy, ex-sx, ey-sy)
+        rect = self._reuseItem(item, AliasedGraphicsRectItem)
+        if rect is None:
+            rect = AliasedGraphicsRectItem(sx, sy, ex-sx, ey-sy)
+        else:
+            rect.setRect(sx, sy, ex-sx, ey-sy)
         rect.setPen(makePen(**kwargs))
         rect.setBrush(makeBrush(**kwargs))
 
-        self._scene.addItem(rect)
-        return rect
+        return self._addItem(rect, handle, key)
 
 
 
-    def drawCircle(self, cx, cy, r, ox=0, oy=0, **kwargs):
+    def drawCircle(self, cx, cy, r, ox=0, oy=0, item=None, **kwargs):
         """
         Draw a circle centered at (cx, cy) with radius r.
         The local origin is at (ox, oy).
 
         The origin is defined as the bottom left corner, so this will transform
         to the top-left corner to display in Qt4.
+
+        item is an item returned by an earlier drawCircle() call; see drawLine().
         """
 
+        handle = self._record('drawCircle', cx, cy, r, ox, oy, **kwargs)
+        key = self._layerKey('drawCircle', (cx, cy, r, ox, oy), kwargs)
+        if self._unchanged(item, key):
+            return self._addItem(self._reuseItem(item, type(item)), handle, key)
+
         r = int(round(r))
 
         # Qt uses the corner of the circle, not the center.
@@ -276,16 +851,19 @@ class Qt4PySideCanvas(BaseCanvas):
 
         (x, y) = self.figureToCanvas(x, y, ox, oy)
 
-        circle = GraphicsEllipseItem(x, y, 2*r, 2*r)
+        circle = self._reuseItem(item, GraphicsEllipseItem)
+        if circle is None:
+            circle = GraphicsEllipseItem(x, y, 2*r, 2*r)
+        else:
+            circle.setRect(x, y, 2*r, 2*r)
         circle.setPen(makePen(**kwargs))
         circle.setBrush(makeBrush(**kwargs))
 
-        self._scene.addItem(circle)
-        return circle
+        return self._addItem(circle, handle, key)
 
 
 
-    def drawTriangle(self, cx, cy, l, orientation='up', ox=0, oy=0, **kwargs):
+    def drawTriangle(self, cx, cy, l, orientation='up', ox=0, oy=0, item=None, **kwargs):
         """
         Draw an equilateral triangle centered at (cx, cy) and with side length l
         The local origin is at (ox, oy).
@@ -293,8 +871,15 @@ class Qt4PySideCanvas(BaseCanvas):
 
         The origin is defined as the bottom left corner, so this will transform
         to the top-left corner to display in Qt4.
+
+        item is an item returned by an earlier drawTriangle() call; see drawLine().
         """
 
+        handle = self._record('drawTriangle', cx, cy, l, orientation, ox, oy, **kwargs)
+        key = self._layerKey('drawTriangle', (cx, cy, l, orientation, ox, oy), kwargs)
+        if self._unchanged(item, key):
+            return self._addItem(self._reuseItem(item, type(item)), handle, key)
+
         halfHeight = l * 0.866 / 2.
         halfLength = l / 2.
 
@@ -322,15 +907,195 @@ class Qt4PySideCanvas(BaseCanvas):
             triangle.append(QPointF(cx - halfHeight, cy             ))
             triangle.append(QPointF(cx + halfHeight, cy - halfLength))
 
-        polygon = GraphicsPolygonItem(triangle)
+        polygon = self._reuseItem(item, GraphicsPolygonItem)
+        if polygon is None:
+            polygon = GraphicsPolygonItem(triangle)
+        else:
+            polygon.setPolygon(triangle)
         polygon.setPen(makePen(**kwargs))
         polygon.setBrush(makeBrush(**kwargs))
 
-        self._scene.addItem(polygon)
-        return polygon
+        return self._addItem(polygon, handle, key)
+
+
+    def drawRects(self, rects, ox=0, oy=0, clipPath=None, item=None, **kwargs):
+        """
+        Draw many rectangles with the same properties as a single item.
+        The local origin is at (ox, oy).
+
+        rects is a numpy array of shape (n, 4), where each row holds the
+        corners (sx, sy, ex, ey) of one rectangle, like drawRect.
+
+        clipPath and item are the same as for drawLine.
+        """
+
+        handle = self._record('drawRects', rects, ox, oy, clipPath, **kwargs)
+        rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+        key = self._layerKey('drawRects', (rects, ox, oy, clipPath), kwargs)
+        if self._unchanged(item, key):
+            return self._addItem(self._reuseItem(item, type(item)), handle, key)
+
+        # Convert to canvas coordinates all at once, and go around each
+        # rectangle back to its first corner
+        height = self._scene.height()
+        left = np.minimum(rects[:, 0], rects[:, 2]) + ox
+        right = np.maximum(rects[:, 0], rects[:, 2]) + ox
+        top = height - (np.maximum(rects[:, 1], rects[:, 3]) + oy)
+        bottom = height - (np.minimum(rects[:, 1], rects[:, 3]) + oy)
+
+        xs = np.column_stack((left, right, right, left, left))
+        ys = np.column_stack((top, top, bottom, bottom, top))
+        moves = np.zeros(xs.shape, dtype=bool)
+        moves[:, 0] = True
+        path = makePath(xs.ravel(), ys.ravel(), moves.ravel(), Qt.WindingFill)
+
+        return self._addPath(AliasedGraphicsPathItem, path, clipPath, item, handle, key,
+                             makePen(**kwargs), makeBrush(**kwargs))
+
+    def drawPolyline(self, points, ox=0, oy=0, clipPath=None, item=None, **kwargs):
+        """
+        Draw a line through many points as a single item. The local origin
+        is at (ox, oy).
+
+        points is a numpy array of shape (n, 2) of (x, y) coordinates. A row
+        that contains NaN ends the current line, and the next point starts a
+        new one, so many separate lines can be drawn as one item.
+
+        clipPath and item are the same as for drawLine.
+        """
+
+        handle = self._record('drawPolyline', points, ox, oy, clipPath, **kwargs)
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        key = self._layerKey('drawPolyline', (points, ox, oy, clipPath), kwargs)
+        if self._unchanged(item, key):
+            return self._addItem(self._reuseItem(item, type(item)), handle, key)
+
+        # A line starts at each point that does not follow another point
+        finite = np.isfinite(points).all(axis=1)
+        moves = finite.copy()
+        moves[1:] &= ~finite[:-1]
+        xs = points[finite, 0] + ox
+        ys = self._scene.height() - (points[finite, 1] + oy)
+        path = makePath(xs, ys, moves[finite])
+
+        return self._addPath(GraphicsPathItem, path, clipPath, item, handle, key,
+                             makePen(**kwargs), QBrush(Qt.NoBrush))
+
+    def drawSegments(self, segments, ox=0, oy=0, clipPath=None, item=None, **kwargs):
+        """
+        Draw many separate line segments with the same properties as a single
+        item. The local origin is at (ox, oy).
+
+        segments is a numpy array of shape (n, 4), where each row holds the
+        end points (sx, sy, ex, ey) of one segment, like drawLine.
+
+        clipPath and item are the same as for drawLine.
+        """
+
+        handle = self._record('drawSegments', segments, ox, oy, clipPath, **kwargs)
+        segments = np.asarray(segments, dtype=float).reshape(-1, 4)
+        key = self._layerKey('drawSegments', (segments, ox, oy, clipPath), kwargs)
+        if self._unchanged(item, key):
+            return self._addItem(self._reuseItem(item, type(item)), handle, key)
+
+        xs = segments[:, 0::2] + ox
+        ys = self._scene.height() - (segments[:, 1::2] + oy)
+        moves = np.zeros(xs.shape, dtype=bool)
+        moves[:, 0] = True
+        path = makePath(xs.ravel(), ys.ravel(), moves.ravel())
+
+        return self._addPath(GraphicsPathItem, path, clipPath, item, handle, key,
+                             makePen(**kwargs), QBrush(Qt.NoBrush))
+
+    def drawPolygons(self, polygons, ox=0, oy=0, clipPath=None, item=None, **kwargs):
+        """
+        Draw many closed polygons with the same properties as a single item.
+        The local origin is at (ox, oy).
+
+        polygons is a numpy array of shape (n, k, 2) holding the (x, y) of
+        each of the k corners of n polygons.
+
+        clipPath and item are the same as for drawLine.
+        """
+
+        handle = self._record('drawPolygons', polygons, ox, oy, clipPath, **kwargs)
+        polygons = np.asarray(polygons, dtype=float)
+        key = self._layerKey('drawPolygons', (polygons, ox, oy, clipPath), kwargs)
+        if self._unchanged(item, key):
+            return self._addItem(self._reuseItem(item, type(item)), handle, key)
+
+        # Each polygon goes back to its first corner to close it
+        closed = np.concatenate((polygons, polygons[:, :1]), axis=1)
+        xs = closed[:, :, 0] + ox
+        ys = self._scene.height() - (closed[:, :, 1] + oy)
+        moves = np.zeros(xs.shape, dtype=bool)
+        moves[:, 0] = True
+        path = makePath(xs.ravel(), ys.ravel(), moves.ravel(), Qt.WindingFill)
+
+        return self._addPath(GraphicsPathItem, path, clipPath, item, handle, key,
+                             makePen(**kwargs), makeBrush(**kwargs))
+
+    def drawImage(self, sx, sy, ex, ey, ox=0, oy=0, image=None, clipPath=None, item=None, **kwargs):
+        """
+        Draw an image, scaled to fill the rectangle with corners (sx, sy) and
+        (ex, ey). The local origin is at (ox, oy).
+
+        image is a 2-D numpy array of 32-bit 0xAARRGGBB colors, with the top
+        row first. It is not copied, so it must not be changed after it is
+        drawn.
+
+        clipPath and item are the same as for drawLine.
+        """
+
+        handle = self._record('drawImage', sx, sy, ex, ey, ox, oy, image, clipPath, **kwargs)
+        key = self._layerKey('drawImage', (sx, sy, ex, ey, ox, oy, image, clipPath), kwargs)
+        if self._unchanged(item, key):
+            return self._addItem(self._reuseItem(item, type(item)), handle, key)
+
+        (sx, sy) = self.figureToCanvas(sx, sy, ox, oy)
+        (ex, ey) = self.figureToCanvas(ex, ey, ox, oy)
+        rect = QRectF(sx, ey, ex-sx, sy-ey)
+
+        picture = self._reuseItem(item, GraphicsImageItem)
+        if picture is None:
+            picture = GraphicsImageItem(image, rect)
+        else:
+            picture.setImage(image, rect)
+        picture.setClipRect(self._canvasClipRect(clipPath))
+
+        return self._addItem(picture, handle, key)
+
+    def _addPath(self, itemClass, path, clipPath, item, handle, key, pen, brush):
+        """
+        Draw path with pen and brush, clipped to clipPath, by updating item
+        if it is an itemClass, or else with a new itemClass. This is the end
+        of every drawing call that draws many shapes as one path.
+        """
+
+        pathItem = self._reuseItem(item, itemClass)
+        if pathItem is None:
+            pathItem = itemClass(path)
+        else:
+            pathItem.setPath(path)
+        pathItem.setPen(pen)
+        pathItem.setBrush(brush)
+        pathItem.setClipRect(self._canvasClipRect(clipPath))
 
+        return self._addItem(pathItem, handle, key)
 
-    def drawText(self, x, y, ox=0, oy=0, **kwargs):
+    def _canvasClipRect(self, clipPath):
+        """
+        Return clipPath, a 4-tuple of (x, y, width, height) in figure
+        coordinates, as a list of [x, y, width, height] of its top-left
+        corner in canvas coordinates, or None if clipPath is None.
+        """
+        if clipPath is None:
+            return None
+        (csx, csy, w, h) = clipPath
+        (csx, csy) = self.figureToCanvas(csx, csy + h)
+        return [csx, csy, w, h]
+
+    def drawText(self, x, y, ox=0, oy=0, item=None, **kwargs):
         """
         x, y are figure coords that define the top-left corner of the text item.
 
@@ -344,9 +1109,27 @@ class Qt4PySideCanvas(BaseCanvas):
         rotation = 'horizontal', 'vertical' or int (for degrees)
 
         if font provides a color, then that is the text color.
+
+        item is an item returned by an earlier drawText() call; see drawLine().
         """
+
+        handle = self._record('drawText', x, y, ox, oy, **kwargs)
+        key = self._layerKey('drawText', (x, y, ox, oy), kwargs)
+        if self._unchanged(item, key):
+            return self._addItem(self._reuseItem(item, type(item)), handle, key)
         
-        t = QGraphicsTextItem(str(kwargs['text']))
+        text = kwargs['text']
+        if not isinstance(text, basestring):
+            text = str(text)
+
+        t = self._reuseItem(item, QGraphicsTextItem)
+        if t is None:
+            t = QGraphicsTextItem(text)
+        else:
+            # The position is found from the bounding rect in the scene
+            # below, so start from the same place as a new item
+            t.setPos(0, 0)
+            t.setPlainText(text)
         color = QColor(*kwargs['color'].rgba())
         t.setDefaultTextColor(color)
         t.setFont(makeFont(kwargs['font']))
@@ -397,51 +1180,487 @@ class Qt4PySideCanvas(BaseCanvas):
         (x, y) = self.figureToCanvas(x, y, ox, oy)
 
         t.setPos(x, y)
-        self._scene.addItem(t)
+        return self._addItem(t, handle, key)
+
+    def setRecorder(self, recorder=None):
+        """
+        Record everything that is drawn on this canvas from now on onto
+        recorder, which is usually a RecordingCanvas. Items that are removed
+        from this canvas are removed from the recorder as well.
+
+        If recorder is None, then recording stops.
+        """
+        self._recorder = recorder
+        self._recorded = {}
+
+    def recorder(self):
+        """Return the current recorder, or None if not recording."""
+        return self._recorder
+
+    def _record(self, method, *args, **kwargs):
+        """
+        Pass a drawing call on to the recorder, if there is one, and return
+        the recorder's handle for it.
+        """
+        if self._recorder is None:
+            return None
+        return getattr(self._recorder, method)(*args, **kwargs)
+
+    def _reuseItem(self, item, itemClass):
+        """
+        Return item if it is exactly an itemClass, so that a drawing call can
+        update it in place instead of making a new item. Otherwise return
+        None.
+
+        The recorder forgets the drawing call that item was made with, since
+        the new call replaces it.
+        """
+        if item is None or type(item) is not itemClass:
+            return None
+        if self._recorder is not None and item in self._recorded:
+            self._recorder.remove(self._recorded.pop(item))
+        return item
 
-        return t
+    def _layerKey(self, method, args, kwargs):
+        """
+        If the innermost open group is in a cached layer, then return a
+        hashable key for a drawing call, which is the same for two calls that
+        draw the same thing. Otherwise return None.
+        """
+        group = self._currentGroup()
+        if group is None or self._layerOf(group.container()) is None:
+            return None
+        # Numpy arrays are compared by their contents
+        args = tuple((arg.shape, arg.tostring()) if isinstance(arg, np.ndarray) else arg
+                     for arg in args)
+        return (method, args, _encode(kwargs))
+
+    def _unchanged(self, item, key):
+        """
+        Return True if item is in a cached layer and was last drawn with the
+        same key, so that it does not need to be updated or painted again.
+        """
+        return key is not None and item is not None and self._layerKeys.get(item) == key
+
+    def _layerOf(self, item):
+        """Return the GraphicsLayerItem that item is in, or None."""
+        scene = item.scene()
+        if isinstance(scene, LayerScene):
+            return scene.layer()
+        return None
+
+    def _onCanvas(self, item):
+        """Return True if item is on the canvas, directly or in a layer."""
+        while item is not None:
+            scene = item.scene()
+            if scene == self._scene:
+                return True
+            if not isinstance(scene, LayerScene):
+                return False
+            item = scene.layer()
+        return False
+
+    def _takeItem(self, item):
+        """
+        Take item out of its group and its scene, invalidating the layer it
+        was in, if any.
+        """
+        layer = self._layerOf(item)
+        if layer is not None:
+            layer.invalidate()
+        self._layerKeys.pop(item, None)
+
+        if item.parentItem() is not None:
+            item.setParentItem(None)
+        if item.scene() is not None:
+            item.scene().removeItem(item)
+
+    def _addItem(self, item, handle=None, key=None):
+        """
+        Add item to the scene, or to the open group, if it is not in it
+        already, and remember its recorder handle.
+
+        The item is put on top of everything drawn before it, the same as a
+        newly added item would be, so that updating items in place does not
+        change what covers what.
+
+        If the item is in a cached layer, then the layer is invalidated,
+        unless the item was already in it and key is the same as the key of
+        its last drawing call.
+        """
+        self._stackCount += 1
+        item.setZValue(self._stackCount)
+
+        group = self._currentGroup()
+        if group is not None:
+            container = group.container()
+            moved = item.parentItem() is not container
+            if moved:
+                if item.scene() is not None:
+                    self._takeItem(item)
+                item.setParentItem(container)
+        else:
+            moved = item.parentItem() is not None or item.scene() != self._scene
+            if moved:
+                if item.scene() is not None:
+                    self._takeItem(item)
+                self._scene.addItem(item)
+
+        layer = self._layerOf(item)
+        if layer is not None:
+            if moved or key is None or self._layerKeys.get(item) != key:
+                layer.invalidate()
+            self._layerKeys[item] = key
+
+        if handle is not None:
+            self._recorded[item] = handle
+        return item
 
     def clear(self):
+        # The items are taken out of the scene rather than deleted, so that
+        # the items and groups that Artists keep for reuse are still valid
+        for item in self._scene.items():
+            if item.parentItem() is None:
+                self._scene.removeItem(item)
+        self._stackCount = 0
+        if self._recorder is not None:
+            self._recorder.clear()
+            self._recorded = {}
+
+    def close(self):
+        """
+        Take the canvas down: close its view, delete every item in the scene,
+        and let go of the Figure and of everything that is kept for drawing.
+        Nothing can be drawn on the canvas after it is closed.
+        """
+
+        self._resizeTimer.stop()
+        self._pendingSize = None
+
+        # The view and the timer would otherwise keep calling back into the
+        # canvas, and keep it alive
+        self._disconnectView()
+        try:
+            self._resizeTimer.timeout.disconnect(self._resizeSettled)
+        except (RuntimeError, TypeError):
+            # Already disconnected
+            pass
+
+        self._view.setSnapshot(None)
+        self._view.close()
         self._scene.clear()
 
+        self._groups = []
+        self._layerKeys = {}
+        self._recorder = None
+        self._recorded = {}
+        self._frameDepth = 0
+        self._frameDirty = False
+        self._bulkDepth = 0
+        self._stackCount = 0
+        self._dragPlot = None
+        self._zoomBox = None
+        self._figure = None
+
     def update(self):
-        self._scene.update()
+        """
+        Repaint the scene. If a frame is open, then the repaint is held back
+        until the frame ends.
+        """
+        if self._frameDepth > 0:
+            self._frameDirty = True
+        else:
+            self._scene.update()
+
+    def beginFrame(self, bulk=False):
+        """
+        Open a frame. Until the frame is ended with endFrame(), update() only
+        notes that the scene needs to be repainted, and the scene is repainted
+        once when the frame ends.
+
+        Frames can be nested; only the end of the outermost frame repaints
+        the scene. Artist.draw() draws inside a frame, so drawing a Figure
+        repaints the scene once, however many Artists it draws.
+
+        bulk should be True for frames that add or move many items. If bulk
+        insertion is on (see setBulkInsert()), then the scene keeps no item
+        index while the first bulk frame is open.
+        """
+        self._frameDepth += 1
+        if bulk and self._bulkInsert and self._indexMethod == 'bsp' and not self._deferringIndex():
+            self._scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+            self._bulkDepth = self._frameDepth
+
+    def endFrame(self):
+        """
+        End the frame opened by the last beginFrame(). If this is the
+        outermost frame and update() was called in it, then the scene is
+        repainted.
+        """
+        if self._frameDepth == 0:
+            return
+        if self._frameDepth == self._bulkDepth:
+            # Index everything that was drawn in the frame at once
+            self._scene.setItemIndexMethod(self._indexMethods[self._indexMethod])
+            self._bulkDepth = 0
+        self._frameDepth -= 1
+        if self._frameDepth == 0 and self._frameDirty:
+            self._frameDirty = False
+            self._scene.update()
+
+    def inFrame(self):
+        """Return True if a frame is open."""
+        return self._frameDepth > 0
+
+    @contextmanager
+    def frame(self, bulk=False):
+        """
+        Context manager that opens a frame for the duration of a with
+        block. See beginFrame().
+        """
+        self.beginFrame(bulk)
+        try:
+            yield self
+        finally:
+            self.endFrame()
+
+    def makeGroup(self, cached=False):
+        """
+        Return a new, empty group. Items that are drawn while the group is
+        open (see beginGroup()) are put in it, so that they can all be
+        removed from the canvas with one call to removeGroup(), or hidden
+        with one call to setGroupVisible().
+
+        If cached is True, then the group is a layer that is painted from a
+        pixmap. The pixmap is only painted again when something in the layer
+        changes: an item is added, removed or hidden, or an item is drawn
+        with a different position, size or style than the last time. This
+        makes repainting cheap for things that rarely change, such as the
+        axes of a plot.
+        """
+        if cached:
+            return GraphicsLayerItem()
+        return GraphicsGroupItem()
+
+    def _currentGroup(self):
+        """Return the innermost open group, or None."""
+        for group in reversed(self._groups):
+            if group is not None:
+                return group
+        return None
+
+    def beginGroup(self, group):
+        """
+        Open group, so that the items drawn until endGroup() is called are
+        put in it, including items that are updated in place.
+
+        Groups can be nested. A group that is opened inside another group is
+        put in that group. Otherwise it stays where it is, or is put back on
+        the canvas if it was removed. group can be None, in which case items
+        go into the group that was already open, if any.
+        """
+
+        parent = self._currentGroup()
+        if group is not None and group is not parent:
+            if parent is not None:
+                if group.parentItem() is not parent.container():
+                    if group.scene() is not None:
+                        self._takeItem(group)
+                    group.setParentItem(parent.container())
+                    layer = self._layerOf(group)
+                    if layer is not None:
+                        layer.invalidate()
+            elif not self._onCanvas(group):
+                if group.scene() is not None:
+                    self._takeItem(group)
+                self._scene.addItem(group)
+
+            # Like an item, the group is stacked on top of what was drawn
+            # before it
+            self._stackCount += 1
+            group.setZValue(self._stackCount)
+
+        self._groups.append(group)
+
+    def endGroup(self):
+        """End the group opened by the last beginGroup()."""
+        if self._groups:
+            self._groups.pop()
+
+    @contextmanager
+    def group(self, group):
+        """
+        Context manager that opens group for the duration of a with block.
+        See beginGroup().
+        """
+        self.beginGroup(group)
+        try:
+            yield group
+        finally:
+            self.endGroup()
+
+    def removeGroup(self, group):
+        """
+        Remove group, and every item in it, from the canvas. The group keeps
+        its items, and is put back on the canvas when it is opened again.
+        """
+
+        if group is None:
+            return
+        if self._recorder is not None:
+            self._forgetGroup(group.container())
+        self._takeItem(group)
+
+    def _forgetGroup(self, group):
+        """Remove the recorder handles of every item in group."""
+        for item in group.childItems():
+            if item in self._recorded:
+                self._recorder.remove(self._recorded.pop(item))
+            if isinstance(item, GraphicsGroupItem):
+                self._forgetGroup(item.container())
+            else:
+                self._forgetGroup(item)
+
+    def setGroupVisible(self, group, visible=True):
+        """
+        Show or hide every item in group. The recorder, if there is one, is
+        not affected.
+        """
+        if group is not None:
+            group.setVisible(visible)
+            layer = self._layerOf(group)
+            if layer is not None:
+                layer.invalidate()
+            self.update()
 
     def remove(self, item):
         """
-        Remove the given item from the canvas.
+        Remove the given item from the canvas. If it is in a group, then it is
+        taken out of the group.
         """
 
         try:
-            if self._scene == item.scene():
-                self._scene.removeItem(item)
+            if self._recorder is not None and item in self._recorded:
+                self._recorder.remove(self._recorded.pop(item))
+            self._takeItem(item)
         except:
             "Failed to remove item: " + str(item)
 
-    def save(self, filename):
+    def save(self, filename, scale=1.0, tileHeight=None, threads=0):
         """
         Save the canvas to a file.
+
+        For raster formats, scale sets the size of the image relative to the
+        size of the scene, so that the canvas can be saved at a higher
+        resolution without drawing it again.
+
+        PNG and TIFF files can be saved in strips of tileHeight rows, which
+        keeps memory use bounded by the size of a strip rather than the size
+        of the image. This is done automatically when the image has more than
+        setTiledSaveThreshold() pixels. If threads is more than 0, then the
+        strips are encoded and compressed by that many threads while the next
+        strips are rendered.
         """
 
         painter = QPainter()
 
+        width = int(round(self.scene().width() * scale))
+        height = int(round(self.scene().height() * scale))
+        extension = filename.split('.')[-1].lower()
+
         # How the canvas is saved depends on what kind of file is requested.
-        # PDF and PS use a QPrinter, others use a QPixmap.
-        if filename.split('.')[-1] in ('pdf', 'ps'):
+        # PDF and PS use a QPrinter, large PNG and TIFF files are written in
+        # strips, others use a QPixmap.
+        if extension in ('pdf', 'ps'):
             printer = QPrinter()
             printer.setOutputFileName(filename)
             painter.begin(printer)
             painter.setRenderHint(QPainter.Antialiasing)
             self.scene().render(painter)
             painter.end()
+        elif extension in ('png', 'tif', 'tiff') and \
+                (tileHeight is not None or width * height > self._tiledSaveThreshold):
+            if tileHeight is None:
+                tileHeight = 256
+            self._saveTiled(filename, width, height, scale, max(int(tileHeight), 1), threads)
         else:
-            pixmap = QPixmap(self.scene().width(), self.scene().height())
+            pixmap = QPixmap(width, height)
             painter.begin(pixmap)
             painter.setRenderHint(QPainter.Antialiasing)
-            self.scene().render(painter)
+            self.scene().render(painter, QRectF(pixmap.rect()), self.scene().sceneRect())
             painter.end()
             pixmap.save(filename)
 
+    def setTiledSaveThreshold(self, pixels):
+        """
+        Set the number of pixels above which PNG and TIFF files are saved in
+        strips by save().
+        """
+        self._tiledSaveThreshold = pixels
+
+    def tiledSaveThreshold(self):
+        """Return the number of pixels above which images are saved in strips."""
+        return self._tiledSaveThreshold
+
+    def _renderStrip(self, top, rows, width, scale):
+        """
+        Render rows rows of the scene, starting at row top of an image that is
+        scale times the size of the scene. Return an RGBA numpy array of shape
+        (rows, width, 4).
+        """
+
+        image = QImage(width, rows, QImage.Format_ARGB32)
+        image.fill(0)
+
+        painter = QPainter()
+        painter.begin(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        source = QRectF(0, top / float(scale), width / float(scale), rows / float(scale))
+        self.scene().render(painter, QRectF(0, 0, width, rows), source, Qt.IgnoreAspectRatio)
+        painter.end()
+
+        # Format_ARGB32 is stored as BGRA bytes on little endian machines.
+        # Copy out the pixels, so the array does not depend on the QImage.
+        bits = np.frombuffer(image.bits(), np.uint8)
+        bits = bits[:rows * image.bytesPerLine()].reshape(rows, image.bytesPerLine())
+        return bits[:, :width * 4].reshape(rows, width, 4)[..., [2, 1, 0, 3]]
+
+    def _saveTiled(self, filename, width, height, scale, tileHeight, threads):
+        """
+        Save the canvas to a PNG or TIFF file, rendering and writing it in
+        strips of tileHeight rows.
+
+        QGraphicsScene can only be rendered in the GUI thread, so only the
+        encoding is done by the thread pool. At most threads strips are
+        waiting to be written at any time.
+        """
+
+        writer = openImageWriter(filename, width, height, tileHeight)
+
+        pool = None
+        if threads > 0:
+            pool = ThreadPool(threads)
+
+        try:
+            pending = []
+            for top in range(0, height, tileHeight):
+                rows = self._renderStrip(top, min(tileHeight, height - top), width, scale)
+                if pool is None:
+                    writer.write(rows)
+                    continue
+
+                pending.append(pool.apply_async(writer.encode, (rows,)))
+                if len(pending) >= threads:
+                    writer.writeEncoded(pending.pop(0).get())
+
+            for result in pending:
+                writer.writeEncoded(result.get())
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            writer.close()
+
     def items(self, sx, sy, ex, ey, ox, oy):
         """
         Return a list of all the items on the canvas in a rectangle between
@@ -531,6 +1750,37 @@ def makePen(**kwargs):
 
     return pen
 
+def makePath(xs, ys, moves, fillRule=Qt.OddEvenFill):
+    """
+    Return a QPainterPath through the points (xs, ys), which are numpy arrays
+    in canvas coordinates. moves is a numpy array of bools that is True at
+    each point that starts a new subpath, and must be True at the first
+    point.
+
+    The path is read from the binary form that QDataStream uses for a
+    QPainterPath, which is built with numpy, so that paths with many
+    thousands of points are made without a Python loop.
+    """
+
+    n = len(xs)
+    path = QPainterPath()
+    if n == 0:
+        return path
+
+    # Each element is its type (0 for moveTo, 1 for lineTo) and its x and y.
+    # The element count comes before them, and the index of the start of the
+    # last subpath and the fill rule come after them.
+    elements = np.empty(n, dtype=[('type', '>i4'), ('x', '>f8'), ('y', '>f8')])
+    elements['type'] = np.where(moves, 0, 1)
+    elements['x'] = xs
+    elements['y'] = ys
+    lastStart = int(np.flatnonzero(moves)[-1])
+    data = struct.pack('>i', n) + elements.tostring() + struct.pack('>ii', lastStart, int(fillRule))
+
+    stream = QDataStream(QByteArray(data))
+    stream >> path
+    return path
+
 def makeBrush(**kwargs):
     """
     Create a QBrush from the given properties. Valid properties are:
@@ -0,0 +1,459 @@
+
+
+import array
+import cPickle as pickle
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+
+from base_canvas import BaseCanvas
+from color import Color
+from font import Font
+
+
+class DisplayList(object):
+    """
+    A compact, replayable list of canvas drawing primitives.
+
+    Each primitive (an op) is stored as an opcode, a run of float arguments,
+    an index into a table of distinct drawing properties, and an index into a
+    table of strings (for text). All of these are kept in flat arrays, so a
+    DisplayList with many thousands of ops is small and quick to copy, save,
+    and compare. The pixels of images, and the coordinates of primitives that
+    draw many shapes at once, are stored as bytes in the table of strings.
+
+    A DisplayList is filled in by a RecordingCanvas. It can then be replayed
+    onto any canvas with DisplayList.replay(), saved to disk with
+    DisplayList.save(), and compared to another DisplayList with
+    DisplayList.diff().
+
+    Ops that are removed from the canvas after they were drawn are only
+    marked as dead, so that the handles returned by the RecordingCanvas stay
+    valid. DisplayList.compact() returns a copy without the dead ops.
+    """
+
+    # Names of the canvas methods for each opcode, and the number of float
+    # arguments each one takes
+    _methods = ('drawLine', 'drawRect', 'drawCircle', 'drawTriangle', 'drawText', 'drawImage',
+                'drawRects', 'drawPolygons', 'drawSegments', 'drawPolyline')
+    _nargs = (10, 6, 5, 6, 4, 12, 6, 7, 6, 6)
+
+    _orientations = ('up', 'down', 'left', 'right')
+
+    def __init__(self, width=0, height=0):
+        """
+        **Constructor**
+
+        width, height
+            The size of the canvas that was recorded.
+        """
+
+        self._width = width
+        self._height = height
+
+        self._ops = array.array('B')      # opcode of each op
+        self._offsets = array.array('l')  # start of each op's arguments in _values
+        self._values = array.array('d')   # float arguments of all ops
+        self._styles = array.array('l')   # index of each op's properties in _styleTable
+        self._texts = array.array('l')    # index of each op's text in _strings, or -1
+        self._alive = array.array('B')    # whether each op is still on the canvas
+
+        self._styleTable = []   # distinct encoded property tuples
+        self._styleIndex = {}   # encoded property tuple -> index in _styleTable
+        self._strings = []
+
+    def __len__(self):
+        """Return the number of ops that have not been removed."""
+        return sum(self._alive)
+
+    def size(self):
+        """Return the (width, height) of the recorded canvas."""
+        return (self._width, self._height)
+
+    def append(self, method, values, props, text=None):
+        """
+        Add an op and return its index.
+
+        method is the name of the canvas method, values is a sequence of
+        floats, props is the dictionary of drawing properties and text is the
+        text that is drawn, if any.
+        """
+
+        self._ops.append(self._methods.index(method))
+        self._offsets.append(len(self._values))
+        self._values.extend(values)
+
+        style = _encode(props)
+        if style not in self._styleIndex:
+            self._styleIndex[style] = len(self._styleTable)
+            self._styleTable.append(style)
+        self._styles.append(self._styleIndex[style])
+
+        if text is None:
+            self._texts.append(-1)
+        else:
+            self._texts.append(len(self._strings))
+            self._strings.append(text)
+
+        self._alive.append(1)
+        return len(self._ops) - 1
+
+    def remove(self, index):
+        """Mark the op at index as removed."""
+        try:
+            self._alive[index] = 0
+        except (IndexError, TypeError):
+            pass
+
+    def clear(self):
+        """Mark every op as removed."""
+        self._alive = array.array('B', [0] * len(self._ops))
+
+    def opKey(self, index):
+        """
+        Return a hashable description of the op at index. Two ops with the
+        same key draw exactly the same thing.
+        """
+
+        start = self._offsets[index]
+        end = start + self._nargs[self._ops[index]]
+        text = None
+        if self._texts[index] >= 0:
+            text = self._strings[self._texts[index]]
+
+        return (self._ops[index],
+                tuple(self._values[start:end]),
+                self._styleTable[self._styles[index]],
+                text)
+
+    def compact(self):
+        """
+        Return a new DisplayList that contains only the ops that have not
+        been removed.
+        """
+
+        new = DisplayList(self._width, self._height)
+        for i in range(len(self._ops)):
+            if self._alive[i]:
+                (op, values, style, text) = self.opKey(i)
+                new.append(self._methods[op], values, _decode(style), text)
+        return new
+
+    def diff(self, other):
+        """
+        Compare this DisplayList with other, which is usually the same Figure
+        recorded at a later time.
+
+        Return a 2-tuple of (added, removed). added is the list of indices of
+        ops in other that are not in this DisplayList, and removed is the list
+        of indices of ops in this DisplayList that are not in other.
+        """
+
+        def keys(dl):
+            return [(i, dl.opKey(i)) for i in range(len(dl._ops)) if dl._alive[i]]
+
+        mine = keys(self)
+        theirs = keys(other)
+
+        remaining = Counter(key for i, key in theirs)
+        removed = []
+        for i, key in mine:
+            if remaining[key] > 0:
+                remaining[key] -= 1
+            else:
+                removed.append(i)
+
+        remaining = Counter(key for i, key in mine)
+        added = []
+        for i, key in theirs:
+            if remaining[key] > 0:
+                remaining[key] -= 1
+            else:
+                added.append(i)
+
+        return added, removed
+
+    def replay(self, canvas, scale=1.0):
+        """
+        Draw every op that has not been removed onto canvas, in the order
+        they were recorded.
+
+        If scale is not 1, then all coordinates, line widths and font sizes
+        are multiplied by scale. This can be used to draw the recording at a
+        different resolution.
+
+        Return the list of items created by the canvas.
+        """
+
+        items = []
+
+        for i in range(len(self._ops)):
+            if not self._alive[i]:
+                continue
+
+            (op, raw, style, text) = self.opKey(i)
+            props = _decode(style)
+            method = self._methods[op]
+
+            values = raw
+            if scale != 1.0:
+                values = [v * scale for v in raw]
+                if 'width' in props:
+                    props['width'] = int(round(props['width'] * scale))
+                if isinstance(props.get('font'), Font):
+                    props['font'].setSize(int(round(props['font'].props('size') * scale)))
+
+            if method == 'drawLine':
+                (sx, sy, ex, ey, ox, oy, cx, cy, cw, ch) = values
+                clipPath = _decodeClip(cx, cy, cw, ch)
+                item = canvas.drawLine(sx, sy, ex, ey, ox, oy, clipPath=clipPath, **props)
+            elif method == 'drawTriangle':
+                (cx, cy, l, ox, oy) = values[:5]
+                orientation = self._orientations[int(raw[5])]
+                item = canvas.drawTriangle(cx, cy, l, orientation, ox, oy, **props)
+            elif method == 'drawText':
+                props['text'] = text
+                item = getattr(canvas, method)(*values, **props)
+            elif method == 'drawImage':
+                (sx, sy, ex, ey, ox, oy, cx, cy, cw, ch) = values[:10]
+                clipPath = _decodeClip(cx, cy, cw, ch)
+                (width, height) = (int(raw[10]), int(raw[11]))
+                image = np.fromstring(text, np.uint32).reshape(height, width)
+                item = canvas.drawImage(sx, sy, ex, ey, ox, oy, image=image, clipPath=clipPath, **props)
+            elif method == 'drawRects':
+                (ox, oy, cx, cy, cw, ch) = values
+                clipPath = _decodeClip(cx, cy, cw, ch)
+                rects = np.fromstring(text, float).reshape(-1, 4) * scale
+                item = canvas.drawRects(rects, ox, oy, clipPath=clipPath, **props)
+            elif method == 'drawSegments':
+                (ox, oy, cx, cy, cw, ch) = values
+                clipPath = _decodeClip(cx, cy, cw, ch)
+                segments = np.fromstring(text, float).reshape(-1, 4) * scale
+                item = canvas.drawSegments(segments, ox, oy, clipPath=clipPath, **props)
+            elif method == 'drawPolyline':
+                (ox, oy, cx, cy, cw, ch) = values
+                clipPath = _decodeClip(cx, cy, cw, ch)
+                points = np.fromstring(text, float).reshape(-1, 2) * scale
+                item = canvas.drawPolyline(points, ox, oy, clipPath=clipPath, **props)
+            elif method == 'drawPolygons':
+                (ox, oy, cx, cy, cw, ch) = values[:6]
+                clipPath = _decodeClip(cx, cy, cw, ch)
+                polygons = np.fromstring(text, float).reshape(-1, int(raw[6]), 2) * scale
+                item = canvas.drawPolygons(polygons, ox, oy, clipPath=clipPath, **props)
+            else:
+                item = getattr(canvas, method)(*values, **props)
+
+            items.append(item)
+
+        return items
+
+    def save(self, filename):
+        """
+        Save this DisplayList to a file. Removed ops are not saved.
+        """
+
+        dl = self.compact()
+        state = {'size': (dl._width, dl._height),
+                 'ops': dl._ops,
+                 'offsets': dl._offsets,
+                 'values': dl._values,
+                 'styles': dl._styles,
+                 'texts': dl._texts,
+                 'styleTable': dl._styleTable,
+                 'strings': dl._strings,
+                }
+
+        f = open(filename, 'wb')
+        try:
+            pickle.dump(state, f, pickle.HIGHEST_PROTOCOL)
+        finally:
+            f.close()
+
+    @staticmethod
+    def load(filename):
+        """
+        Return the DisplayList saved in filename by DisplayList.save().
+        """
+
+        f = open(filename, 'rb')
+        try:
+            state = pickle.load(f)
+        finally:
+            f.close()
+
+        dl = DisplayList(*state['size'])
+        dl._ops = state['ops']
+        dl._offsets = state['offsets']
+        dl._values = state['values']
+        dl._styles = state['styles']
+        dl._texts = state['texts']
+        dl._styleTable = state['styleTable']
+        dl._styleIndex = dict((style, i) for i, style in enumerate(dl._styleTable))
+        dl._strings = state['strings']
+        dl._alive = array.array('B', [1] * len(dl._ops))
+        return dl
+
+
+class RecordingCanvas(BaseCanvas):
+    """
+    A canvas that does not display anything, but records everything that is
+    drawn on it into a DisplayList.
+
+    The items returned by the draw methods are handles (integers) that can be
+    passed to RecordingCanvas.remove(). The item argument that some draw
+    methods take, to update an earlier item in place, is ignored; every call
+    records a new op. Groups are not recorded, and makeGroup() returns None.
+    """
+
+    def __init__(self, width=600, height=400):
+        BaseCanvas.__init__(self)
+        self._displayList = DisplayList(width, height)
+
+    def displayList(self):
+        """Return the DisplayList being recorded."""
+        return self._displayList
+
+    def drawLine(self, sx, sy, ex, ey, ox=0, oy=0, aliased=False, clipPath=None, item=None, **kwargs):
+        clipPath = _encodeClip(clipPath)
+        kwargs['aliased'] = aliased
+        return self._displayList.append('drawLine', (sx, sy, ex, ey, ox, oy) + tuple(clipPath), kwargs)
+
+    def drawRect(self, sx, sy, ex, ey, ox=0, oy=0, item=None, **kwargs):
+        return self._displayList.append('drawRect', (sx, sy, ex, ey, ox, oy), kwargs)
+
+    def drawCircle(self, cx, cy, r, ox=0, oy=0, item=None, **kwargs):
+        return self._displayList.append('drawCircle', (cx, cy, r, ox, oy), kwargs)
+
+    def drawTriangle(self, cx, cy, l, orientation='up', ox=0, oy=0, item=None, **kwargs):
+        orientation = DisplayList._orientations.index(orientation)
+        return self._displayList.append('drawTriangle', (cx, cy, l, ox, oy, orientation), kwargs)
+
+    def drawText(self, x, y, ox=0, oy=0, item=None, **kwargs):
+        text = kwargs.pop('text', '')
+        if not isinstance(text, basestring):
+            text = str(text)
+        return self._displayList.append('drawText', (x, y, ox, oy), kwargs, text)
+
+    def drawImage(self, sx, sy, ex, ey, ox=0, oy=0, image=None, clipPath=None, item=None, **kwargs):
+        clipPath = _encodeClip(clipPath)
+        image = np.ascontiguousarray(image, dtype=np.uint32)
+        (height, width) = image.shape
+        values = (sx, sy, ex, ey, ox, oy) + tuple(clipPath) + (width, height)
+        return self._displayList.append('drawImage', values, kwargs, image.tostring())
+
+    def drawRects(self, rects, ox=0, oy=0, clipPath=None, item=None, **kwargs):
+        clipPath = _encodeClip(clipPath)
+        rects = np.ascontiguousarray(rects, dtype=float)
+        return self._displayList.append('drawRects', (ox, oy) + tuple(clipPath), kwargs, rects.tostring())
+
+    def drawPolyline(self, points, ox=0, oy=0, clipPath=None, item=None, **kwargs):
+        clipPath = _encodeClip(clipPath)
+        points = np.ascontiguousarray(points, dtype=float)
+        return self._displayList.append('drawPolyline', (ox, oy) + tuple(clipPath), kwargs, points.tostring())
+
+    def drawSegments(self, segments, ox=0, oy=0, clipPath=None, item=None, **kwargs):
+        clipPath = _encodeClip(clipPath)
+        segments = np.ascontiguousarray(segments, dtype=float)
+        return self._displayList.append('drawSegments', (ox, oy) + tuple(clipPath), kwargs, segments.tostring())
+
+    def drawPolygons(self, polygons, ox=0, oy=0, clipPath=None, item=None, **kwargs):
+        clipPath = _encodeClip(clipPath)
+        polygons = np.ascontiguousarray(polygons, dtype=float)
+        values = (ox, oy) + tuple(clipPath) + (polygons.shape[1],)
+        return self._displayList.append('drawPolygons', values, kwargs, polygons.tostring())
+
+    def remove(self, item):
+        self._displayList.remove(item)
+
+    def clear(self):
+        self._displayList.clear()
+
+    def close(self):
+        self._displayList.clear()
+
+    def update(self):
+        pass
+
+    def beginFrame(self, bulk=False):
+        pass
+
+    def endFrame(self):
+        pass
+
+    def inFrame(self):
+        return False
+
+    @contextmanager
+    def frame(self, bulk=False):
+        yield self
+
+    def makeGroup(self, cached=False):
+        return None
+
+    def beginGroup(self, group):
+        pass
+
+    def endGroup(self):
+        pass
+
+    @contextmanager
+    def group(self, group):
+        yield group
+
+    def removeGroup(self, group):
+        pass
+
+    def setGroupVisible(self, group, visible=True):
+        pass
+
+
+# The clip path recorded for ops that are not clipped. Its negative size can
+# not be a real clip path, and unlike NaN it compares equal to itself, so
+# that identical ops always have identical keys.
+_noClip = (0, 0, -1, -1)
+
+def _encodeClip(clipPath):
+    """Return clipPath as a 4-tuple of floats, or _noClip if it is None."""
+    if clipPath is None:
+        return _noClip
+    return tuple(clipPath)
+
+def _decodeClip(cx, cy, cw, ch):
+    """Return the clip path stored by _encodeClip, or None for _noClip."""
+    if cw < 0 or ch < 0:
+        return None
+    return (cx, cy, cw, ch)
+
+def _encode(props):
+    """
+    Convert a dictionary of drawing properties into a hashable tuple that
+    only contains plain Python values, so that it can be compared and saved.
+    """
+
+    encoded = []
+    for key in sorted(props.keys()):
+        value = props[key]
+        if isinstance(value, Color):
+            value = ('Color', tuple(value.rgba()))
+        elif isinstance(value, Font):
+            value = ('Font', _encode(value.props()))
+        elif isinstance(value, list):
+            value = tuple(value)
+        encoded.append((key, value))
+    return tuple(encoded)
+
+def _decode(encoded):
+    """
+    Convert a tuple made by _encode back into a dictionary of drawing
+    properties.
+    """
+
+    props = {}
+    for key, value in encoded:
+        if isinstance(value, tuple) and len(value) == 2 and value[0] == 'Color':
+            value = Color(list(value[1]))
+        elif isinstance(value, tuple) and len(value) == 2 and value[0] == 'Font':
+            value = Font(**_decode(value[1]))
+        props[key] = value
+    return props
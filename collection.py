@@ -0,0 +1,165 @@
+
+import numpy as np
+
+from dataartist import DataArtist
+from datapair import finiteExtreme
+
+class LineCollection(DataArtist):
+    """
+    Draw many series as lines that all have the same style, such as the
+    paths of a Monte Carlo simulation.
+
+    The series are kept together in numpy arrays rather than as one DataPair
+    each. If they all have the same x data, then the y data is a 2-D array
+    with one row per series; otherwise the series are kept end to end in
+    flat arrays, with the offset of the start of each one. The extent of all
+    the series is found with one reduction over the arrays, and all the
+    series are drawn as a single canvas item, with a row of NaN between one
+    series and the next, so drawing them does not depend on the number of
+    series in any way other than the number of points.
+
+    Points that are not finite are gaps, and split a series like they do for
+    a DataPair.
+
+    The lines are kept in plot coordinates until the axes or the data change,
+    so redrawing a plot that has not changed does not compute anything.
+
+    ======================  =================   =======
+    Property                Possible Values     Description
+    ======================  =================   =======
+    color                   | Color             The color of the lines.
+                            | Color format
+    width                   int (1)             The width of the lines.
+    ======================  =================   =======
+    """
+
+    def __init__(self, canvas, x, y, xaxis=None, yaxis=None, plot=None, **kwprops):
+        """
+        **Constructor**
+
+        x, y
+            Either x is a sequence of numbers that all the series share, and
+            y is a 2-D array with one row of the same length per series, or
+            x and y are both lists with one sequence per series, in which
+            case the series can have different lengths.
+        """
+
+        initialProperties = {'width': 1}
+        initialProperties.update(kwprops)
+
+        DataArtist.__init__(self, canvas, xaxis, yaxis, plot, **initialProperties)
+
+        self._version = 0
+
+        self.setData(x, y)
+
+    def setData(self, x, y):
+        """Set the data of all the series. See the constructor."""
+
+        x0 = np.asarray(x[0]) if len(x) > 0 else None
+        if x0 is not None and x0.ndim == 0:
+            # One x sequence shared by all the series
+            x = np.asarray(x, dtype=float)
+            y = np.array(y, dtype=float, ndmin=2)
+            m = min(len(x), y.shape[1])
+            self._x = x[:m]
+            self._y = y[:, :m]
+            self._offsets = None
+            self._xSorted = bool(np.all(self._x[1:] >= self._x[:-1]))
+        else:
+            lengths = [min(len(xs), len(ys)) for (xs, ys) in zip(x, y)]
+            self._x = np.concatenate([np.asarray(xs, dtype=float)[:k] for (xs, k) in zip(x, lengths)] + [np.zeros(0)])
+            self._y = np.concatenate([np.asarray(ys, dtype=float)[:k] for (ys, k) in zip(y, lengths)] + [np.zeros(0)])
+            self._offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.intp)
+            self._xSorted = False
+
+        self._extent = None
+        if self._y.size > 0:
+            extent = (finiteExtreme(self._x, np.fmin), finiteExtreme(self._x, np.fmax),
+                      finiteExtreme(self._y.ravel(), np.fmin), finiteExtreme(self._y.ravel(), np.fmax))
+            if None not in extent:
+                self._extent = extent
+
+        self._version += 1
+
+    def numSeries(self):
+        """Return the number of series."""
+        if self._offsets is None:
+            return self._y.shape[0]
+        return len(self._offsets) - 1
+
+    def series(self, i):
+        """
+        Return the data of the i-th series as a 2-tuple of (x, y) numpy
+        arrays.
+        """
+        if self._offsets is None:
+            return (self._x, self._y[i])
+        (start, end) = self._offsets[i:i + 2]
+        return (self._x[start:end], self._y[start:end])
+
+    def dataExtent(self):
+        return self._extent
+
+    def points(self, xaxis=None, yaxis=None):
+        """
+        Return all the series in plot coordinates, as a numpy array of shape
+        (k, 2) with a row of NaN after each series, or None if there is
+        nothing to draw.
+
+        xaxis and yaxis are the axes to map with, if not the axes of this
+        DataArtist; see DataArtist.preparedAxes().
+        """
+        return self.compute(xaxis, yaxis)
+
+    def cacheKey(self, xaxis, yaxis):
+        return DataArtist.cacheKey(self, xaxis, yaxis) + (self._version,)
+
+    def _compute(self, xaxis, yaxis):
+        if self._y.size == 0:
+            return None
+
+        if self._offsets is None:
+            x = self._x
+            y = self._y
+
+            # Points outside of the x Axis are dropped, keeping one on either
+            # side so that the lines still reach the edge of the plot
+            if self._xSorted:
+                (start, end) = xaxis.dataRange()
+                first = max(np.searchsorted(x, start, 'left') - 1, 0)
+                last = min(np.searchsorted(x, end, 'right') + 1, len(x))
+                x = x[first:last]
+                y = y[:, first:last]
+
+            (n, m) = y.shape
+            points = np.empty((n, m + 1, 2))
+            points[:, :m, 0] = xaxis.mapDataArrayToPlot(x)
+            points[:, :m, 1] = yaxis.mapDataArrayToPlot(y.ravel()).reshape(n, m)
+            points[:, m, :] = np.nan
+            return points.reshape(-1, 2)
+
+        # Each series is moved down by one row for every series before it,
+        # to leave a row for the NaN after each one
+        n = self.numSeries()
+        lengths = np.diff(self._offsets)
+        rows = np.arange(len(self._x)) + np.repeat(np.arange(n), lengths)
+
+        points = np.empty((len(self._x) + n, 2))
+        points[:] = np.nan
+        points[rows, 0] = xaxis.mapDataArrayToPlot(self._x)
+        points[rows, 1] = yaxis.mapDataArrayToPlot(self._y)
+        return points
+
+    def linePoints(self, xaxis=None, yaxis=None):
+        """Return the same points as LineCollection.points()."""
+        return self.points(xaxis, yaxis)
+
+    def _draw(self, prepared=None):
+        points = self.preparedResult(prepared)
+        if points is None:
+            return None
+
+        region = self.plot().axesRegion()
+        return self.canvas().drawPolyline(points, region[0], region[1], clipPath=region, item=self._oldItem(),
+                                          **self.props())
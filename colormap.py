@@ -0,0 +1,136 @@
+
+import numpy as np
+
+from color import Color
+
+class Colormap(object):
+    """
+    Maps numbers to colors.
+
+    A Colormap is defined by a list of colors that are spaced evenly between
+    the low and the high end of the map. It is stored as a lookup table of
+    size entries, with the colors linearly interpolated in between, so that
+    whole numpy arrays can be colored at once with a single indexing
+    operation.
+
+    Values that are NaN or infinite are given the bad color, which defaults
+    to fully transparent.
+
+    The following named Colormaps are available through getColormap():
+
+    ===========     ===
+    Name
+    ===========     ===
+    gray
+    hot
+    cool
+    jet
+    viridis
+    ===========     ===
+    """
+
+    def __init__(self, colors, size=256, bad=(0, 0, 0, 0)):
+        """
+        **Constructor**
+
+        colors
+            A list of at least two colors, in any Color format. The first is
+            used for the low end of the map and the last for the high end.
+
+        size
+            The number of entries in the lookup table.
+
+        bad
+            The color, in any Color format, for values that are not finite.
+        """
+
+        self._size = max(int(size), 2)
+
+        anchors = np.array([Color(c).rgba() for c in colors], dtype=float)
+        positions = np.linspace(0.0, 1.0, len(anchors))
+        samples = np.linspace(0.0, 1.0, self._size)
+
+        rgba = np.empty((self._size + 1, 4), dtype=np.uint8)
+        for i in range(4):
+            rgba[:-1, i] = np.round(np.interp(samples, positions, anchors[:, i]))
+
+        # The last entry is used for bad values
+        rgba[-1] = Color(bad).rgba()
+
+        self._rgba = rgba
+
+        # The same table packed into 32-bit 0xAARRGGBB values, which is the
+        # pixel format the canvas uses for images
+        rgba = rgba.astype(np.uint32)
+        self._argb = (rgba[:, 3] << 24) | (rgba[:, 0] << 16) | (rgba[:, 1] << 8) | rgba[:, 2]
+
+    def size(self):
+        """Return the number of colors in the lookup table."""
+        return self._size
+
+    def indices(self, values, vmin, vmax):
+        """
+        Return a numpy array of lookup table indices for values, which can be
+        any array of numbers. vmin is mapped to the first color and vmax to
+        the last; values outside of that range are clipped. Values that are
+        not finite get the index size(), which is the bad color.
+        """
+
+        values = np.asarray(values, dtype=float)
+
+        scale = 0.0
+        if vmax != vmin:
+            scale = (self._size - 1) / float(vmax - vmin)
+
+        with np.errstate(invalid='ignore'):
+            scaled = (values - vmin) * scale
+        bad = ~np.isfinite(scaled)
+        scaled[bad] = 0
+
+        indices = np.clip(np.round(scaled), 0, self._size - 1).astype(np.intp)
+        indices[bad] = self._size
+        return indices
+
+    def argb(self, values, vmin, vmax):
+        """
+        Return a numpy array of 32-bit 0xAARRGGBB colors for values. See
+        Colormap.indices().
+        """
+        return self._argb[self.indices(values, vmin, vmax)]
+
+    def rgba(self, values, vmin, vmax):
+        """
+        Return a numpy array of RGBA colors for values, with an extra last
+        dimension of length 4. See Colormap.indices().
+        """
+        return self._rgba[self.indices(values, vmin, vmax)]
+
+    def color(self, value, vmin, vmax):
+        """Return the Color for a single value."""
+        return Color([int(v) for v in self.rgba([value], vmin, vmax)[0]])
+
+    def argbTable(self):
+        """
+        Return the lookup table of 32-bit 0xAARRGGBB colors. It has size() + 1
+        entries; the last one is the bad color.
+        """
+        return self._argb
+
+
+_colormaps = {'gray': ['black', 'white'],
+              'hot': ['black', (230, 0, 0), (255, 210, 0), 'white'],
+              'cool': [(0, 255, 255), (255, 0, 255)],
+              'jet': [(0, 0, 128), 'blue', (0, 255, 255), (255, 255, 0), 'red', (128, 0, 0)],
+              'viridis': ['#440154', '#3b528b', '#21918c', '#5ec962', '#fde725'],
+             }
+
+def getColormap(colormap):
+    """
+    Return a Colormap. colormap can be a Colormap instance, which is returned
+    as it is, or the name of one of the named Colormaps. An unknown name
+    gives the gray Colormap.
+    """
+
+    if isinstance(colormap, Colormap):
+        return colormap
+    return Colormap(_colormaps.get(colormap, _colormaps['gray']))
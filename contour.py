@@ -0,0 +1,318 @@
+
+import numpy as np
+
+from dataartist import DataArtist
+from colormap import getColormap
+from color import Color
+
+# Corners of a cell are numbered 1 (bottom-left), 2 (bottom-right),
+# 4 (top-right) and 8 (top-left), and a cell's case is the sum of the corners
+# that are at or above the level. Its edges are numbered 0 (bottom),
+# 1 (right), 2 (top) and 3 (left). For each case, these are the pairs of
+# edges that the contour crosses, with -1 for no pair. Cases 16 and 17 are
+# the saddles 5 and 10 when the center of the cell is at or above the level.
+_caseEdges = -np.ones((18, 2, 2), dtype=np.intp)
+for (case, pairs) in {1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)],
+                      5: [(3, 0), (1, 2)], 6: [(0, 2)], 7: [(3, 2)], 8: [(2, 3)],
+                      9: [(0, 2)], 10: [(0, 1), (2, 3)], 11: [(1, 2)], 12: [(3, 1)],
+                      13: [(0, 1)], 14: [(3, 0)],
+                      16: [(0, 1), (2, 3)], 17: [(3, 0), (1, 2)]}.items():
+    for (k, pair) in enumerate(pairs):
+        _caseEdges[case, k] = pair
+
+def marchingSquares(z, level):
+    """
+    Find the contour of the 2-D array z at level with marching squares.
+
+    The whole grid is processed with numpy operations. Cells that have a
+    NaN corner are skipped.
+
+    Return a 2-tuple of (points, ids). points is an array of shape (n, 2, 2)
+    holding the two end points of each of the n contour segments, as (column,
+    row) positions in z. ids is an array of shape (n, 2) that identifies the
+    grid edge each end point is on; segments that meet have the same id at
+    the point where they meet.
+    """
+
+    z = np.asarray(z, dtype=float)
+    (rows, cols) = z.shape
+    if rows < 2 or cols < 2:
+        return np.zeros((0, 2, 2)), np.zeros((0, 2), dtype=np.intp)
+
+    bl = z[:-1, :-1]
+    br = z[:-1, 1:]
+    tr = z[1:, 1:]
+    tl = z[1:, :-1]
+
+    # Compare the grid with the level once, and build the cases from the
+    # shifted comparisons
+    with np.errstate(invalid='ignore'):
+        above = (z >= level).view(np.uint8)
+    case = above[:-1, :-1].copy()
+    case |= above[:-1, 1:] << 1
+    case |= above[1:, 1:] << 2
+    case |= above[1:, :-1] << 3
+
+    nan = np.isnan(z)
+    if nan.any():
+        case[nan[:-1, :-1] | nan[:-1, 1:] | nan[1:, 1:] | nan[1:, :-1]] = 0
+
+    (r, c) = np.nonzero(((case + 1) & 15) > 1)
+    case = case[r, c].astype(np.intp)
+
+    # Resolve the saddles by the value at the center of the cell
+    z00 = bl[r, c]
+    z01 = br[r, c]
+    z11 = tr[r, c]
+    z10 = tl[r, c]
+    centerHigh = (z00 + z01 + z11 + z10) / 4.0 >= level
+    case[(case == 5) & centerHigh] = 16
+    case[(case == 10) & centerHigh] = 17
+
+    # Where the contour crosses each edge of each cell
+    with np.errstate(divide='ignore', invalid='ignore'):
+        edgeX = np.column_stack((c + (level - z00) / (z01 - z00),
+                                 c + 1.0,
+                                 c + (level - z10) / (z11 - z10),
+                                 c + 0.0))
+        edgeY = np.column_stack((r + 0.0,
+                                 r + (level - z01) / (z11 - z01),
+                                 r + 1.0,
+                                 r + (level - z00) / (z10 - z00)))
+
+    # Horizontal edges are numbered first, then vertical edges
+    vertical = rows * (cols - 1)
+    edgeIds = np.column_stack((r * (cols - 1) + c,
+                               vertical + r * cols + c + 1,
+                               (r + 1) * (cols - 1) + c,
+                               vertical + r * cols + c))
+
+    points = []
+    ids = []
+    for k in range(2):
+        edges = _caseEdges[case, k]
+        has = edges[:, 0] >= 0
+        cells = np.flatnonzero(has)
+        a = edges[has, 0]
+        b = edges[has, 1]
+        points.append(np.dstack((np.column_stack((edgeX[cells, a], edgeX[cells, b])),
+                                 np.column_stack((edgeY[cells, a], edgeY[cells, b])))))
+        ids.append(np.column_stack((edgeIds[cells, a], edgeIds[cells, b])))
+
+    return np.concatenate(points), np.concatenate(ids)
+
+def stitch(points, ids):
+    """
+    Join the segments returned by marchingSquares() into lines.
+
+    Return an array of shape (k, 2) of points, where each line is followed by
+    a row of NaN. Closed contours end with the point they start at.
+    """
+
+    m = len(points)
+    if m == 0:
+        return np.zeros((0, 2))
+
+    # Every end point is numbered: segment s has end points s and s + m.
+    # Find the end point that each end point meets, or -1.
+    ends = np.concatenate((ids[:, 0], ids[:, 1]))
+    order = np.argsort(ends, kind='mergesort')
+    same = np.flatnonzero(ends[order][1:] == ends[order][:-1])
+    partner = -np.ones(2 * m, dtype=np.intp)
+    partner[order[same]] = order[same + 1]
+    partner[order[same + 1]] = order[same]
+
+    coords = np.concatenate((points[:, 0, :], points[:, 1, :]))
+    partner = partner.tolist()
+
+    # Walk along each line, starting with the lines that have a loose end,
+    # and then the closed ones.
+    visited = [False] * m
+    starts = [p for p in xrange(2 * m) if partner[p] == -1] + range(m)
+    lines = []
+    for p in starts:
+        s = p % m
+        if visited[s]:
+            continue
+
+        line = []
+        while True:
+            visited[s] = True
+            q = (p + m) % (2 * m)
+            if not line:
+                line.append(p)
+            line.append(q)
+            p = partner[q]
+            if p == -1:
+                break
+            s = p % m
+            if visited[s]:
+                break
+        lines.append(line)
+        lines.append([-1])
+
+    indices = np.concatenate(lines)
+    result = coords[np.maximum(indices, 0)]
+    result[indices < 0] = np.nan
+    return result
+
+
+class Contour(DataArtist):
+    """
+    Draw contour lines of a 2-D array of values.
+
+    The array is indexed as z[row, column], with columns along the x Axis and
+    rows along the y Axis. The contour lines are found with a vectorized
+    marching squares pass and joined into lines. Each level is drawn as one
+    canvas item.
+
+    The lines of each level are found once, in data coordinates, and kept
+    until the data changes, so zooming and panning only map them to the
+    screen again.
+
+    ======================  =================   =======
+    Property                Possible Values     Description
+    ======================  =================   =======
+    width                   int (1)             The width of the contour lines.
+    ======================  =================   =======
+    """
+
+    def __init__(self, canvas, z, x=None, y=None, levels=10, colormap='viridis', xaxis=None, yaxis=None, plot=None, **kwprops):
+        """
+        **Constructor**
+
+        z
+            A 2-D array of numbers. Cells with a NaN corner have no contours.
+
+        x, y
+            The data coordinates of the columns and the rows of z, as
+            sequences in increasing or decreasing order. If None, then the
+            column and row numbers are used.
+
+        levels
+            Either the number of levels, which are spaced evenly between the
+            minimum and maximum of z, or a sequence of levels.
+
+        colormap
+            A Colormap, or the name of one, to color the levels with, or a
+            Color to use for all of them.
+        """
+
+        initialProperties = {'width': 1}
+        initialProperties.update(kwprops)
+
+        DataArtist.__init__(self, canvas, xaxis, yaxis, plot, **initialProperties)
+
+        self._levelSpec = levels
+        self._lines = {}
+
+        self.setData(z, x, y)
+        self.setColormap(colormap)
+
+    def setData(self, z, x=None, y=None):
+        """Set the data. See the constructor."""
+
+        z = np.asarray(z, dtype=float)
+        if z.ndim != 2:
+            return
+
+        self._z = z
+        (rows, cols) = z.shape
+
+        if x is None:
+            x = np.arange(cols)
+        if y is None:
+            y = np.arange(rows)
+        self._xCoords = np.asarray(x, dtype=float)
+        self._yCoords = np.asarray(y, dtype=float)
+
+        self._lines = {}
+        self._cached = None
+        self.setLevels(self._levelSpec)
+
+    def setLevels(self, levels=10):
+        """Set the levels. See the constructor."""
+
+        self._levelSpec = levels
+        if isinstance(levels, int):
+            finite = self._z[np.isfinite(self._z)]
+            if len(finite) == 0:
+                self._levels = []
+            else:
+                self._levels = list(np.linspace(finite.min(), finite.max(), levels + 2)[1:-1])
+        else:
+            self._levels = sorted(float(level) for level in levels)
+        self._cached = None
+
+    def levels(self):
+        """Return the list of levels."""
+        return self._levels
+
+    def setColormap(self, colormap):
+        """
+        Set the Colormap, or a Color for all the levels. See the
+        constructor.
+        """
+        if isinstance(colormap, Color):
+            self._colormap = colormap
+        else:
+            self._colormap = getColormap(colormap)
+
+    def levelColor(self, level):
+        """Return the Color that level is drawn in."""
+
+        if isinstance(self._colormap, Color):
+            return self._colormap
+        if len(self._levels) < 2:
+            return self._colormap.color(0.5, 0, 1)
+        return self._colormap.color(level, self._levels[0], self._levels[-1])
+
+    def dataExtent(self):
+        if len(self._xCoords) == 0 or len(self._yCoords) == 0:
+            return None
+        return (self._xCoords.min(), self._xCoords.max(), self._yCoords.min(), self._yCoords.max())
+
+    def lines(self, level):
+        """
+        Return the contour lines at level, in data coordinates, as an array
+        of shape (k, 2) with a row of NaN after each line. The result is
+        cached until the data changes.
+        """
+
+        if level not in self._lines:
+            points, ids = marchingSquares(self._z, level)
+            lines = stitch(points, ids)
+
+            # Grid positions to data coordinates
+            cols = np.arange(len(self._xCoords))
+            rows = np.arange(len(self._yCoords))
+            data = np.empty(lines.shape)
+            data[:, 0] = np.interp(lines[:, 0], cols, self._xCoords)
+            data[:, 1] = np.interp(lines[:, 1], rows, self._yCoords)
+            data[np.isnan(lines)] = np.nan
+
+            self._lines[level] = data
+        return self._lines[level]
+
+    def _compute(self, xaxis, yaxis):
+        # The contour lines of every level, mapped to plot coordinates
+        mapped = []
+        for level in self._levels:
+            lines = self.lines(level)
+            if len(lines) == 0:
+                continue
+            points = np.column_stack((xaxis.mapDataArrayToPlot(lines[:, 0]),
+                                      yaxis.mapDataArrayToPlot(lines[:, 1])))
+            mapped.append((level, points))
+        return mapped
+
+    def _draw(self, prepared=None):
+        region = self.plot().axesRegion()
+
+        props = dict(self.props())
+        items = []
+        for (level, points) in self.preparedResult(prepared):
+            props.update(color=self.levelColor(level))
+            items.append(self.canvas().drawPolyline(points, region[0], region[1], clipPath=region,
+                                                    item=self._oldItem(len(items)), **props))
+        return items
@@ -0,0 +1,252 @@
+
+from artist import Artist
+from axis import Axis
+
+class DataArtist(Artist):
+    """
+    Base class for Artists that draw data on a CartesianPlot, such as images
+    and histograms.
+
+    Like a DataPair, a DataArtist is drawn in reference to an x Axis and a y
+    Axis, and it reports the extent of its data so that autoscaled axes fit
+    it. Unlike a DataPair, it draws itself as a single Artist, usually with
+    one canvas primitive.
+
+    A DataArtist is added to a plot with CartesianPlot.addDataArtist(). It is
+    drawn in the same two phases as the rest of the plot: prepare() does the
+    work that does not need the canvas, and can be run outside the GUI thread,
+    and draw() puts the result on the canvas.
+    """
+
+    def __init__(self, canvas, xaxis=None, yaxis=None, plot=None, **kwprops):
+        """
+        **Constructor**
+
+        xaxis, yaxis
+            The Axis instances that this data will be drawn in reference to.
+            If they are None, then the plot's default axes are used when the
+            DataArtist is added to a plot.
+        """
+
+        Artist.__init__(self, canvas, **kwprops)
+
+        self._cached = None     # (key, result); see DataArtist.compute()
+
+        self.setXAxis(xaxis)
+        self.setYAxis(yaxis)
+        self.setPlot(plot)
+
+    def setXAxis(self, xaxis):
+        """Set the x axis."""
+        if isinstance(xaxis, Axis):
+            self._xaxis = xaxis
+        else:
+            self._xaxis = None
+
+    def setYAxis(self, yaxis):
+        """Set the y axis."""
+        if isinstance(yaxis, Axis):
+            self._yaxis = yaxis
+        else:
+            self._yaxis = None
+
+    def xAxis(self):
+        """Return the x Axis instance."""
+        return self._xaxis
+
+    def yAxis(self):
+        """Return the y Axis instance."""
+        return self._yaxis
+
+    def setPlot(self, plot):
+        """Set the plot this DataArtist is attached to."""
+        self._plot = plot
+
+    def plot(self):
+        return self._plot
+
+    def dataExtent(self):
+        """
+        Return the extent of the data as a 4-tuple of (minX, maxX, minY, maxY)
+        in data coordinates, or None if there is no data. Must be overwritten
+        in the subclass.
+        """
+        return None
+
+    def xExtent(self, inSubRegion=False):
+        """
+        Return a 2-tuple of the (minimum, maximum) x values, which are None
+        if there is no data. inSubRegion is accepted for compatibility with
+        DataPair; the whole extent is always used.
+        """
+        extent = self.dataExtent()
+        if extent is None:
+            return (None, None)
+        return extent[0:2]
+
+    def yExtent(self, inSubRegion=False):
+        """Return a 2-tuple of the (minimum, maximum) y values. See xExtent()."""
+        extent = self.dataExtent()
+        if extent is None:
+            return (None, None)
+        return extent[2:4]
+
+    def minXValue(self, inSubRegion=False):
+        """
+        Return the minimum x value, or None if there is no data.
+
+        inSubRegion is accepted for compatibility with DataPair; the whole
+        extent is always used.
+        """
+        extent = self.dataExtent()
+        if extent is not None:
+            return extent[0]
+
+    def maxXValue(self, inSubRegion=False):
+        """Return the maximum x value, or None if there is no data."""
+        extent = self.dataExtent()
+        if extent is not None:
+            return extent[1]
+
+    def minYValue(self, inSubRegion=False):
+        """Return the minimum y value, or None if there is no data."""
+        extent = self.dataExtent()
+        if extent is not None:
+            return extent[2]
+
+    def maxYValue(self, inSubRegion=False):
+        """Return the maximum y value, or None if there is no data."""
+        extent = self.dataExtent()
+        if extent is not None:
+            return extent[3]
+
+    def preparedAxes(self, prepared):
+        """
+        Return a 2-tuple of the (x, y) axes to map the data with when
+        preparing it: the snapshots of the axes in prepared (see
+        Axis.prepareMapping()), or the axes themselves if they are not in it.
+        """
+        xaxis = self.xAxis()
+        yaxis = self.yAxis()
+        return (prepared.get(xaxis, xaxis), prepared.get(yaxis, yaxis))
+
+    def linePoints(self, xaxis=None, yaxis=None):
+        """
+        Return the lines that this DataArtist draws, in plot coordinates, as
+        a numpy array of shape (k, 2) with a row of NaN between one line and
+        the next, or None if it does not draw lines. This is used to
+        accumulate the lines of a plot into one image; see Accumulation.
+        xaxis and yaxis are the axes to map with, if not the DataArtist's
+        own. Returns None by default.
+        """
+        return None
+
+    def cacheKey(self, xaxis, yaxis):
+        """
+        Return the key that the result of compute() is cached under for the
+        given axes. The result is computed again whenever the key changes, or
+        when self._cached is set to None.
+
+        By default, the key is how the axes map (see Axis.mappingKey()). A
+        subclass should add anything else the result depends on.
+        """
+        return (xaxis.mappingKey(), yaxis.mappingKey())
+
+    def compute(self, xaxis=None, yaxis=None):
+        """
+        Return what this DataArtist draws, in plot coordinates, as returned
+        by _compute(). The result is cached until cacheKey() changes.
+
+        xaxis and yaxis are the axes to map with, if not the axes of this
+        DataArtist; see DataArtist.preparedAxes().
+        """
+
+        if xaxis is None:
+            xaxis = self.xAxis()
+        if yaxis is None:
+            yaxis = self.yAxis()
+
+        key = self.cacheKey(xaxis, yaxis)
+        cached = self._cached
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        result = self._compute(xaxis, yaxis)
+        self._cached = (key, result)
+        return result
+
+    def _compute(self, xaxis, yaxis):
+        """
+        Do the work for drawing this DataArtist that does not need the canvas,
+        mapping the data with xaxis and yaxis, and return the result. Returns
+        None by default.
+
+        Nothing that the GUI thread uses should be changed, so that this can
+        be run outside the GUI thread.
+        """
+        return None
+
+    def prepare(self, prepared):
+        """
+        Compute the result for the axes in the prepared dictionary (see
+        DataArtist.preparedAxes()), and store it there under self, to be
+        drawn by _draw().
+        """
+        prepared[self] = self.compute(*self.preparedAxes(prepared))
+
+    def preparedResult(self, prepared):
+        """
+        Return the result stored in prepared by prepare(), or compute it for
+        the current axes if prepared is None or does not hold one.
+        """
+        if prepared is not None and self in prepared:
+            return prepared[self]
+        return self.compute()
+
+
+class DataPairArtist(DataArtist):
+    """
+    Base class for DataArtists that decorate a DataPair, such as ErrorBars.
+
+    A DataPairArtist always uses the DataPair's axes, and draws only at the
+    points that the DataPair draws (see DataPair.visibleIndices()), so it is
+    cut down and decimated the same way as the DataPair. It must still be
+    added to the plot with CartesianPlot.addDataArtist(), after the DataPair.
+    """
+
+    def __init__(self, canvas, datapair, **kwprops):
+        """
+        **Constructor**
+
+        datapair
+            The DataPair to attach to.
+        """
+
+        DataArtist.__init__(self, canvas, **kwprops)
+        self._datapair = datapair
+
+    def datapair(self):
+        """Return the DataPair this is attached to."""
+        return self._datapair
+
+    def xAxis(self):
+        """Return the DataPair's x Axis instance."""
+        return self._datapair.xAxis()
+
+    def yAxis(self):
+        """Return the DataPair's y Axis instance."""
+        return self._datapair.yAxis()
+
+    def plot(self):
+        """Return the DataPair's plot, if there is one, or else this one's."""
+        if self._datapair.plot() is not None:
+            return self._datapair.plot()
+        return self._plot
+
+    def cacheKey(self, xaxis, yaxis):
+        """
+        Return the key of DataArtist.cacheKey() with the DataPair's
+        DataPair.dataKey() added, so that the result is computed again when
+        the DataPair's data changes.
+        """
+        return DataArtist.cacheKey(self, xaxis, yaxis) + (self._datapair.dataKey(),)
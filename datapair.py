@@ -5,6 +5,9 @@ from line import Line
 from axis import Axis
 from color import Color
 from marker import *
+from ticker import epochSeconds
+
+import numpy as np
 
 def subsetOfData(data, region, start, end):
     """
@@ -13,21 +16,280 @@ def subsetOfData(data, region, start, end):
 
     More specifically, start and end correspond to range limits in region.
     For every entry in range that is between start and end, the corresponding entry
-    in data is returned in a list.
+    in data is returned in a numpy array.
+    """
+
+    data = np.asarray(data)
+    region = np.asarray(region)
+    n = min(len(data), len(region))
+    with np.errstate(invalid='ignore'):
+        return data[:n][(region[:n] >= start) & (region[:n] <= end)]
+
+def fillGaps(xs):
+    """
+    Return a copy of the numpy array xs where every value that is not
+    finite is replaced by the last finite value before it, or by the first
+    finite value if there is none before it. If xs was sorted apart from its
+    gaps, then the result is sorted, so it can be searched and bucketed.
+    """
+
+    xs = np.where(np.isfinite(xs), xs, np.nan)
+    filled = np.fmax.accumulate(xs)
+    finite = np.flatnonzero(np.isfinite(filled))
+    if len(finite) == 0:
+        return np.zeros(len(xs))
+    filled[:finite[0]] = filled[finite[0]]
+    return filled
+
+def finiteExtreme(values, ufunc):
+    """
+    Reduce the finite values in the numpy array values with ufunc (such as
+    np.fmin or np.fmax). Return None if there are no finite values.
     """
 
-    subset = []
-    for i in range(len(region)):
-        if region[i] >= start and region[i] <= end:
-            subset.append(data[i])
+    if len(values) == 0:
+        return None
+
+    # ufunc skips NaN already, so the infinite values only need to be taken
+    # out if one of them wins
+    result = ufunc.reduce(values)
+    if np.isinf(result):
+        result = ufunc.reduce(np.where(np.isinf(values), np.nan, values))
+    if np.isnan(result):
+        return None
+    return float(result)
+
+def decimate(xs, ys, buckets):
+    """
+    Reduce a series to the points that are needed to draw it at a given
+    resolution.
+
+    xs and ys are numpy arrays of plot coordinates, and the finite values of
+    xs must be sorted in ascending order. The x range is split into the given
+    number of buckets (normally one per pixel), and for each bucket the first,
+    last, minimum and maximum points are kept. Drawing the kept points gives
+    the same envelope as drawing every point, so the output looks the same on
+    screen.
+
+    Points where xs or ys is not finite are gaps in the series. The first gap
+    in each bucket is kept as well, so the series is still split there.
+
+    Returns a sorted numpy array of indices into xs and ys.
+    """
+
+    n = len(xs)
+    if n <= 4 * buckets or buckets < 1:
+        return np.arange(n)
+
+    gaps = ~(np.isfinite(xs) & np.isfinite(ys))
+    hasGaps = np.any(gaps)
+    if hasGaps:
+        xs = fillGaps(xs)
+        ys = np.where(gaps, np.nan, ys)
+
+    span = xs[-1] - xs[0]
+    if not span > 0:
+        return np.arange(n)
+
+    b = ((xs - xs[0]) * (buckets / span)).astype(int)
+
+    # Each bucket is a contiguous run of indices because xs is sorted
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(b)) + 1))
+    ends = np.concatenate((starts[1:], [n])) - 1
+    counts = ends - starts + 1
+
+    # The first index in each bucket where the bucket's extreme is reached
+    def extremeIndices(ufunc):
+        extremes = np.repeat(ufunc.reduceat(ys, starts), counts)
+        with np.errstate(invalid='ignore'):
+            hits = np.flatnonzero(ys == extremes)
+        keep = np.concatenate(([True], b[hits][1:] != b[hits][:-1]))
+        return hits[keep]
+
+    # np.fmin and np.fmax skip the gaps
+    parts = [starts, ends, extremeIndices(np.fmin), extremeIndices(np.fmax)]
+    if hasGaps:
+        hits = np.flatnonzero(gaps)
+        keep = np.concatenate(([True], b[hits][1:] != b[hits][:-1]))
+        parts.append(hits[keep])
+
+    return np.unique(np.concatenate(parts))
+
+
+class Column(object):
+    """
+    A column of data that can be shared by several DataPairs, such as the x
+    data of many series that are sampled at the same times.
+
+    The work that only depends on the values of the column and on an Axis is
+    done once for all the DataPairs that use the column: its extent is found
+    once, and its values are mapped to plot coordinates once per Axis
+    mapping (see Axis.mappingKey()), however many DataPairs are drawn with
+    it.
+
+    DataPairs keep a reference to the Column, so setting new values in it
+    updates all of them.
+    """
+
+    # The number of mappings that are kept at the same time. A column is
+    # usually only drawn on one or two axes.
+    _mappedLimit = 8
+
+    def __init__(self, values=[]):
+        """
+        **Constructor**
+
+        values
+            A list, tuple or numpy array of numbers. They are stored the same
+            way as the data of a DataPair; see DataPair.
+        """
+        self._version = 0
+        self._extent = None
+        self.setValues(values)
+
+    def setValues(self, values):
+        """Set the values, and forget everything computed from the old ones."""
+
+        self._values = epochSeconds(values)
+
+        # Only sorted data can be searched and decimated. Gaps are skipped,
+        # and a copy of the values with the gaps filled in is kept to search
+        # in.
+        finite = np.isfinite(self._values)
+        self._search = self._values
+        if np.all(finite):
+            self._sorted = bool(np.all(self._values[1:] >= self._values[:-1]))
+        else:
+            values = self._values[finite]
+            self._sorted = bool(np.all(values[1:] >= values[:-1]))
+            if self._sorted:
+                self._search = fillGaps(self._values)
+
+        self._mapped = {}
+        self._version += 1
+
+    def append(self, values):
+        """
+        Add values to the end of the column. The extent and the sortedness
+        are updated from the new values alone, so appending to a long
+        column does not scan it again.
+
+        If the Column is shared, then the values are added for every
+        DataPair that uses it.
+        """
+
+        values = epochSeconds(values)
+        if len(values) == 0:
+            return
+
+        old = self._values
+        (low, high) = self.extent()
+        if low is None:
+            # No finite values yet, so there is nothing to build on
+            self.setValues(np.concatenate((old, values)))
+            return
+
+        self._values = np.concatenate((old, values))
+
+        finite = values[np.isfinite(values)]
+        if self._sorted:
+            # The last finite value of sorted data is its maximum
+            self._sorted = bool(np.all(finite[1:] >= finite[:-1])) and \
+                           (len(finite) == 0 or finite[0] >= high)
+        if not self._sorted:
+            self._search = self._values
+        elif self._search is old and len(finite) == len(values):
+            self._search = self._values
+        else:
+            self._search = np.concatenate((self._search, fillGaps(np.concatenate(([high], values)))[1:]))
+
+        self._mapped = {}
+        self._version += 1
+
+        if len(finite) > 0:
+            self._extent = (self._version, (min(low, float(finite.min())), max(high, float(finite.max()))))
+
+    def version(self):
+        """
+        Return a number that changes every time new values are set, so that
+        the users of the Column can tell when to forget what they computed
+        from it.
+        """
+        return self._version
+
+    def values(self):
+        """Return the values as a numpy array of floats."""
+        return self._values
+
+    def __len__(self):
+        return len(self._values)
+
+    def isSorted(self):
+        """
+        Return whether the finite values are sorted in ascending order.
+        """
+        return self._sorted
+
+    def searchValues(self):
+        """
+        Return the values with every gap filled in by the value before it, so
+        that they can be searched with np.searchsorted() if they are sorted.
+        """
+        return self._search
+
+    def extent(self):
+        """
+        Return a 2-tuple of the (minimum, maximum) finite values. Either is
+        None if there are no finite values. The result is cached until the
+        values change.
+        """
+
+        # The cache is kept with the version it was found for, in a single
+        # attribute, so that it stays right when the Column is read from
+        # another thread while the values are set
+        cached = self._extent
+        if cached is not None and cached[0] == self._version:
+            return cached[1]
+
+        version = self._version
+        values = self._values
+        extent = (finiteExtreme(values, np.fmin), finiteExtreme(values, np.fmax))
+        self._extent = (version, extent)
+        return extent
+
+    def mapped(self, axis, first=0, last=None):
+        """
+        Return the values from first up to last mapped to plot coordinates by
+        axis, as a numpy array. The result is cached until the values or the
+        mapping of axis change, and is shared with every other caller that
+        maps the same part of the column with the same mapping, so it must
+        not be modified.
+        """
+
+        # The version is read before the values, so that values set in the
+        # meantime by another thread are never cached under a newer version
+        version = self._version
+        values = self._values
+        if last is None:
+            last = len(values)
 
-    return subset
+        key = (version, axis.mappingKey(), first, last)
+        mapped = self._mapped
+        if key not in mapped:
+            if len(mapped) >= self._mappedLimit:
+                mapped = self._mapped = {}
+            mapped[key] = axis.mapDataArrayToPlot(values[first:last])
+        return mapped[key]
 
 
 class DataPair(object):
     """
     Represents a 2-D set of data. Contains the X and Y data, pointers to the
     x and y axes, and maintains the lines and markers that are drawn.
+
+    The lines are drawn as one canvas item, with gaps where the data has
+    gaps, and the markers are drawn as one more, so that a DataPair costs the
+    canvas two items however many points it has.
     """
     
     def __init__(self, canvas, x, y, formatString='', plot=None, xaxis=None, yaxis=None, linesVisible=True, markersVisible=True, lineProps={}, markerProps={}):
@@ -35,9 +297,12 @@ class DataPair(object):
         **Constructor**
 
         x, y
-            lists of something that can be plotted. Normally these are numbers, but
-            they can be anything that Axis.mapDataToPlot(), min(), and max() can
-            interpret.
+            lists, tuples or numpy arrays of numbers. They are stored internally
+            as numpy arrays of floats. None, NaN and infinite values are gaps:
+            no marker is drawn there, and the lines are split into separate
+            runs on either side. numpy datetime64 arrays are stored as seconds
+            since the Unix epoch; see Axis.setTime(). x and y can also be
+            Columns that are shared with other DataPairs; see Column.
 
         formatString
             a string that specifies some simple line and marker properties. An example is
@@ -50,14 +315,13 @@ class DataPair(object):
 
         linesVisible, markersVisible
             Specify whether the lines and markers should be visible universally for this
-            datapair. Individual lines or markers can be hidden by updating those
-            individual objects. These attributes are used to be more efficient if some
+            datapair. These attributes are used to be more efficient if some
             things are not going to be drawn. If the lines or markers are changed from
             hidden to visible, the DataPair.makeLinesAndMarkers should be called before
             calling DataPair.draw or else they may not appear.
 
         lineProps, markerProps
-            Properties for the line segments and markers that are drawn.
+            Properties for the lines and markers that are drawn.
         """
 
         self._canvas = canvas
@@ -67,6 +331,20 @@ class DataPair(object):
         self._linesVisible = linesVisible
         self._markersVisible = markersVisible
         self._markerClass = CircleMarker
+        self._line = None           # Line that holds the line properties
+        self._marker = None         # Marker that draws all the markers
+        self._drawnLine = None      # points of the lines, with NaN rows at gaps
+        self._drawnMarkers = None   # positions of the markers
+        self._lineItem = None       # canvas items of the last draw
+        self._markerItem = None
+        self._group = None
+        self._isVisible = True
+        # The caches below each hold the key they were made for together
+        # with the result, so that they can be read and written from the
+        # thread that prepares the Figure as well as the GUI thread
+        self._subExtents = None      # (dataKey(), {(which, data range of the other Axis): extent})
+        self._visibleCache = None    # (key, result of _visible())
+        self._linePoints = None      # (result of _visible(), linesVisible(), points)
 
         self.setX(x)
         self.setY(y)
@@ -81,15 +359,103 @@ class DataPair(object):
     def canvas(self):
         return self._canvas
 
+    def canvasGroup(self):
+        """
+        Return the canvas group that the lines and markers are drawn into,
+        making it the first time this is called. Removing or hiding the group
+        removes or hides the whole series at once.
+        """
+        if self._group is None:
+            self._group = self.canvas().makeGroup()
+        return self._group
+
+    def setVisible(self, v=True):
+        """
+        Set whether to draw this DataPair. The lines and markers that are
+        on the canvas are shown or hidden at once.
+        """
+        if isinstance(v, bool):
+            self._isVisible = v
+            if self._group is not None:
+                self.canvas().setGroupVisible(self._group, v)
+            elif not v:
+                self.remove()
+
+    def setInvisible(self):
+        """Hide this DataPair."""
+        self.setVisible(False)
+
+    def isVisible(self):
+        """Return whether this DataPair will be drawn."""
+        return self._isVisible
+
     def setX(self, x):
-        """Set the x data."""
-        if isinstance(x, list):
-            self._x = x
+        """
+        Set the x data. x can be a Column, which is then shared with every
+        other DataPair that uses it (see Column).
+        """
+        if isinstance(x, Column):
+            self._xColumn = x
+        elif isinstance(x, (list, tuple, np.ndarray)):
+            self._xColumn = Column(x)
+        self._visibleCache = None
 
     def setY(self, y):
-        """Set the y data."""
-        if isinstance(y, list):
-            self._y = y
+        """Set the y data. Like the x data, y can be a Column."""
+        if isinstance(y, Column):
+            self._yColumn = y
+        elif isinstance(y, (list, tuple, np.ndarray)):
+            self._yColumn = Column(y)
+        self._visibleCache = None
+
+    def xColumn(self):
+        """Return the Column that holds the x data."""
+        return self._xColumn
+
+    def yColumn(self):
+        """Return the Column that holds the y data."""
+        return self._yColumn
+
+    def append(self, x, y):
+        """
+        Add points to the end of the data. x and y are sequences of the same
+        length.
+
+        If a Column is shared with other DataPairs, then the values are added
+        to it for all of them; see Column.append(). A shared Column that is
+        already longer than the other data, because the same points were
+        appended to it through another DataPair, only gets the values it is
+        missing. So after plot(x, y1, x, y2), the same x values can be
+        appended to both series, each with its own y values.
+
+        Raise a ValueError if x and y have different lengths, since the
+        points would no longer line up. This also applies to the x values of
+        a shared Column that already has them.
+        """
+
+        if len(x) != len(y):
+            raise ValueError('x and y must have the same length, not %d and %d' % (len(x), len(y)))
+
+        n = min(len(self._xColumn), len(self._yColumn)) + len(x)
+        for (column, values) in ((self._xColumn, x), (self._yColumn, y)):
+            missing = n - len(column)
+            if missing > 0:
+                column.append(values[len(values) - missing:])
+
+    def dataKey(self):
+        """
+        Return a tuple that changes whenever the x or y data changes, so that
+        things computed from the data can be cached.
+        """
+        return (self._xColumn, self._xColumn.version(), self._yColumn, self._yColumn.version())
+
+    @property
+    def _x(self):
+        return self._xColumn.values()
+
+    @property
+    def _y(self):
+        return self._yColumn.values()
 
     def setXAxis(self, xaxis):
         """Set the x axis."""
@@ -301,6 +667,57 @@ class DataPair(object):
         """Return the y Axis instance."""
         return self._yaxis
 
+    def xExtent(self, inSubRegion=False):
+        """
+        Return a 2-tuple of the (minimum, maximum) x values. See
+        DataPair.minXValue() for the meaning of inSubRegion.
+        """
+        return self._extent('x', inSubRegion)
+
+    def yExtent(self, inSubRegion=False):
+        """
+        Return a 2-tuple of the (minimum, maximum) y values. See
+        DataPair.minYValue() for the meaning of inSubRegion.
+        """
+        return self._extent('y', inSubRegion)
+
+    def _extent(self, which, inSubRegion):
+        """
+        Return the (minimum, maximum) of the x data if which is 'x', or of
+        the y data if it is 'y', ignoring values that are not finite.
+
+        The extent of all the data is cached by its Column. The extent within
+        the data range of the other Axis is cached here for each data range,
+        until the data changes, so autoscaling again with the same data and
+        ranges does not scan the data.
+        """
+
+        if which == 'x':
+            (column, other) = (self._xColumn, self.yAxis())
+        else:
+            (column, other) = (self._yColumn, self.xAxis())
+
+        if not inSubRegion or other is None or other.autoscaled():
+            return column.extent()
+
+        dataKey = self.dataKey()
+        (x, y) = (self._x, self._y)
+        cached = self._subExtents
+        if cached is None or cached[0] != dataKey or len(cached[1]) >= 8:
+            # Only the extents for the last few ranges are kept
+            cached = self._subExtents = (dataKey, {})
+        extents = cached[1]
+
+        dataRange = other.dataRange()
+        key = (which, dataRange)
+        if key not in extents:
+            if which == 'x':
+                values = subsetOfData(x, y, *dataRange)
+            else:
+                values = subsetOfData(y, x, *dataRange)
+            extents[key] = (finiteExtreme(values, np.fmin), finiteExtreme(values, np.fmax))
+        return extents[key]
+
     def maxXValue(self, inSubRegion=False):
         """
         Get the maximum value in the x data.
@@ -315,11 +732,12 @@ class DataPair(object):
 
         If the other axis is not currently defined, then this defaults to
         inSubRegion=False behavior.
+
+        Values that are not finite are ignored. Return None if there are no
+        finite values.
         """
 
-        if inSubRegion and self.yAxis() is not None and not self.yAxis().autoscaled():
-            return max(subsetOfData(self._x, self._y, *self.yAxis().dataRange()))
-        return max(self._x)
+        return self.xExtent(inSubRegion)[1]
 
     def maxYValue(self, inSubRegion=False):
         """
@@ -335,11 +753,12 @@ class DataPair(object):
 
         If the other axis is not currently defined, then this defaults to
         inSubRegion=False behavior.
+
+        Values that are not finite are ignored. Return None if there are no
+        finite values.
         """
 
-        if inSubRegion and self.xAxis() is not None and not self.xAxis().autoscaled():
-            return max(subsetOfData(self._y, self._x, *self.xAxis().dataRange()))
-        return max(self._y)
+        return self.yExtent(inSubRegion)[1]
 
     def minXValue(self, inSubRegion=False):
         """
@@ -355,11 +774,12 @@ class DataPair(object):
 
         If the other axis is not currently defined, then this defaults to
         inSubRegion=False behavior.
+
+        Values that are not finite are ignored. Return None if there are no
+        finite values.
         """
 
-        if inSubRegion and self.yAxis() is not None and not self.yAxis().autoscaled():
-            return min(subsetOfData(self._x, self._y, *self.yAxis().dataRange()))
-        return min(self._x)
+        return self.xExtent(inSubRegion)[0]
 
     def minYValue(self, inSubRegion=False):
         """
@@ -375,18 +795,149 @@ class DataPair(object):
 
         If the other axis is not currently defined, then this defaults to
         inSubRegion=False behavior.
+
+        Values that are not finite are ignored. Return None if there are no
+        finite values.
+        """
+
+        return self.yExtent(inSubRegion)[0]
+
+    def plotCoordinates(self):
+        """
+        Return the x and y data mapped to plot coordinates, as a 2-tuple of
+        numpy arrays.
+
+        Only the part of the data that can be seen is returned. If the x data
+        is sorted, then points outside of the x Axis' data range are dropped
+        before mapping (keeping one point on either side so that the lines
+        still reach the edge of the plot), and if more points remain than
+        there are pixels along the x Axis, the series is decimated so that at
+        most a few points per pixel are drawn.
+        """
+        return self._visible()[1:]
+
+    def visibleIndices(self):
+        """
+        Return a numpy array of the indices of the points that are returned
+        by DataPair.plotCoordinates(). Artists that are attached to this
+        DataPair, such as ErrorBars, use these so that they are cut down and
+        decimated the same way as the DataPair.
+        """
+        return self._visible()[0]
+
+    def preparedAxes(self, prepared):
+        """
+        Return a 2-tuple of the (x, y) axes to map the data with when
+        preparing it: the snapshots of the axes in prepared (see
+        Axis.prepareMapping()), or the axes themselves if they are not in it.
+        """
+        xaxis = self.xAxis()
+        yaxis = self.yAxis()
+        return (prepared.get(xaxis, xaxis), prepared.get(yaxis, yaxis))
+
+    def _visible(self, xaxis=None, yaxis=None):
+        """
+        Return a 3-tuple of (indices, x plot coordinates, y plot coordinates)
+        for the points that can be seen. The result is cached until the data
+        or the axes change.
+
+        xaxis and yaxis are the axes to map the data with, if not the
+        DataPair's own; see DataPair.preparedAxes().
         """
 
-        if inSubRegion and self.xAxis() is not None and not self.xAxis().autoscaled():
-            return min(subsetOfData(self._y, self._x, *self.xAxis().dataRange()))
-        return min(self._y)
+        if xaxis is None:
+            xaxis = self.xAxis()
+        if yaxis is None:
+            yaxis = self.yAxis()
+
+        # The data key is part of the key, so that setting new values in a
+        # shared Column is noticed
+        xColumn = self._xColumn
+        yColumn = self._yColumn
+        key = (xaxis.mappingKey(), yaxis.mappingKey(), self.dataKey())
+        cached = self._visibleCache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        n = min(len(xColumn), len(yColumn))
+        first = 0
+        last = n
+
+        if xColumn.isSorted() and n > 0:
+            start, end = xaxis.dataRange()
+            search = xColumn.searchValues()[:n]
+            first = max(np.searchsorted(search, start, 'left') - 1, 0)
+            last = min(np.searchsorted(search, end, 'right') + 1, n)
+
+        # The mapped values are shared with the other DataPairs that use the
+        # same Columns on the same axes
+        indices = np.arange(first, last)
+        xPlotCoords = xColumn.mapped(xaxis, first, last)
+        yPlotCoords = yColumn.mapped(yaxis, first, last)
+
+        if xColumn.isSorted():
+            keep = decimate(xPlotCoords, yPlotCoords, int(abs(xaxis._plotLength)))
+            indices = indices[keep]
+            xPlotCoords = xPlotCoords[keep]
+            yPlotCoords = yPlotCoords[keep]
+
+        visible = (indices, xPlotCoords, yPlotCoords)
+        self._visibleCache = (key, visible)
+        return visible
+
+    def linePoints(self, xaxis=None, yaxis=None):
+        """
+        Return the points returned by DataPair.plotCoordinates() as a numpy
+        array of shape (k, 2). Gaps in the data are rows of NaN, so the
+        points can be drawn as lines like the DataPair draws them. If the
+        lines are hidden, then there is a row of NaN after every point, so
+        that none of them are joined.
+
+        The result is cached until the data or the axes change. See
+        Accumulation, and DataPair._visible() for xaxis and yaxis.
+        """
+
+        visible = self._visible(xaxis, yaxis)
+        joined = self.linesVisible()
+        cached = self._linePoints
+        if cached is not None and cached[0] is visible and cached[1] == joined:
+            return cached[2]
+
+        (indices, xPlotCoords, yPlotCoords) = visible
+        if joined:
+            points = np.column_stack((xPlotCoords, yPlotCoords))
+        else:
+            points = np.empty((len(indices), 2, 2))
+            points[:, 0, 0] = xPlotCoords
+            points[:, 0, 1] = yPlotCoords
+            points[:, 1, :] = np.nan
+            points = points.reshape(-1, 2)
 
-    def makeLinesAndMarkers(self):
+        self._linePoints = (visible, joined, points)
+        return points
+
+    def prepare(self, prepared):
+        """
+        Compute the plot coordinates that will be drawn, and store them in the
+        prepared dictionary. The data is mapped with the snapshots of the axes
+        in prepared, if there are any. This does not use the canvas or change
+        the axes, so it can be run outside the GUI thread.
         """
-        Create the Lines and Markers that will be drawn on the Figure.
+        prepared[self] = self._visible(*self.preparedAxes(prepared))[1:]
 
-        The Lines and Markers will only be created if they are currently
-        set to be visible in this DataPair.
+    def makeLinesAndMarkers(self, prepared=None):
+        """
+        Work out the lines and markers that will be drawn on the Figure.
+
+        The lines and markers are only worked out if they are currently set
+        to be visible in this DataPair. The lines are kept as one array of
+        points, with a row of NaN at each gap, which the canvas draws as one
+        item (see drawPolyline()). The markers are kept as an array of the
+        positions that can be seen, which one Marker draws as one item (see
+        Marker.drawMany()).
+
+        prepared is the 2-tuple of plot coordinates computed by
+        DataPair.prepare(). If it is None, then they are computed here.
         """
 
         (ox, oy, w, h) = self.plot().axesRegion()
@@ -396,91 +947,96 @@ class DataPair(object):
         minY = self.yAxis().position()[1]
         maxY = self.yAxis().end()[1]
 
-        xPlotCoords = map(lambda value: self._xaxis.mapDataToPlot(value), self._x)
-        yPlotCoords = map(lambda value: self._yaxis.mapDataToPlot(value), self._y)
-
-        self._lineSegments = []
-        self._markers = []
-
-        # Make the line segments
-        if self.linesVisible():
-            for i in range(min(len(xPlotCoords), len(yPlotCoords)) - 1):
-                x1 = xPlotCoords[i]
-                x2 = xPlotCoords[i+1]
-                y1 = yPlotCoords[i]
-                y2 = yPlotCoords[i+1]
-
-                # Do not bother making this line because it is entirely 
-                # outside the plot's view. This does not get all the possible
-                # lines, but will get some fraction of them. The rest will
-                # be clipped by the canvas, so we don't really have to worry
-                # about them. This is primarily useful for instances like when
-                # x=range(0, 1000) but the plot is only showing (0, 10).
-                if (x1 < minX and x2 < minX) or (x1 > maxX and x2 > maxX) \
-                or (y1 < minY and y2 < minY) or (y1 > maxY and y2 > maxY):
-                    continue
-
-                line = Line(self.canvas(), **self._lineProps)
-                line.setPoints(x1,
-                               y1,
-                               x2,
-                               y2,
-                               ox,
-                               oy)
-                line.setClipPath(self.plot().axesRegion())
-                self._lineSegments.append(line)
-
-        # Make the markers
+        if prepared is None:
+            prepared = self.plotCoordinates()
+        xPlotCoords, yPlotCoords = prepared
+        points = np.column_stack((xPlotCoords, yPlotCoords))
+
+        # Points that are not finite, either in the data or because they
+        # cannot be mapped (such as 0 on a log Axis), are gaps that split the
+        # lines into separate runs. The canvas clips what is outside of the
+        # plot's view.
+        self._drawnLine = None
+        if self.linesVisible() and len(points) > 1:
+            if self._line is None:
+                self._line = Line(self.canvas())
+            self._line.setProps(dict(self._lineProps))
+            self._drawnLine = points
+
+        # Markers of another type cannot be reused
+        if self._marker is not None and type(self._marker) is not self._markerClass:
+            self._marker = None
+
+        # Do not bother drawing markers that are outside the plot's view
+        self._drawnMarkers = None
         if self.markersVisible() and self._markerClass is not None:
-            for x, y in zip(xPlotCoords, yPlotCoords):
-                # Do not bother making this marker because it is outside
-                # the plot's view
-                if (x < minX or x > maxX) or (y < minY or y > maxY):
-                    continue
+            with np.errstate(invalid='ignore'):
+                inside = (xPlotCoords >= minX) & (xPlotCoords <= maxX) \
+                       & (yPlotCoords >= minY) & (yPlotCoords <= maxY)
 
-                marker = self._markerClass(self.canvas(), **self._markerProps)
-                marker.setOrigin(ox, oy)
-                marker.setPosition(x, y)
-                self._markers.append(marker)
+            if np.any(inside):
+                if self._marker is None:
+                    self._marker = self._markerClass(self.canvas())
+                self._marker.setProps(dict(self._markerProps))
+                self._marker.setOrigin(ox, oy)
+                self._drawnMarkers = points[inside]
 
     def clear(self):
         self.remove()
 
     def remove(self):
         """
-        Remove all the Lines and Markers from the Figure.
+        Remove the lines and markers from the Figure. Once they have been
+        drawn, they are in the DataPair's canvas group, so this is a single
+        call to the canvas.
         """
-        try:
-            for line in self._lineSegments:
-                line.remove()
+        if self._group is not None:
+            self.canvas().removeGroup(self._group)
+            return
 
-            for marker in self._markers:
-                marker.remove()
-        except:
-            # self._lineSegments or self._markers probably doesn't exist yet
-            pass
+        for item in (self._lineItem, self._markerItem):
+            if item is not None:
+                self.canvas().remove(item)
+        self._lineItem = None
+        self._markerItem = None
 
     def draw(self, *args, **kwargs):
         """
-        Draw the Lines and Markers to the Figure.
+        Draw the lines and markers worked out by makeLinesAndMarkers() to the
+        Figure, as one canvas item each. The items from the last draw are
+        updated in place.
 
         Note: This does not actually override Artist.draw() because DataPair does
         not subclass Artist.
         """
 
-        # Need to save the current lineSegments and markers so that they can be removed from
-        # the plot when the plot is next drawn
+        if not self.isVisible():
+            return
 
-        # Draw lines before markers so that the markers cover the lines when the overlap
-        # on the canvas.
-        if self.linesVisible():
-            for line in self._lineSegments:
-                line.draw()
-    
-        if self.markersVisible():
-            for marker in self._markers:
-                marker.draw()
+        canvas = self.canvas()
+        region = self.plot().axesRegion()
 
-        self._oldLineSegments = self._lineSegments
-        self._oldMarkers = self._markers
+        # Draw lines before markers so that the markers cover the lines when the overlap
+        # on the canvas. They are drawn in one frame, so the canvas is only
+        # repainted once, and into the DataPair's group.
+        with canvas.frame(), canvas.group(self.canvasGroup()):
+            item = None
+            if self.linesVisible() and self._drawnLine is not None:
+                item = canvas.drawPolyline(self._drawnLine, region[0], region[1], clipPath=region,
+                                           item=self._lineItem, **self._line.props())
+            self._lineItem = self._replaceItem(self._lineItem, item)
+
+            item = None
+            if self.markersVisible() and self._drawnMarkers is not None:
+                item = self._marker.drawMany(self._drawnMarkers, item=self._markerItem)
+            self._markerItem = self._replaceItem(self._markerItem, item)
+
+    def _replaceItem(self, old, new):
+        """
+        Remove the canvas item old, unless the canvas updated it in place to
+        make new, and return new.
+        """
+        if old is not None and old is not new:
+            self.canvas().remove(old)
+        return new
 
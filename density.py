@@ -0,0 +1,262 @@
+
+import math
+
+import numpy as np
+
+from dataartist import DataArtist
+from colormap import getColormap
+
+class Density(DataArtist):
+    """
+    Draw a large set of (x, y) points as the density of points on the screen,
+    instead of one marker per point.
+
+    The points are counted in bins that are a fixed number of pixels across,
+    either hexagons or squares, that tile the axes region. The counts are
+    split into a small number of color levels, and all the bins of one level
+    are drawn as a single canvas item, so the number of items drawn does not
+    depend on the number of points.
+
+    Because the bins are in screen space, the points are counted again only
+    when the data ranges of the axes or the size of the axes region change.
+
+    ======================  =================   =======
+    Property                Possible Values     Description
+    ======================  =================   =======
+    width                   int (1)             The width of the edges of the bins.
+    ======================  =================   =======
+    """
+
+    def __init__(self, canvas, x, y, shape='hex', size=10, levels=8, scale='linear', colormap='viridis', xaxis=None, yaxis=None, plot=None, **kwprops):
+        """
+        **Constructor**
+
+        x, y
+            Sequences of numbers of the same length. Points where either is
+            not finite are ignored.
+
+        shape
+            The shape of the bins, either 'hex' or 'square'.
+
+        size
+            The width of a bin, in pixels.
+
+        levels
+            The number of color levels that the counts are split into.
+
+        scale
+            How counts are mapped to colors, either 'linear' or 'log'.
+
+        colormap
+            A Colormap, or the name of one. See colormap.getColormap().
+        """
+
+        initialProperties = {'width': 1}
+        initialProperties.update(kwprops)
+
+        DataArtist.__init__(self, canvas, xaxis, yaxis, plot, **initialProperties)
+
+        self._shape = 'hex'
+        self._size = 10.0
+        self._levels = 8
+        self._scale = 'linear'
+
+        self.setData(x, y)
+        self.setShape(shape)
+        self.setSize(size)
+        self.setLevels(levels)
+        self.setScale(scale)
+        self.setColormap(colormap)
+
+    def setData(self, x, y):
+        """Set the x and y data."""
+
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        n = min(len(x), len(y))
+        finite = np.isfinite(x[:n]) & np.isfinite(y[:n])
+
+        self._x = x[:n][finite]
+        self._y = y[:n][finite]
+
+        self._extent = None
+        if len(self._x) > 0:
+            self._extent = (self._x.min(), self._x.max(), self._y.min(), self._y.max())
+
+        self._cached = None
+
+    def setShape(self, shape):
+        """Set the shape of the bins, either 'hex' or 'square'."""
+        if shape in ('hex', 'square'):
+            self._shape = shape
+            self._cached = None
+
+    def setSize(self, size):
+        """Set the width of a bin, in pixels."""
+        if isinstance(size, (int, float)) and size > 0:
+            self._size = float(size)
+            self._cached = None
+
+    def setLevels(self, levels):
+        """Set the number of color levels."""
+        if isinstance(levels, int) and levels > 0:
+            self._levels = levels
+            self._cached = None
+
+    def setScale(self, scale):
+        """Set how counts are mapped to colors, either 'linear' or 'log'."""
+        if scale in ('linear', 'log'):
+            self._scale = scale
+            self._cached = None
+
+    def setColormap(self, colormap):
+        """
+        Set the Colormap. colormap can be a Colormap instance or the name of
+        one.
+        """
+        self._colormap = getColormap(colormap)
+        self._cached = None
+
+    def colormap(self):
+        """Return the Colormap instance."""
+        return self._colormap
+
+    def dataExtent(self):
+        return self._extent
+
+    def _binCenters(self, px, py, width, height):
+        """
+        Count the points at plot coordinates (px, py), which are all inside
+        a region of the given width and height starting at 0. Return a
+        2-tuple of (centers, counts) for the bins that have points in them;
+        centers is an array of shape (n, 2) in the same coordinates.
+        """
+
+        size = self._size
+
+        if self._shape == 'square':
+            nx = int(math.ceil(width / size)) + 1
+            i = (px / size).astype(np.intp)
+            j = (py / size).astype(np.intp)
+            counts = np.bincount(j * nx + i)
+            bins = np.flatnonzero(counts)
+            centers = np.column_stack(((bins % nx + 0.5) * size, (bins // nx + 0.5) * size))
+            return centers, counts[bins]
+
+        # Hexagon centers are the union of two rectangular lattices, one
+        # offset from the other by half a cell in each direction. Each point
+        # belongs to whichever of the nearest centers of the two lattices is
+        # closer. The hexagons have their points at the top and bottom.
+        dx = size
+        dy = size * math.sqrt(3)
+
+        ia = np.floor(px / dx + 0.5)
+        ja = np.floor(py / dy + 0.5)
+        ib = np.floor(px / dx)
+        jb = np.floor(py / dy)
+
+        da = (px - ia * dx) ** 2 + (py - ja * dy) ** 2
+        db = (px - (ib + 0.5) * dx) ** 2 + (py - (jb + 0.5) * dy) ** 2
+        useB = db < da
+
+        # Each lattice has at most (nx, ny) cells, so both fit in one index
+        nx = int(math.ceil(width / dx)) + 2
+        ny = int(math.ceil(height / dy)) + 2
+        i = np.where(useB, ib, ia).astype(np.intp)
+        j = np.where(useB, jb, ja).astype(np.intp)
+        counts = np.bincount(useB * (nx * ny) + j * nx + i)
+
+        bins = np.flatnonzero(counts)
+        lattice = bins // (nx * ny)
+        offset = lattice * 0.5
+        rest = bins % (nx * ny)
+        centers = np.column_stack(((rest % nx + offset) * dx, (rest // nx + offset) * dy))
+        return centers, counts[bins]
+
+    def _binShape(self):
+        """
+        Return an array of shape (k, 2) with the corners of one bin around
+        (0, 0).
+        """
+
+        half = self._size / 2.0
+        if self._shape == 'square':
+            return np.array([[-half, -half], [half, -half], [half, half], [-half, half]])
+
+        # Pointy topped hexagon that is size wide
+        radius = half * 2 / math.sqrt(3)
+        angles = np.radians(np.arange(6) * 60 + 30)
+        return np.column_stack((radius * np.cos(angles), radius * np.sin(angles)))
+
+    def aggregate(self, xaxis=None, yaxis=None):
+        """
+        Count the points that can be seen into bins and split the bins into
+        color levels. Return a list of 2-tuples of (Color, polygons), one for
+        each level that has bins, where polygons is an array of shape
+        (n, k, 2) with the corners of the bins in plot coordinates.
+
+        The result is cached until the axes or this Density change.
+
+        xaxis and yaxis are the axes to map with, if not the axes of this
+        DataArtist; see DataArtist.preparedAxes().
+        """
+        return self.compute(xaxis, yaxis)
+
+    def cacheKey(self, xaxis, yaxis):
+        # The bins are sized in pixels
+        return DataArtist.cacheKey(self, xaxis, yaxis) + (self.plot().axesRegion(),)
+
+    def _compute(self, xaxis, yaxis):
+        x0 = xaxis._plotStart
+        y0 = yaxis._plotStart
+        width = xaxis._plotLength
+        height = yaxis._plotLength
+
+        # Count in coordinates that start at the corner of the axes
+        px = xaxis.mapDataArrayToPlot(self._x) - x0
+        py = yaxis.mapDataArrayToPlot(self._y) - y0
+        with np.errstate(invalid='ignore'):
+            inside = (px >= 0) & (px <= width) & (py >= 0) & (py <= height)
+        px = px[inside]
+        py = py[inside]
+
+        if len(px) == 0:
+            return []
+
+        centers, counts = self._binCenters(px, py, width, height)
+        centers += (x0, y0)
+
+        values = counts.astype(float)
+        if self._scale == 'log':
+            values = np.log10(values)
+
+        # Split into levels of equal width between the smallest and the
+        # largest count
+        low = values.min()
+        high = values.max()
+        n = self._levels
+        if high > low:
+            levels = np.minimum(((values - low) * (n / (high - low))).astype(np.intp), n - 1)
+        else:
+            levels = np.zeros(len(values), dtype=np.intp) + (n - 1)
+
+        shape = self._binShape()
+
+        result = []
+        for level in np.unique(levels):
+            color = self._colormap.color(level, 0, max(n - 1, 1))
+            polygons = centers[levels == level][:, np.newaxis, :] + shape[np.newaxis, :, :]
+            result.append((color, polygons))
+        return result
+
+    def _draw(self, prepared=None):
+        levels = self.preparedResult(prepared)
+        region = self.plot().axesRegion()
+
+        props = dict(self.props())
+        items = []
+        for (color, polygons) in levels:
+            props.update(color=color, fillcolor=color)
+            items.append(self.canvas().drawPolygons(polygons, region[0], region[1], clipPath=region,
+                                                    item=self._oldItem(len(items)), **props))
+        return items
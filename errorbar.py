@@ -0,0 +1,176 @@
+
+import numpy as np
+
+from dataartist import DataPairArtist
+
+def errorBounds(values, err):
+    """
+    Return the (lower, upper) bounds of values with the errors err, as numpy
+    arrays, or None if err is None.
+
+    err can be a single number, a sequence with one error per value (for
+    errors that are the same in both directions), or a 2-tuple of sequences
+    of (lower errors, upper errors).
+    """
+
+    if err is None:
+        return None
+
+    n = len(values)
+    err = np.asarray(err, dtype=float)
+    if err.ndim == 2:
+        lower = np.resize(err[0], n)
+        upper = np.resize(err[1], n)
+    else:
+        lower = upper = np.resize(err, n)
+
+    return (values - lower, values + upper)
+
+
+class ErrorBars(DataPairArtist):
+    """
+    Draw error bars on the points of a DataPair.
+
+    The error bars are only drawn at the points that the DataPair draws, and
+    they are all drawn as a single canvas item, so they stay cheap on large
+    series.
+
+    ======================  =================   =======
+    Property                Possible Values     Description
+    ======================  =================   =======
+    width                   int (1)             The width of the error bars.
+    ======================  =================   =======
+    """
+
+    def __init__(self, canvas, datapair, yerr=None, xerr=None, capSize=6, **kwprops):
+        """
+        **Constructor**
+
+        datapair
+            The DataPair to draw error bars on.
+
+        yerr, xerr
+            The errors in y and in x. Each can be None, a single number, a
+            sequence with one error per point, or a 2-tuple of sequences of
+            (lower errors, upper errors).
+
+        capSize
+            The length, in pixels, of the caps at the ends of the bars. If 0,
+            then there are no caps.
+        """
+
+        initialProperties = {'width': 1}
+        initialProperties.update(kwprops)
+
+        DataPairArtist.__init__(self, canvas, datapair, **initialProperties)
+
+        self._capSize = capSize
+        self._extent = None     # (DataPair.dataKey(), extent)
+
+        self.setErrors(yerr, xerr)
+
+    def setErrors(self, yerr=None, xerr=None):
+        """Set the errors. See the constructor."""
+        self._yerr = yerr
+        self._xerr = xerr
+        self._cached = None
+        self._extent = None
+
+    def setCapSize(self, capSize):
+        """Set the length of the caps, in pixels."""
+        if capSize >= 0:
+            self._capSize = capSize
+            self._cached = None
+
+    def dataExtent(self):
+        # The extent is cached until the errors or the DataPair's data change
+        dp = self.datapair()
+        dataKey = dp.dataKey()
+        if self._extent is not None and self._extent[0] == dataKey:
+            return self._extent[1]
+
+        n = min(len(dp._x), len(dp._y))
+        if n == 0:
+            extent = None
+        else:
+            x = dp._x[:n]
+            y = dp._y[:n]
+
+            xBounds = errorBounds(x, self._xerr) or (x, x)
+            yBounds = errorBounds(y, self._yerr) or (y, y)
+
+            extent = (np.nanmin(xBounds[0]), np.nanmax(xBounds[1]),
+                      np.nanmin(yBounds[0]), np.nanmax(yBounds[1]))
+
+        self._extent = (dataKey, extent)
+        return extent
+
+    def segments(self, xaxis=None, yaxis=None):
+        """
+        Return the segments of the error bars and their caps as a numpy
+        array of shape (n, 4), where each row holds the end points
+        (sx, sy, ex, ey) of one segment in plot coordinates.
+
+        xaxis and yaxis are the axes to map with, if not the axes of the
+        DataPair; see DataArtist.preparedAxes().
+        """
+        return self.compute(xaxis, yaxis)
+
+    def _compute(self, xaxis, yaxis):
+        dp = self.datapair()
+        indices, xPlot, yPlot = dp._visible(xaxis, yaxis)
+
+        parts = []
+        cap = self._capSize / 2.0
+
+        yBounds = errorBounds(dp._y[indices], self._subset(self._yerr, indices))
+        if yBounds is not None:
+            low = yaxis.mapDataArrayToPlot(yBounds[0])
+            high = yaxis.mapDataArrayToPlot(yBounds[1])
+            parts.append(np.column_stack((xPlot, low, xPlot, high)))
+            if cap > 0:
+                parts.append(np.column_stack((xPlot - cap, low, xPlot + cap, low)))
+                parts.append(np.column_stack((xPlot - cap, high, xPlot + cap, high)))
+
+        xBounds = errorBounds(dp._x[indices], self._subset(self._xerr, indices))
+        if xBounds is not None:
+            low = xaxis.mapDataArrayToPlot(xBounds[0])
+            high = xaxis.mapDataArrayToPlot(xBounds[1])
+            parts.append(np.column_stack((low, yPlot, high, yPlot)))
+            if cap > 0:
+                parts.append(np.column_stack((low, yPlot - cap, low, yPlot + cap)))
+                parts.append(np.column_stack((high, yPlot - cap, high, yPlot + cap)))
+
+        if len(parts) == 0:
+            segments = np.zeros((0, 4))
+        else:
+            segments = np.concatenate(parts)
+
+        # Do not keep segments that cannot be mapped or are entirely outside
+        # of the axes, like DataPair does with its lines.
+        (ox, oy, w, h) = self.plot().axesRegion()
+        (sx, sy, ex, ey) = segments.T
+        with np.errstate(invalid='ignore'):
+            outside = ((sx < 0) & (ex < 0)) | ((sx > w) & (ex > w)) \
+                    | ((sy < 0) & (ey < 0)) | ((sy > h) & (ey > h))
+        return segments[~outside & np.all(np.isfinite(segments), axis=1)]
+
+    def _subset(self, err, indices):
+        """Return the errors in err for the points at indices."""
+        if err is None:
+            return None
+        err = np.asarray(err, dtype=float)
+        if err.ndim == 0:
+            return err
+        if err.ndim == 2:
+            return err[:, indices]
+        return err[indices]
+
+    def _draw(self, prepared=None):
+        segments = self.preparedResult(prepared)
+        if len(segments) == 0:
+            return None
+
+        region = self.plot().axesRegion()
+        return self.canvas().drawSegments(segments, region[0], region[1], clipPath=region, item=self._oldItem(),
+                                          **self.props())
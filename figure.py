@@ -1,11 +1,13 @@
 
 
 from canvas.qt4pyside_canvas import Qt4PySideCanvas
+from canvas.recording_canvas import RecordingCanvas
 
 from font import *
 from plot import *
 from text import *
 from base import *
+from worker import PrepareWorker
 
 class Figure(Artist):
     """
@@ -39,6 +41,7 @@ class Figure(Artist):
         self.addChild(self._title)
         self._plots = []
         self._currentPlot = None  # index of the current plot
+        self._worker = None       # runs drawAsync's prepare phase
 
     def canvas(self):
         return self._canvas
@@ -59,6 +62,8 @@ class Figure(Artist):
 
         try:
             self._plots.remove(plot)
+            self.delChild(plot)
+            plot.clear()
             if len(self._plots) == 0:
                 self._currentPlot = None
             else:
@@ -91,6 +96,17 @@ class Figure(Artist):
                 # plot is not in self._plots
                 self.addPlot(plot)
 
+    def plotAt(self, x, y):
+        """
+        Return the Plot whose axes region contains the point (x, y), in
+        figure coordinates, or None if there is no such Plot.
+        """
+
+        for p in reversed(self._plots):
+            if isinstance(p, CartesianPlot) and p.containsPoint(x, y):
+                return p
+        return None
+
     def width(self):
         """Return the width of the Figure."""
         return self.canvas().scene().width()
@@ -148,7 +164,10 @@ class Figure(Artist):
 
         if text is not None:
             if isinstance(text, Text):
+                self.delChild(self._title)
+                self._title.remove()
                 self._title = text
+                self.addChild(self._title)
             elif isinstance(text, str):
                 self._title.setProps(text=text)
             elif isinstance(text, dict):
@@ -158,21 +177,85 @@ class Figure(Artist):
             if isinstance(font, str) or isinstance(font, Font):
                 self._title.setProps(font=font)
 
-    def _draw(self):
-        """
-        Show the canvas, draw all plots, and draw the Figure title.
+    def prepare(self, job=None):
         """
-        self.clear()
-        self.canvas().show()
+        Do all the work for drawing the Figure that does not need the canvas
+        (autoscaling, tick locations and labels, mapping the data to plot
+        coordinates) and return it as a dictionary that can be passed to
+        Figure.draw().
 
-        # Draw the background
-        self.canvas().drawRect(0, 0, self.canvas().scene().width(), self.canvas().scene().height(), 0, 0, **{'color': self.color(), 'fillcolor': self.color()})
+        This can be run outside the GUI thread. If job is given and it is
+        cancelled part way through, then this returns None.
+        """
 
+        prepared = {}
         for p in self._plots:
-            p.clear()
-            p.draw()
+            if job is not None and job.cancelled():
+                return None
+            if isinstance(p, CartesianPlot) and not p.prepare(prepared, job):
+                return None
+        return prepared
+
+    def drawAsync(self):
+        """
+        Draw the Figure without blocking the GUI thread while the data is
+        prepared.
+
+        Figure.prepare() is run in a background thread, and then the prepared
+        data is drawn on the canvas in the GUI thread. Calling this again
+        before the drawing is done cancels the earlier request, so only the
+        latest state of the Figure is drawn.
+
+        Return the PrepareJob for this request.
+        """
+
+        if self._worker is None:
+            self._worker = PrepareWorker()
+        return self._worker.submit(self, self._commitJob)
+
+    def _commitJob(self, job):
+        """
+        Called in the worker thread when job has been prepared. Hands the
+        drawing over to the GUI thread.
+        """
+        self.canvas().callInGuiThread(self._drawJob, job)
+
+    def _drawJob(self, job):
+        """
+        Draw the data prepared by job, unless a newer job has superseded it.
+        """
+        if not job.cancelled():
+            self.draw(job.prepared())
+
+    def _draw(self, prepared=None):
+        """
+        Show the canvas, draw all plots, and draw the Figure title.
+
+        prepared is a dictionary returned by Figure.prepare(). Anything that
+        is not in it is prepared while drawing.
+        """
+        self.canvas().show()
 
-        self._title.draw()
+        # Everything is drawn in one bulk frame, so that the items are
+        # indexed at once if bulk insertion is on
+        with self.canvas().frame(bulk=True):
+            # Draw the background. The items from the last draw are updated in
+            # place, so the Figure is not cleared first.
+            item = self.canvas().drawRect(0, 0, self.canvas().scene().width(), self.canvas().scene().height(), 0, 0,
+                                          item=self._oldItem(), **{'color': self.color(), 'fillcolor': self.color()})
+
+            # The axes of every plot are set up before any plot is drawn, since
+            # an Axis can be slaved to one in another plot
+            if prepared is not None:
+                for p in self._plots:
+                    if isinstance(p, CartesianPlot) and p in prepared:
+                        p.applyAxes(prepared)
+
+            for p in self._plots:
+                p.draw(prepared)
+
+            self._title.draw()
+        return item
         
     def deleteAllPlots(self):
         """
@@ -180,18 +263,68 @@ class Figure(Artist):
         """
 
         for plot in self._plots:
-            del plot
+            self.delChild(plot)
+            plot.clear()
         self._plots = []
         self._currentPlot = None
 
-    def save(self, filename):
+    def close(self):
+        """
+        Remove all plots and the title, and close the canvas, deleting
+        everything that was drawn on it. Any drawing that is being prepared
+        by drawAsync() is cancelled.
+
+        This lets go of all the canvas and GUI resources at once, instead of
+        when the Figure is garbage collected. The Figure cannot be drawn
+        after it is closed.
+        """
+
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+
+        self.deleteAllPlots()
+        self.clear()
+        self._item = None
+        self.canvas().close()
+
+    def save(self, filename, scale=1.0):
         """
         Draw and save the canvas.
+
+        filename can be a single file name, or a list of file names. The
+        Figure is only drawn once, so saving to several formats at the same
+        time is much faster than calling save once for each.
+
+        scale sets the size of raster images relative to the Figure size.
         """
+
+        if isinstance(filename, basestring):
+            filename = [filename]
+
         self.draw()
-        self.canvas().save(filename)
+        for f in filename:
+            self.canvas().save(f, scale)
+
+    def record(self):
+        """
+        Draw the Figure, and return a DisplayList of everything that was
+        drawn.
+
+        The DisplayList can be replayed onto any canvas, at any scale, without
+        going through the Figure's artists again. See DisplayList.
+        """
+
+        recorder = RecordingCanvas(self.width(), self.height())
+        self.canvas().setRecorder(recorder)
+        try:
+            self.draw()
+        finally:
+            self.canvas().setRecorder(None)
+        return recorder.displayList().compact()
 
     def clear(self):
-        Parent.clear(self)
-        self.canvas().update()
+        with self.canvas().frame():
+            Parent.clear(self)
+            self.canvas().update()
 
@@ -0,0 +1,155 @@
+
+import numpy as np
+
+from dataartist import DataPairArtist
+from color import Color
+
+class FillBetween(DataPairArtist):
+    """
+    Fill the band between two curves that share the x data of a DataPair,
+    such as a confidence band around a series.
+
+    The band is only computed at the points that the DataPair draws, and it
+    is drawn as a single polygon, so it stays cheap on large series.
+
+    ======================  =================   =======
+    Property                Possible Values     Description
+    ======================  =================   =======
+    color                   | Color             The color of the edge of the band.
+                            | Color format
+    fillcolor               | Color             The color of the band.
+                            | Color format
+    width                   int (1)             The width of the edge of the band.
+    ======================  =================   =======
+    """
+
+    def __init__(self, canvas, datapair, lower, upper=None, **kwprops):
+        """
+        **Constructor**
+
+        datapair
+            The DataPair whose x data the band uses.
+
+        lower, upper
+            The y values of the two edges of the band. Each can be a single
+            number or a sequence with one value per point. If upper is None,
+            then the band is between lower and the DataPair's y data.
+        """
+
+        fill = Color((0, 0, 255, 64))
+        initialProperties = {'color': fill,
+                             'fillcolor': fill,
+                             'width': 1,
+                            }
+        initialProperties.update(kwprops)
+
+        DataPairArtist.__init__(self, canvas, datapair, **initialProperties)
+
+        self._extent = None     # (DataPair.dataKey(), extent)
+
+        self.setBounds(lower, upper)
+
+    def setProps(self, props={}, **kwprops):
+        """
+        Remove 'fillcolor' from props and/or kwprops. Then set the fill
+        color, and then set the kwprops. props takes precedence over kwprops.
+        """
+
+        fillcolor = kwprops.pop('fillcolor', None)
+        fillcolor = props.pop('fillcolor', fillcolor)
+        if fillcolor is not None:
+            kwprops['fillcolor'] = Color(fillcolor)
+
+        DataPairArtist.setProps(self, props, **kwprops)
+
+    def setBounds(self, lower, upper=None):
+        """Set the edges of the band. See the constructor."""
+        self._lower = lower
+        self._upper = upper
+        self._cached = None
+        self._extent = None
+
+    def _bounds(self, indices=None):
+        """
+        Return the (lower, upper) y values of the band as numpy arrays, for
+        the points at indices, or for every point if indices is None.
+        """
+
+        dp = self.datapair()
+        n = min(len(dp._x), len(dp._y))
+
+        def values(v):
+            if v is None:
+                v = dp._y[:n]
+            v = np.asarray(v, dtype=float)
+            if v.ndim == 0:
+                v = np.resize(v, n)
+            if indices is None:
+                return v[:n]
+            return v[indices]
+
+        return (values(self._lower), values(self._upper))
+
+    def dataExtent(self):
+        # The extent is cached until the bounds or the DataPair's data change
+        dp = self.datapair()
+        dataKey = dp.dataKey()
+        if self._extent is not None and self._extent[0] == dataKey:
+            return self._extent[1]
+
+        n = min(len(dp._x), len(dp._y))
+        if n == 0:
+            extent = None
+        else:
+            (lower, upper) = self._bounds()
+            extent = (np.nanmin(dp._x[:n]), np.nanmax(dp._x[:n]),
+                      min(np.nanmin(lower), np.nanmin(upper)),
+                      max(np.nanmax(lower), np.nanmax(upper)))
+
+        self._extent = (dataKey, extent)
+        return extent
+
+    def polygon(self, xaxis=None, yaxis=None):
+        """
+        Return the outline of the band as a numpy array of shape (k, 2) of
+        points in plot coordinates, or None if there is nothing to draw.
+        The outline goes forward along the upper edge and back along the
+        lower edge.
+
+        xaxis and yaxis are the axes to map with, if not the axes of the
+        DataPair; see DataArtist.preparedAxes().
+        """
+        return self.compute(xaxis, yaxis)
+
+    def _compute(self, xaxis, yaxis):
+        indices, xPlot, yPlot = self.datapair()._visible(xaxis, yaxis)
+
+        (lower, upper) = self._bounds(indices)
+
+        # The band is drawn as one polygon, so it goes straight across the
+        # gaps in the data instead of being split at them
+        keep = np.isfinite(xPlot) & np.isfinite(lower) & np.isfinite(upper)
+
+        lower = yaxis.mapDataArrayToPlot(lower)
+        upper = yaxis.mapDataArrayToPlot(upper)
+
+        # Points that cannot be mapped, such as 0 on a log Axis, are put at
+        # the bottom of the Axis
+        lower[np.isnan(lower)] = yaxis._plotStart
+        upper[np.isnan(upper)] = yaxis._plotStart
+
+        polygon = None
+        if np.count_nonzero(keep) >= 2:
+            x = xPlot[keep]
+            polygon = np.concatenate((np.column_stack((x, upper[keep])),
+                                      np.column_stack((x[::-1], lower[keep][::-1]))))
+        return polygon
+
+    def _draw(self, prepared=None):
+        polygon = self.preparedResult(prepared)
+        if polygon is None:
+            return None
+
+        region = self.plot().axesRegion()
+        return self.canvas().drawPolygons(polygon[np.newaxis], region[0], region[1], clipPath=region,
+                                          item=self._oldItem(), **self.props())
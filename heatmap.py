@@ -0,0 +1,219 @@
+
+import math
+
+import numpy as np
+
+from dataartist import DataArtist
+from colormap import getColormap
+
+class Heatmap(DataArtist):
+    """
+    Draw a 2-D array of values as an image, colored with a Colormap.
+
+    The array is indexed as data[row, column]. Columns run along the x Axis
+    and rows along the y Axis, with row 0 at the low end of the y Axis. The
+    image covers a rectangle in data coordinates given by its extent, which
+    defaults to one unit per cell, starting at 0.
+
+    The image is never drawn at a higher resolution than the screen. When it
+    is prepared, only the part of the array that can be seen is resampled,
+    with one sample per pixel of the axes region, and the samples are colored
+    through the Colormap's lookup table. The result is cached, and the array
+    is only resampled again when the data ranges or the plot coordinates of
+    the axes, or the heatmap itself, change.
+    """
+
+    def __init__(self, canvas, data, extent=None, colormap='gray', vmin=None, vmax=None, xaxis=None, yaxis=None, plot=None, **kwprops):
+        """
+        **Constructor**
+
+        data
+            A 2-D array of numbers. Cells that are NaN are drawn with the
+            Colormap's bad color.
+
+        extent
+            A 4-tuple of (x0, x1, y0, y1) giving the data coordinates of the
+            edges of the image. x0 is the left edge of column 0 and y0 is the
+            bottom edge of row 0.
+
+        colormap
+            A Colormap, or the name of one. See colormap.getColormap().
+
+        vmin, vmax
+            The values mapped to the ends of the Colormap. If either is None,
+            then the minimum or maximum finite value of the data is used.
+        """
+
+        DataArtist.__init__(self, canvas, xaxis, yaxis, plot, **kwprops)
+
+        self._colormap = getColormap(colormap)
+        self._vmin = vmin
+        self._vmax = vmax
+
+        self.setData(data, extent)
+
+    def setData(self, data, extent=None):
+        """
+        Set the 2-D data array. If extent is None, then the current extent is
+        kept, or one unit per cell is used if there is no current extent.
+        """
+
+        data = np.asarray(data, dtype=float)
+        if data.ndim != 2:
+            return
+
+        self._data = data
+
+        finite = data[np.isfinite(data)]
+        if len(finite) > 0:
+            self._dataMin = finite.min()
+            self._dataMax = finite.max()
+        else:
+            self._dataMin = 0.0
+            self._dataMax = 1.0
+
+        if extent is not None:
+            self.setExtent(*extent)
+        elif not hasattr(self, '_extent'):
+            self.setExtent(0, data.shape[1], 0, data.shape[0])
+
+        self._indices = None
+        self._cached = None
+
+    def data(self):
+        """Return the 2-D data array."""
+        return self._data
+
+    def setExtent(self, x0, x1, y0, y1):
+        """
+        Set the data coordinates of the edges of the image. See the
+        constructor.
+        """
+        self._extent = (float(x0), float(x1), float(y0), float(y1))
+        self._cached = None
+
+    def extent(self):
+        """Return the extent of the image as (x0, x1, y0, y1)."""
+        return self._extent
+
+    def setColormap(self, colormap):
+        """
+        Set the Colormap. colormap can be a Colormap instance or the name of
+        one.
+        """
+        self._colormap = getColormap(colormap)
+        self._indices = None
+        self._cached = None
+
+    def colormap(self):
+        """Return the Colormap instance."""
+        return self._colormap
+
+    def setColorRange(self, vmin=None, vmax=None):
+        """
+        Set the values that are mapped to the ends of the Colormap. If
+        either is None, then it follows the data.
+        """
+        self._vmin = vmin
+        self._vmax = vmax
+        self._indices = None
+        self._cached = None
+
+    def colorRange(self):
+        """Return the (vmin, vmax) that are used to color the data."""
+
+        vmin = self._vmin
+        if vmin is None:
+            vmin = self._dataMin
+
+        vmax = self._vmax
+        if vmax is None:
+            vmax = self._dataMax
+
+        return (vmin, vmax)
+
+    def dataExtent(self):
+        (x0, x1, y0, y1) = self._extent
+        return (min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1))
+
+    def colorIndices(self):
+        """
+        Return an array of the same shape as the data holding the Colormap
+        lookup table index of each cell. This is computed once for the data,
+        colormap and color range, and then reused for every resampling.
+        """
+
+        if self._indices is None:
+            indices = self.colormap().indices(self._data, *self.colorRange())
+            # The bad color's index is size(), so a 256 color map needs 16 bits
+            if self.colormap().size() < 256:
+                indices = indices.astype(np.uint8)
+            else:
+                indices = indices.astype(np.uint16)
+            self._indices = indices
+        return self._indices
+
+    def resample(self, xaxis=None, yaxis=None):
+        """
+        Return the part of the image that can be seen, at screen resolution,
+        as a 5-tuple of (image, sx, sy, ex, ey). image is a 2-D numpy array of
+        32-bit 0xAARRGGBB colors with the top row first, and (sx, sy) and
+        (ex, ey) are the bottom-left and top-right corners of the image in
+        plot coordinates.
+
+        Return None if none of the image can be seen.
+
+        xaxis and yaxis are the axes to map with, if not the axes of this
+        DataArtist; see DataArtist.preparedAxes().
+        """
+        return self.compute(xaxis, yaxis)
+
+    def _compute(self, xaxis, yaxis):
+        (x0, x1, y0, y1) = self._extent
+        (rows, cols) = self._data.shape
+
+        if rows == 0 or cols == 0 or x0 == x1 or y0 == y1:
+            return None
+
+        # The edges of the image in plot coordinates, cut down to the axes.
+        # An edge that cannot be mapped is at or below 0 on a log Axis, so it
+        # is below the start of the Axis.
+        px = xaxis.mapDataArrayToPlot([x0, x1])
+        py = yaxis.mapDataArrayToPlot([y0, y1])
+        px[np.isnan(px)] = -np.inf
+        py[np.isnan(py)] = -np.inf
+
+        left = max(px.min(), xaxis._plotStart)
+        right = min(px.max(), xaxis._plotEnd)
+        bottom = max(py.min(), yaxis._plotStart)
+        top = min(py.max(), yaxis._plotEnd)
+        if right <= left or top <= bottom:
+            return None
+
+        width = max(int(math.ceil(right - left)), 1)
+        height = max(int(math.ceil(top - bottom)), 1)
+
+        # Sample the data at the center of each pixel, from the top row down
+        xCenters = left + (np.arange(width) + 0.5) * ((right - left) / width)
+        yCenters = top - (np.arange(height) + 0.5) * ((top - bottom) / height)
+
+        xData = xaxis.mapPlotArrayToData(xCenters)
+        yData = yaxis.mapPlotArrayToData(yCenters)
+
+        columns = np.clip(np.floor((xData - x0) * (cols / (x1 - x0))), 0, cols - 1).astype(np.intp)
+        rowIndices = np.clip(np.floor((yData - y0) * (rows / (y1 - y0))), 0, rows - 1).astype(np.intp)
+
+        indices = self.colorIndices()[rowIndices[:, np.newaxis], columns[np.newaxis, :]]
+        image = self.colormap().argbTable()[indices]
+
+        return (image, left, bottom, right, top)
+
+    def _draw(self, prepared=None):
+        resampled = self.preparedResult(prepared)
+        if resampled is None:
+            return None
+
+        (image, sx, sy, ex, ey) = resampled
+        region = self.plot().axesRegion()
+        return self.canvas().drawImage(sx, sy, ex, ey, region[0], region[1], image=image,
+                                       clipPath=region, item=self._oldItem())
@@ -0,0 +1,271 @@
+
+import math
+
+import numpy as np
+
+from dataartist import DataArtist
+from color import Color
+
+class Histogram(DataArtist):
+    """
+    Bin data into a histogram, and draw the counts as bars.
+
+    The bins are either a number of equal width bins spanning a range, or a
+    sorted list of bin edges. The range defaults to the minimum and maximum
+    of the first data added.
+
+    Data can be added in batches with Histogram.add(). Each batch only
+    updates the counts, so very large data sets can be binned a piece at a
+    time without ever being held in memory at once. Values outside of the
+    bins are counted separately; see Histogram.outside().
+
+    All the bars are drawn as a single canvas item.
+
+    If the count Axis is logarithmic, then the bars start at the bottom of
+    the Axis, and the Axis is autoscaled to start one order of magnitude
+    below the smallest count that is not 0.
+
+    ======================  =================   =======
+    Property                Possible Values     Description
+    ======================  =================   =======
+    color                   | Color             The color of the edges of the bars.
+                            | Color format
+    fillcolor               | Color             The color of the bars.
+                            | Color format
+    width                   int (1)             The width of the edges of the bars.
+    ======================  =================   =======
+    """
+
+    # Values are binned in chunks of this many, to limit the size of the
+    # temporary arrays
+    _chunkSize = 1 << 22
+
+    def __init__(self, canvas, data=None, bins=10, range=None, xaxis=None, yaxis=None, plot=None, **kwprops):
+        """
+        **Constructor**
+
+        data
+            The first batch of data to bin, or None.
+
+        bins
+            Either the number of equal width bins, or a sorted sequence of
+            bin edges.
+
+        range
+            A 2-tuple of (start, end) for equal width bins. If it is None,
+            then the range of the first batch of data is used.
+        """
+
+        initialProperties = {'fillcolor': Color('blue'),
+                             'width': 1,
+                            }
+        initialProperties.update(kwprops)
+
+        DataArtist.__init__(self, canvas, xaxis, yaxis, plot, **initialProperties)
+
+        self._version = 0
+
+        self.setBins(bins, range)
+        if data is not None:
+            self.add(data)
+
+    def setProps(self, props={}, **kwprops):
+        """
+        Remove 'fillcolor' from props and/or kwprops. Then set the fill
+        color, and then set the kwprops. props takes precedence over kwprops.
+        """
+
+        fillcolor = kwprops.pop('fillcolor', None)
+        fillcolor = props.pop('fillcolor', fillcolor)
+        if fillcolor is not None:
+            kwprops['fillcolor'] = Color(fillcolor)
+
+        DataArtist.setProps(self, props, **kwprops)
+
+    def setBins(self, bins=10, range=None):
+        """
+        Set the bins, and reset all the counts to 0. See the constructor.
+        """
+
+        self._edges = None
+        self._range = None
+        self._nBins = 10
+
+        if isinstance(bins, int):
+            self._nBins = max(bins, 1)
+            if range is not None and range[0] != range[1]:
+                self._range = (float(min(range)), float(max(range)))
+                self._edges = np.linspace(self._range[0], self._range[1], self._nBins + 1)
+        else:
+            edges = np.asarray(bins, dtype=float)
+            if len(edges) >= 2:
+                self._edges = np.sort(edges)
+                self._nBins = len(edges) - 1
+
+        self.clearCounts()
+
+    def clearCounts(self):
+        """Reset all the counts to 0."""
+        self._counts = np.zeros(self._nBins, dtype=np.int64)
+        self._below = 0
+        self._above = 0
+        self._version += 1
+
+    def add(self, values, weights=None):
+        """
+        Add a batch of values to the histogram. values can be any array of
+        numbers; values that are not finite are ignored.
+
+        If weights is given, it must be the same shape as values, and each
+        value adds its weight to its bin instead of 1. The counts then become
+        floats.
+        """
+
+        values = np.asarray(values, dtype=float).ravel()
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float).ravel()
+            self._counts = self._counts.astype(float)
+
+        if self._edges is None:
+            finite = values[np.isfinite(values)]
+            if len(finite) == 0:
+                return
+            (start, end) = (finite.min(), finite.max())
+            if start == end:
+                (start, end) = (start - 0.5, end + 0.5)
+            self._range = (start, end)
+            self._edges = np.linspace(start, end, self._nBins + 1)
+
+        for i in xrange(0, len(values), self._chunkSize):
+            chunk = values[i:i + self._chunkSize]
+            chunkWeights = None
+            if weights is not None:
+                chunkWeights = weights[i:i + self._chunkSize]
+            self._addChunk(chunk, chunkWeights)
+
+        self._version += 1
+
+    def _addChunk(self, values, weights):
+        n = self._nBins
+        start = self._edges[0]
+        end = self._edges[-1]
+
+        if self._range is not None:
+            # Equal width bins can be found without searching
+            with np.errstate(invalid='ignore'):
+                indices = np.floor((values - start) * (n / (end - start)))
+        else:
+            indices = np.searchsorted(self._edges, values, 'right') - 1.0
+
+        # The last bin includes its upper edge
+        indices[values == end] = n - 1
+
+        with np.errstate(invalid='ignore'):
+            below = values < start
+            above = values > end
+        inside = (indices >= 0) & (indices < n) & ~below & ~above
+
+        if weights is None:
+            self._below += int(np.count_nonzero(below))
+            self._above += int(np.count_nonzero(above))
+            self._counts += np.bincount(indices[inside].astype(np.intp), minlength=n)
+        else:
+            self._below += weights[below].sum()
+            self._above += weights[above].sum()
+            self._counts += np.bincount(indices[inside].astype(np.intp), weights[inside], minlength=n)
+
+    def counts(self):
+        """Return the numpy array of counts in each bin."""
+        return self._counts
+
+    def edges(self):
+        """
+        Return the numpy array of bin edges, which has one more entry than
+        the counts, or None if no bins have been set up yet.
+        """
+        return self._edges
+
+    def outside(self):
+        """
+        Return a 2-tuple of the number of values that were below the first
+        bin and above the last bin.
+        """
+        return (self._below, self._above)
+
+    def dataExtent(self):
+        if self._edges is None:
+            return None
+
+        top = self._counts.max()
+        bottom = 0
+
+        yaxis = self.yAxis()
+        if yaxis is not None and yaxis.scaling() == 'log':
+            positive = self._counts[self._counts > 0]
+            if len(positive) == 0:
+                return None
+            base = yaxis.logBase()
+            bottom = pow(base, math.floor(math.log(positive.min(), base)) - 1)
+
+        return (self._edges[0], self._edges[-1], bottom, top)
+
+    def bars(self, xaxis=None, yaxis=None):
+        """
+        Return the bars that can be seen as a numpy array of shape (n, 4),
+        where each row holds the corners (sx, sy, ex, ey) of one bar in plot
+        coordinates. Return None if no bars can be seen.
+
+        xaxis and yaxis are the axes to map with, if not the axes of this
+        DataArtist; see DataArtist.preparedAxes().
+        """
+        return self.compute(xaxis, yaxis)
+
+    def cacheKey(self, xaxis, yaxis):
+        return DataArtist.cacheKey(self, xaxis, yaxis) + (self._version,)
+
+    def _compute(self, xaxis, yaxis):
+        if self._edges is None:
+            return None
+
+
+        keep = self._counts > 0
+        if not np.any(keep):
+            return None
+
+        left = xaxis.mapDataArrayToPlot(self._edges[:-1][keep])
+        right = xaxis.mapDataArrayToPlot(self._edges[1:][keep])
+        top = yaxis.mapDataArrayToPlot(self._counts[keep])
+
+        # On a log Axis, 0 cannot be mapped, so the bars start at the bottom
+        bottom = yaxis.mapDataArrayToPlot([0.0])[0]
+        if not np.isfinite(bottom):
+            bottom = yaxis._plotStart
+
+        # Drop the bars that are outside of the x Axis, and keep the rest
+        # from reaching far past the edges, so the canvas never has to deal
+        # with huge coordinates.
+        visible = (right >= xaxis._plotStart) & (left <= xaxis._plotEnd) & np.isfinite(left + right)
+        (left, right, top) = (left[visible], right[visible], top[visible])
+        if len(left) == 0:
+            return None
+
+        low = yaxis._plotStart - 1
+        high = yaxis._plotEnd + 1
+        top = np.clip(top, low, high)
+        bottom = min(max(bottom, low), high)
+
+        rects = np.empty((len(left), 4))
+        rects[:, 0] = np.clip(left, xaxis._plotStart - 1, xaxis._plotEnd + 1)
+        rects[:, 1] = bottom
+        rects[:, 2] = np.clip(right, xaxis._plotStart - 1, xaxis._plotEnd + 1)
+        rects[:, 3] = top
+        return rects
+
+    def _draw(self, prepared=None):
+        rects = self.preparedResult(prepared)
+        if rects is None:
+            return None
+
+        region = self.plot().axesRegion()
+        return self.canvas().drawRects(rects, region[0], region[1], clipPath=region, item=self._oldItem(),
+                                       **self.props())
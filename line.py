@@ -118,6 +118,7 @@ class Line(Artist):
                                      self._ox,
                                      self._oy,
                                      clipPath=self.clipPath(),
+                                     item=self._oldItem(),
                                      **self.props())
 
 
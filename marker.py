@@ -1,5 +1,9 @@
 
 
+import math
+
+import numpy as np
+
 from artist import Artist
 from color import Color
 
@@ -96,6 +100,45 @@ class Marker(Artist):
 
         Artist.setProps(self, props, **kwprops)
 
+    def corners(self):
+        """
+        Return the outline of this Marker around (0, 0) as a numpy array of
+        shape (k, 2) of corners, or None if it is drawn with strokes instead.
+        See Marker.drawMany().
+        """
+        return None
+
+    def strokes(self):
+        """
+        Return the lines of this Marker around (0, 0) as a numpy array of
+        shape (m, 4) of (sx, sy, ex, ey), or None if it is drawn with an
+        outline instead. See Marker.drawMany().
+        """
+        return None
+
+    def drawMany(self, points, clipPath=None, item=None):
+        """
+        Draw this Marker at each of points, a numpy array of shape (n, 2) of
+        positions relative to the origin, with a single canvas call, and
+        return the canvas item. The position of this Marker is not used.
+
+        clipPath is the same as for Artist.setClipPath(), and item is the
+        item returned by the last call, to be updated in place.
+        """
+
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+
+        corners = self.corners()
+        if corners is not None:
+            polygons = points[:, np.newaxis, :] + corners[np.newaxis, :, :]
+            return self.canvas().drawPolygons(polygons, self._ox, self._oy, clipPath=clipPath,
+                                              item=item, **self.props())
+
+        strokes = self.strokes()
+        segments = np.tile(points, 2)[:, np.newaxis, :] + strokes[np.newaxis, :, :]
+        return self.canvas().drawSegments(segments.reshape(-1, 4), self._ox, self._oy, clipPath=clipPath,
+                                          item=item, **self.props())
+
 class CircleMarker(Marker):
     """
     A circle marker.
@@ -110,8 +153,15 @@ class CircleMarker(Marker):
                                        self._size / 2,
                                        self._ox,
                                        self._oy,
+                                       item=self._oldItem(),
                                        **self.props())
 
+    def corners(self):
+        # A polygon with enough corners that it cannot be told from a circle
+        r = self._size / 2
+        angles = np.linspace(0, 2 * math.pi, max(8, min(64, int(4 * r))), endpoint=False)
+        return np.column_stack((r * np.cos(angles), r * np.sin(angles)))
+
 class SquareMarker(Marker):
     """
     A square marker.
@@ -130,8 +180,14 @@ class SquareMarker(Marker):
                                      self._y + up,
                                      self._ox,
                                      self._oy,
+                                     item=self._oldItem(),
                                      **self.props())
 
+    def corners(self):
+        down = self._size / 2
+        up = self._size - down - 1
+        return np.array([[-down, -down], [up, -down], [up, up], [-down, up]], dtype=float)
+
 class VerticalMarker(Marker):
     """
     A vertical line.
@@ -151,8 +207,14 @@ class VerticalMarker(Marker):
                                       self._y + up,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(),
                                       **self.props())
 
+    def strokes(self):
+        down = self._size / 2
+        up = self._size - down
+        return np.array([[0, -down, 0, up]], dtype=float)
+
 class HorizontalMarker(Marker):
     """
     A horizontal line.
@@ -172,8 +234,14 @@ class HorizontalMarker(Marker):
                                       self._y,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(),
                                       **self.props())
 
+    def strokes(self):
+        down = self._size / 2
+        up = self._size - down
+        return np.array([[-down, 0, up, 0]], dtype=float)
+
 class PlusMarker(Marker):
     """
     A + sign.
@@ -193,6 +261,7 @@ class PlusMarker(Marker):
                                       self._y,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(),
                                       **self.props())
 
         line2 = self.canvas().drawLine(self._x,
@@ -201,10 +270,16 @@ class PlusMarker(Marker):
                                       self._y + up,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(1),
                                       **self.props())
 
         return (line1, line2)
 
+    def strokes(self):
+        down = self._size / 2
+        up = self._size - down
+        return np.array([[-down, 0, up, 0], [0, -down, 0, up]], dtype=float)
+
 class XMarker(Marker):
     """
     A x sign.
@@ -224,6 +299,7 @@ class XMarker(Marker):
                                       self._y + a,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(),
                                       **self.props())
 
         line2 = self.canvas().drawLine(self._x - a,
@@ -232,10 +308,15 @@ class XMarker(Marker):
                                       self._y - a,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(1),
                                       **self.props())
 
         return (line1, line2)
 
+    def strokes(self):
+        a = self._size / 2 * 0.707
+        return np.array([[-a, -a, a, a], [-a, a, a, -a]], dtype=float)
+
 class StarMarker(Marker):
     """
     An asterisk (*).
@@ -258,6 +339,7 @@ class StarMarker(Marker):
                                       self._y,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(),
                                       **self.props())
 
         line2 = self.canvas().drawLine(self._x,
@@ -266,6 +348,7 @@ class StarMarker(Marker):
                                       self._y + up,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(1),
                                       **self.props())
 
         line3 = self.canvas().drawLine(self._x - a,
@@ -274,6 +357,7 @@ class StarMarker(Marker):
                                       self._y + a,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(2),
                                       **self.props())
 
         line4 = self.canvas().drawLine(self._x - a,
@@ -282,10 +366,17 @@ class StarMarker(Marker):
                                       self._y - a,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(3),
                                       **self.props())
 
         return (line1, line2, line3, line4)
 
+    def strokes(self):
+        down = self._size / 2
+        up = self._size - down
+        a = self._size / 2 * 0.707
+        return np.array([[-down, 0, up, 0], [0, -down, 0, up], [-a, -a, a, a], [-a, a, a, -a]], dtype=float)
+
 class TriangleMarker(Marker):
     """
     A triangle.
@@ -303,8 +394,20 @@ class TriangleMarker(Marker):
                                       self._orientation,
                                       self._ox,
                                       self._oy,
+                                      item=self._oldItem(),
                                       **self.props())
 
+    def corners(self):
+        # The same corners as the canvas' drawTriangle(), with y up
+        h = self._size * 0.866 / 2.
+        l = self._size / 2.
+        corners = {'up': [[-l, -h], [l, -h], [0, h]],
+                   'down': [[-l, h], [l, h], [0, -h]],
+                   'right': [[-h, l], [-h, -l], [h, 0]],
+                   'left': [[h, l], [h, -l], [-h, 0]],
+                  }
+        return np.array(corners[self._orientation], dtype=float)
+
 class UpTriangleMarker(TriangleMarker):
     """
     A triangle pointing up.
@@ -2,8 +2,10 @@
 from artist import Artist
 from axis import Axis
 from datapair import DataPair
+from dataartist import DataArtist
 from text import *
 from base import Parent
+from accumulation import Accumulation
 
 class Plot(Artist):
     """
@@ -33,6 +35,17 @@ class CartesianPlot(Plot):
     leave space for the plot title, the axis labels, and the tick marks/labels. The
     amount of space between this absolute plot size and the locations of the axes is
     defined as the plot padding.
+
+    Data that is not a simple series, such as images, can be added to the plot as
+    DataArtists. These are drawn underneath the DataPairs.
+
+    The background, the axes, the ticks and the title are drawn into a cached
+    canvas layer (see setStaticCache()), so repainting the plot while only the
+    data changes does not paint them again.
+
+    The lines of the data can instead be accumulated into a single image that
+    shows how many of them go through each pixel (see setDataRendering()),
+    for plots of more series than can be told apart when drawn one by one.
     """
 
     def __init__(self, figure, canvas):
@@ -43,6 +56,7 @@ class CartesianPlot(Plot):
 
         self._title = Text(self.canvas())
         self._title.setOrigin(0, 0)
+        self.addChild(self._title)
         self.setTitle('')
 
         self._axes = {}
@@ -50,6 +64,13 @@ class CartesianPlot(Plot):
         self.addInitialAxes()
 
         self._datapairs = []
+        self._dataArtists = []
+
+        self._staticCache = True
+        self._staticLayer = None
+
+        self._dataRendering = 'items'
+        self._accumulation = Accumulation(self.canvas(), self)
 
         self._plotWidth = 0
         self._plotHeight = 0
@@ -63,6 +84,63 @@ class CartesianPlot(Plot):
     def title(self):
         return self._title
 
+    def setStaticCache(self, cached=True):
+        """
+        Set whether the background, the axes, the ticks and the title are
+        drawn into a cached canvas layer. The layer is painted from a pixmap,
+        which is only painted again when one of them is drawn differently:
+        when the data ranges of the axes, the plot region, or their
+        properties change. Takes effect the next time the plot is drawn.
+        """
+        if isinstance(cached, bool):
+            self._staticCache = cached
+
+    def staticCache(self):
+        """Return whether the static parts of the plot are cached."""
+        return self._staticCache
+
+    def staticGroup(self):
+        """
+        Return the cached canvas layer that the background, the axes, the
+        ticks and the title are drawn into, or None if caching is off.
+        """
+        if not self._staticCache:
+            return None
+        if self._staticLayer is None:
+            self._staticLayer = self.canvas().makeGroup(cached=True)
+        return self._staticLayer
+
+    def setDataRendering(self, mode):
+        """
+        Set how the data of the plot is drawn:
+
+        'items'
+            Every DataPair and DataArtist is drawn with its own canvas items.
+            This is the default.
+
+        'accumulate'
+            The lines of the DataPairs and of the DataArtists that have lines,
+            such as a LineCollection, are counted into a grid with one cell
+            per pixel of the axes region, which is drawn as one colored image.
+            Markers are not drawn. Other DataArtists are drawn as usual. See
+            CartesianPlot.accumulation() to set the Colormap and scale.
+
+        Takes effect the next time the plot is drawn.
+        """
+        if mode in ('items', 'accumulate'):
+            self._dataRendering = mode
+
+    def dataRendering(self):
+        """Return how the data of the plot is drawn, 'items' or 'accumulate'."""
+        return self._dataRendering
+
+    def accumulation(self):
+        """
+        Return the Accumulation that draws the data when the data rendering
+        is 'accumulate'.
+        """
+        return self._accumulation
+
     def setTitlePosition(self):
         """
         Set the position for the title. Currently, this is centered at the top of the
@@ -225,6 +303,113 @@ class CartesianPlot(Plot):
         """
         return (self._axesOx, self._axesOy, self._axesWidth, self._axesHeight)
 
+    def containsPoint(self, x, y):
+        """
+        Return True if the point (x, y), in figure coordinates, is inside the
+        region that data is displayed in.
+        """
+
+        (ox, oy, w, h) = self.axesRegion()
+        return ox <= x <= ox + w and oy <= y <= oy + h
+
+    def zoom(self, factor, x=None, y=None):
+        """
+        Zoom the data ranges of the axes by factor, keeping the data under the
+        point (x, y) fixed. x and y are in figure coordinates, and default to
+        the center of the axes region. A factor greater than 1 zooms in, and a
+        factor less than 1 zooms out.
+
+        Slaved axes follow their master, and all axes that are changed stop
+        being autoscaled. This does not redraw anything; see
+        CartesianPlot.updateView().
+        """
+
+        if factor <= 0:
+            return
+
+        (ox, oy, w, h) = self.axesRegion()
+        if x is None:
+            x = ox + w / 2.0
+        if y is None:
+            y = oy + h / 2.0
+
+        for axis in self._navigableAxes():
+            if axis.orientation() == 'horizontal':
+                center = x - axis._ox
+            else:
+                center = y - axis._oy
+
+            start = center + (axis._plotStart - center) / factor
+            end = center + (axis._plotEnd - center) / factor
+            axis.setDataRange(axis.mapPlotToData(start), axis.mapPlotToData(end))
+
+    def pan(self, dx, dy):
+        """
+        Move the data ranges of the axes so that the data moves by (dx, dy)
+        figure units.
+
+        Slaved axes follow their master, and all axes that are changed stop
+        being autoscaled. This does not redraw anything; see
+        CartesianPlot.updateView().
+        """
+
+        for axis in self._navigableAxes():
+            if axis.orientation() == 'horizontal':
+                delta = dx
+            else:
+                delta = dy
+
+            axis.setDataRange(axis.mapPlotToData(axis._plotStart - delta),
+                              axis.mapPlotToData(axis._plotEnd - delta))
+
+    def zoomToRegion(self, sx, sy, ex, ey):
+        """
+        Set the data ranges of the axes so that the rectangle with corners
+        (sx, sy) and (ex, ey), in figure coordinates, fills the axes region.
+
+        Slaved axes follow their master, and all axes that are changed stop
+        being autoscaled. This does not redraw anything; see
+        CartesianPlot.updateView().
+        """
+
+        # Ignore rectangles that are too small to have been meant as a zoom
+        if abs(ex - sx) < 2 or abs(ey - sy) < 2:
+            return
+
+        for axis in self._navigableAxes():
+            if axis.orientation() == 'horizontal':
+                start = sx - axis._ox
+                end = ex - axis._ox
+            else:
+                start = sy - axis._oy
+                end = ey - axis._oy
+
+            axis.setDataRange(axis.mapPlotToData(start), axis.mapPlotToData(end))
+
+    def _navigableAxes(self):
+        """
+        Return the axes whose data range can be changed directly, which are
+        all the axes that are not slaved.
+        """
+        return [axis for axis in self._axes.values() if axis._slavedTo is None]
+
+    def updateView(self):
+        """
+        Redraw the parts of the plot that depend on the data ranges of the
+        axes: the ticks and the data. The background, the axis lines, the
+        axis labels, and the title are left on the canvas as they are.
+
+        This is much faster than a full draw, and is used when zooming and
+        panning.
+        """
+
+        with self.canvas().frame(bulk=True):
+            with self.canvas().group(self.canvasGroup()):
+                with self.canvas().group(self.staticGroup()):
+                    for axis in self._axes.values():
+                        axis.drawTicks()
+                self.drawData()
+
     def addAxis(self, key, **kwprops):
         """
         Add a new axis to the plot, with its name given by key. If key already exists,
@@ -284,6 +469,37 @@ class CartesianPlot(Plot):
 
         try:
             self._datapairs.remove(datapair)
+            self.delChild(datapair)
+            datapair.remove()
+            return True
+        except:
+            return False
+
+    def addDataArtist(self, artist):
+        """
+        Add a DataArtist, such as a Heatmap, to this plot. artist must be a
+        DataArtist instance, or nothing happens. DataArtists are drawn in the
+        order they are added.
+        """
+        if isinstance(artist, DataArtist):
+            if artist.xAxis() is None:
+                artist.setXAxis(self._defaultAxes['x'])
+            if artist.yAxis() is None:
+                artist.setYAxis(self._defaultAxes['y'])
+            self._dataArtists.append(artist)
+            artist.setPlot(self)
+            self.addChild(artist)
+
+    def removeDataArtist(self, artist):
+        """
+        Remove the specified DataArtist from this plot. Returns True if it was
+        removed, False if it was not in the plot.
+        """
+
+        try:
+            self._dataArtists.remove(artist)
+            self.delChild(artist)
+            artist.remove()
             return True
         except:
             return False
@@ -304,7 +520,10 @@ class CartesianPlot(Plot):
 
         if text is not None:
             if isinstance(text, Text):
+                self.delChild(self._title)
+                self._title.remove()
                 self._title = text
+                self.addChild(self._title)
             elif isinstance(text, str):
                 self._title.setProps(text=text)
             elif isinstance(text, dict):
@@ -344,15 +563,95 @@ class CartesianPlot(Plot):
         return self._axes[key]
 
     def clear(self):
-        Parent.clear(self)
-        self.canvas().update()
-
-    def _draw(self):
-        self.clear()
-        item = self.drawBackground()
-        self.drawAxes()
-        self.drawData()
-        self._title.draw()
+        """
+        Remove everything this plot has drawn from the canvas. It is all
+        drawn into the plot's canvas group, so it is removed with one call.
+        """
+        with self.canvas().frame():
+            if self._group is None:
+                Parent.clear(self)
+            else:
+                self.remove()
+            self.canvas().update()
+
+    def remove(self):
+        """
+        Remove the plot from the canvas, but do not delete it. Once the plot
+        has been drawn, everything it draws is in its canvas group, so this
+        removes the axes, the ticks, the title and the data as well as the
+        background; the group is put back when the plot is drawn again. This
+        is how a plot that is set to be invisible disappears.
+        """
+        if self._group is None:
+            Artist.remove(self)
+        else:
+            self.canvas().removeGroup(self._group)
+
+    def prepare(self, prepared, job=None):
+        """
+        Do all the work for drawing this plot that does not need the canvas:
+        autoscale the axes, compute the tick locations and labels, map the
+        data to plot coordinates, and prepare the DataArtists. The results are stored in the prepared
+        dictionary, to be used by CartesianPlot.draw().
+
+        The axes themselves are not changed. The data ranges that autoscaling
+        finds are kept in snapshots of the axes in prepared (see
+        Axis.prepareMapping()), which the data is mapped with, and they are
+        set on the axes by CartesianPlot.applyAxes() when prepared is drawn.
+
+        This can be run outside the GUI thread. If job is given and it is
+        cancelled part way through, then this stops early and returns False.
+        Otherwise it returns True.
+        """
+
+        for axis in self._axes.values():
+            axis.prepare(prepared)
+
+        for data in self._dataArtists + self._datapairs:
+            if job is not None and job.cancelled():
+                return False
+            data.prepare(prepared)
+
+        if self._dataRendering == 'accumulate':
+            if job is not None and job.cancelled():
+                return False
+            self._accumulation.prepare(prepared)
+
+        prepared[self] = True
+        return True
+
+    def applyAxes(self, prepared):
+        """
+        Set the data ranges that CartesianPlot.prepare() found for the
+        autoscaled axes, and return whether every Axis now maps data the way
+        it was mapped in prepared. This is False if an Axis was zoomed,
+        panned or resized while prepared was made, in which case prepared
+        cannot be drawn. This must be called in the GUI thread.
+        """
+
+        axes = self._axes.values()
+        for axis in axes:
+            axis.applyMapping(prepared)
+        return all(axis.mappingMatches(prepared) for axis in axes)
+
+    def _draw(self, prepared=None):
+        # Data that was prepared for axes that have changed since is thrown
+        # away and prepared again
+        if prepared is None or self not in prepared or not self.applyAxes(prepared):
+            prepared = {}
+            self.prepare(prepared)
+            self.applyAxes(prepared)
+
+        # The items from the last draw are updated in place, so the plot is
+        # not cleared first
+        # The data is drawn on top of the static layer, so the title is
+        # drawn before it
+        with self.canvas().group(self.canvasGroup()):
+            with self.canvas().group(self.staticGroup()):
+                item = self.drawBackground()
+                self.drawAxes(prepared)
+                self._title.draw()
+            self.drawData(prepared)
         return item
 
     def drawBackground(self):
@@ -366,34 +665,82 @@ class CartesianPlot(Plot):
         ox, oy = self.axis('bottom').origin()
 
         # origin of the plot is the position of the plot in figure coordinates
-        return self.canvas().drawRect(sx, sy, ex, ey, ox, oy, **{'color': self.color(), 'fillcolor': self.color()})
+        return self.canvas().drawRect(sx, sy, ex, ey, ox, oy, item=self._oldItem(),
+                                      **{'color': self.color(), 'fillcolor': self.color()})
 
 
-    def drawAxes(self):
+    def autoscaleAxes(self):
         """
-        Draw the axes and tick marks for the plot.
+        Autoscale every axis that is set to be autoscaled.
         """
 
-        axes = self._axes.values()
-        
-        for axis in axes:
+        for axis in self._axes.values():
             if axis._autoscaled:
                 axis.autoscale()
 
+    def drawAxes(self, prepared=None):
+        """
+        Draw the axes and tick marks for the plot.
+
+        prepared is a dictionary filled in by CartesianPlot.prepare(). If it is
+        None, then the axes are autoscaled and the ticks are computed here.
+        """
+
+        axes = self._axes.values()
+
+        if prepared is None:
+            self.autoscaleAxes()
+            prepared = {}
+
         for axis in axes:
             axis.draw()
         
         # need to draw ticks here so that they cover up the axis
         for axis in axes:
-            axis.drawTicks()
+            axis.drawTicks(prepared)
 
-    def drawData(self):
+    def drawData(self, prepared={}):
         """
         Draw all the data attached to this plot.
+
+        prepared is a dictionary filled in by CartesianPlot.prepare(). Any
+        DataPair or DataArtist that is not in it is prepared here.
+
+        DataArtists are drawn first, so that lines and markers are not hidden
+        behind images. If the data rendering is 'accumulate', then the lines
+        are drawn as one image instead, on top of the other DataArtists.
         """
-        
+
+        if self._dataRendering == 'accumulate':
+            self.drawAccumulated(prepared)
+            return
+
+        self._accumulation.remove()
+
+        for artist in self._dataArtists:
+            artist.draw(prepared)
+
         for datapair in self._datapairs:
-            datapair.remove()
-            datapair.makeLinesAndMarkers()
+            if not datapair.isVisible():
+                continue
+            datapair.makeLinesAndMarkers(prepared.get(datapair))
             datapair.draw()
 
+    def drawAccumulated(self, prepared={}):
+        """
+        Draw the data of this plot with the lines accumulated into one image;
+        see CartesianPlot.setDataRendering(). The items that the DataPairs
+        and DataArtists were last drawn with are removed.
+        """
+
+        sources = self._accumulation.sources(prepared)
+        for artist in self._dataArtists:
+            if artist in sources:
+                artist.remove()
+            else:
+                artist.draw(prepared)
+
+        for datapair in self._datapairs:
+            datapair.remove()
+
+        self._accumulation.draw(prepared)
@@ -1,29 +1,39 @@
 
+import weakref
 
 from figure import *
 from plot import *
 from datapair import *
+from heatmap import Heatmap
+from histogram import Histogram
+from density import Density
+from errorbar import ErrorBars
+from fill import FillBetween
+from contour import Contour
+from bar import Bars
+from collection import LineCollection
+from ticker import FixedLocator, NullLocator, StringLabeler
 
 class FigureManager(object):
     """
-    A class that contains all the figures that have been created using the plotter
-    interface. It also keeps track of the active figure.
+    A class that keeps track of the figures that have been created using the
+    plotter interface, and of the active figure.
+
+    Only the active figure is kept alive by the FigureManager. The other
+    figures are held with weak references, so a figure that is no longer
+    used anywhere else is garbage collected, together with its canvas and
+    everything drawn on it, instead of being kept until the program exits.
     """
 
-    _figures = []   # list of all figures that have been created
-    _active = None  # index of the active figure
+    _figures = []   # weak references to the figures, in the order they were added
+    _active = None  # the active figure
 
     @staticmethod
     def getActive():
         """
         Return the active Figure object, or None if none exists.
         """
-
-        try:
-            return FigureManager._figures[FigureManager._active]
-        except TypeError, IndexError:
-            # _active is None or not in 0..len(_figures)
-            return None
+        return FigureManager._active
 
     @staticmethod
     def setActive(fig):
@@ -33,12 +43,46 @@ class FigureManager(object):
         """
 
         if isinstance(fig, Figure):
-            try:
-                FigureManager._active = FigureManager._figures.index(fig)
-            except ValueError:
-                # fig is not in _figures
-                FigureManager._figures.append(fig)
-                FigureManager._active = len(FigureManager._figures) - 1
+            if fig not in FigureManager.figures():
+                FigureManager._figures.append(weakref.ref(fig, FigureManager._forget))
+            FigureManager._active = fig
+
+    @staticmethod
+    def figures():
+        """
+        Return a list of the figures that are still alive, in the order they
+        were added.
+        """
+
+        figures = []
+        for ref in FigureManager._figures:
+            fig = ref()
+            if fig is not None:
+                figures.append(fig)
+        return figures
+
+    @staticmethod
+    def removeFigure(fig):
+        """
+        Stop keeping track of fig. If it is the active figure, then the last
+        figure that is still alive becomes active, if there is one.
+        """
+
+        FigureManager._figures = [ref for ref in FigureManager._figures if ref() is not fig]
+        if FigureManager._active is fig:
+            figures = FigureManager.figures()
+            if len(figures) > 0:
+                FigureManager._active = figures[-1]
+            else:
+                FigureManager._active = None
+
+    @staticmethod
+    def _forget(ref):
+        """Called when a figure has been garbage collected."""
+        try:
+            FigureManager._figures.remove(ref)
+        except ValueError:
+            pass
 
 
 def figure(width=600, height=400):
@@ -70,6 +114,219 @@ def plot(*args, **kwargs):
     Running show() multiple times will show the last defined plot.
     """
     
+    fig, plot = _currentPlot(**kwargs)
+
+    # Series that are given the same x object share one Column, so that it
+    # is only mapped and scanned once for all of them
+    columns = {}
+
+    args = list(args)
+    while len(args) > 0:
+        x = args.pop(0)
+        y = args.pop(0)
+        if len(args) > 0 and isinstance(args[0], str):
+            fs = args.pop(0)
+        else:
+            fs = ''
+
+        if not isinstance(x, Column):
+            if id(x) not in columns:
+                columns[id(x)] = Column(x)
+            x = columns[id(x)]
+
+        d = DataPair(fig.canvas(), x, y, fs)
+        plot.addDataPair(d)
+
+    return plot
+
+def heatmap(data, extent=None, colormap='gray', **kwargs):
+    """
+    Draw a 2-D array as an image. See Heatmap for the meaning of extent and
+    colormap.
+
+    Valid kwargs are new and position, the same as for plot(), and vmin and
+    vmax, which are passed on to the Heatmap.
+
+    Return the plot.
+    """
+
+    fig, plot = _currentPlot(**kwargs)
+
+    h = Heatmap(fig.canvas(), data, extent, colormap, kwargs.get('vmin'), kwargs.get('vmax'))
+    plot.addDataArtist(h)
+
+    return plot
+
+def hist(data, bins=10, range=None, **kwargs):
+    """
+    Bin data into a histogram and draw it as bars. See Histogram for the
+    meaning of bins and range.
+
+    Valid kwargs are new and position, the same as for plot(). Any other
+    kwargs are properties of the Histogram.
+
+    Return the Histogram, so that more data can be added to it with
+    Histogram.add().
+    """
+
+    props = dict(kwargs)
+    props.pop('new', None)
+    props.pop('position', None)
+
+    fig, plot = _currentPlot(**kwargs)
+
+    h = Histogram(fig.canvas(), data, bins, range, **props)
+    plot.addDataArtist(h)
+
+    return h
+
+def density(x, y, shape='hex', size=10, **kwargs):
+    """
+    Draw a large set of points as their density on the screen. See Density
+    for the meaning of shape and size.
+
+    Valid kwargs are new and position, the same as for plot(), and levels,
+    scale and colormap, which are passed on to the Density.
+
+    Return the plot.
+    """
+
+    fig, plot = _currentPlot(**kwargs)
+
+    options = {}
+    for key in ('levels', 'scale', 'colormap'):
+        if key in kwargs:
+            options[key] = kwargs[key]
+
+    d = Density(fig.canvas(), x, y, shape, size, **options)
+    plot.addDataArtist(d)
+
+    return plot
+
+def errorbar(x, y, yerr=None, xerr=None, formatString='', **kwargs):
+    """
+    Plot y against x with error bars. See ErrorBars for the formats of yerr
+    and xerr.
+
+    Valid kwargs are new and position, the same as for plot(), and capSize,
+    which is passed on to the ErrorBars.
+
+    Return the plot.
+    """
+
+    fig, plot = _currentPlot(**kwargs)
+
+    d = DataPair(fig.canvas(), x, y, formatString)
+    plot.addDataPair(d)
+
+    e = ErrorBars(fig.canvas(), d, yerr, xerr, kwargs.get('capSize', 6), color=d._lineProps.get('color', 'black'))
+    plot.addDataArtist(e)
+
+    return plot
+
+def fillBetween(lower, upper=None, **kwargs):
+    """
+    Fill the band between lower and upper, using the x data of the last
+    DataPair plotted on the current plot. If upper is None, then the band
+    is between lower and that DataPair's y data. Any kwargs are properties
+    of the FillBetween.
+
+    Return the plot, or None if the current plot has no DataPairs.
+    """
+
+    fig = FigureManager.getActive()
+    if fig is None or fig.getCurrentPlot() is None:
+        return None
+
+    plot = fig.getCurrentPlot()
+    if len(plot._datapairs) == 0:
+        return None
+
+    f = FillBetween(fig.canvas(), plot._datapairs[-1], lower, upper, **kwargs)
+    plot.addDataArtist(f)
+
+    return plot
+
+def contour(z, x=None, y=None, levels=10, colormap='viridis', **kwargs):
+    """
+    Draw contour lines of the 2-D array z. See Contour for the meaning of
+    x, y, levels and colormap.
+
+    Valid kwargs are new and position, the same as for plot(). Any other
+    kwargs are properties of the Contour.
+
+    Return the plot.
+    """
+
+    props = dict(kwargs)
+    props.pop('new', None)
+    props.pop('position', None)
+
+    fig, plot = _currentPlot(**kwargs)
+
+    c = Contour(fig.canvas(), z, x, y, levels, colormap, **props)
+    plot.addDataArtist(c)
+
+    return plot
+
+def lines(x, y, **kwargs):
+    """
+    Draw many series that share the same style as a single LineCollection.
+    See LineCollection for the formats of x and y.
+
+    Valid kwargs are new and position, the same as for plot(). Any other
+    kwargs are properties of the LineCollection.
+
+    Return the plot.
+    """
+
+    props = dict(kwargs)
+    props.pop('new', None)
+    props.pop('position', None)
+
+    fig, plot = _currentPlot(**kwargs)
+
+    c = LineCollection(fig.canvas(), x, y, **props)
+    plot.addDataArtist(c)
+
+    return plot
+
+def bar(categories, heights, stacked=True, **kwargs):
+    """
+    Draw bars of heights over categories. heights can have one row per
+    series. See Bars for the meaning of the arguments. If the categories are
+    labels, then they are used as the labels of the ticks of the bottom Axis.
+
+    Valid kwargs are new and position, the same as for plot(), and barWidth
+    and colors, which are passed on to Bars. Any other kwargs are properties
+    of the Bars.
+
+    Return the Bars.
+    """
+
+    props = dict(kwargs)
+    props.pop('new', None)
+    props.pop('position', None)
+
+    fig, plot = _currentPlot(**kwargs)
+
+    b = Bars(fig.canvas(), categories, heights, stacked, **props)
+    plot.addDataArtist(b)
+
+    if b.labels() is not None:
+        axis = plot.axis('bottom')
+        axis.setTicksLocator('major', FixedLocator(list(b.positions())), True)
+        axis.setTicksLocator('minor', NullLocator(), True)
+        axis.setTicksLabeler('major', StringLabeler(b.labels()), True)
+
+    return b
+
+def _currentPlot(**kwargs):
+    """
+    Return the active figure and its current plot as a 2-tuple, creating
+    them if needed. kwargs are the new and position kwargs of plot().
+    """
+
     newPlot = False
     if 'new' in kwargs.keys():
         newPlot = True
@@ -87,19 +344,7 @@ def plot(*args, **kwargs):
             position = kwargs['position']
         plot.setPlotLocation(*position)
 
-    args = list(args)
-    while len(args) > 0:
-        x = args.pop(0)
-        y = args.pop(0)
-        if len(args) > 0 and isinstance(args[0], str):
-            fs = args.pop(0)
-        else:
-            fs = ''
-
-        d = DataPair(fig.canvas(), x, y, fs)
-        plot.addDataPair(d)
-
-    return plot
+    return fig, plot
 
 def clearFigure():
     """
@@ -111,6 +356,18 @@ def clearFigure():
         fig.clear()
         fig.deleteAllPlots()
 
+def closeFigure(fig=None):
+    """
+    Close fig, or the active figure if fig is None, and stop keeping track of
+    it. See Figure.close().
+    """
+
+    if fig is None:
+        fig = FigureManager.getActive()
+    if fig is not None:
+        FigureManager.removeFigure(fig)
+        fig.close()
+
 def show():
     """
     Redraw the current figure and display it.
@@ -118,9 +375,9 @@ def show():
 
     fig = FigureManager.getActive()
     if fig is not None:
-        # Every time the figure is shown, need to reinitialize it so that the sizes
-        # are all set correctly.
-        fig.canvas().__init__(fig, fig.canvas().scene().width(), fig.canvas().scene().height())
+        # Every time the figure is shown, it gets a new window, in case the
+        # last one was closed
+        fig.canvas().makeView()
         fig.draw()
         _show_Qt()
 
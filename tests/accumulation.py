@@ -0,0 +1,22 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# 10,000 random walks of 250 steps each, accumulated into one image that
+# shows how many of the walks go through each pixel.
+
+steps = np.arange(250)
+paths = np.cumsum(np.random.normal(0, 1, (10000, 250)), axis=1)
+
+p = lines(steps, paths)
+p.setTitle('%d paths' % len(paths))
+p.setDataRendering('accumulate')
+p.accumulation().setColormap('hot')
+
+show()
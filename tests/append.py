@@ -0,0 +1,37 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# Two series that share their x data are appended to in batches, like a
+# live feed. The shared x Column only gets each batch of x values once.
+
+x = np.arange(100.0)
+p = plot(x, np.sin(x / 10), 'b-', x, np.cos(x / 10), 'r-')
+(sine, cosine) = p._datapairs
+
+for start in range(100, 1000, 100):
+    batch = np.arange(start, start + 100.0)
+    sine.append(batch, np.sin(batch / 10))
+    cosine.append(batch, np.cos(batch / 10))
+
+assert sine.xColumn() is cosine.xColumn()
+assert len(sine.xColumn()) == len(sine.yColumn()) == len(cosine.yColumn()) == 1000
+
+# Points that do not line up are refused, and nothing is appended
+try:
+    sine.append(np.arange(1000, 1010.0), np.zeros(5))
+except ValueError:
+    pass
+else:
+    assert False, 'append() took x and y of different lengths'
+assert len(sine.xColumn()) == len(sine.yColumn()) == 1000
+
+p.setTitle('%d points in each series' % len(sine.xColumn()))
+
+show()
@@ -0,0 +1,23 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# Three stacked series of bars over labelled categories, and 500 bars side
+# by side. Each series is drawn as a single item.
+
+months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
+heights = np.array([[3, 4, 2, 5, 6, 4],
+                    [1, 2, 2, 1, 3, 2],
+                    [2, -1, 1, -2, 1, 2]])
+
+b = bar(months, heights, position=[2, 1, 1])
+
+bar(np.arange(500), np.random.rand(2, 500), stacked=False, new=True, position=[2, 1, 2])
+
+show()
@@ -0,0 +1,20 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# 10,000 random walks of 250 steps each. They share their x data, so they
+# are kept as one 2-D array and drawn as a single item.
+
+steps = np.arange(250)
+paths = np.cumsum(np.random.normal(0, 1, (10000, 250)), axis=1)
+
+p = lines(steps, paths, color=(0, 0, 255, 8))
+p.setTitle('%d paths' % len(paths))
+
+show()
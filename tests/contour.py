@@ -0,0 +1,22 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# Contour lines of a 2000x2000 field. The lines are found once per level;
+# zooming and panning only map them to the screen again.
+
+x = np.linspace(-3, 3, 2000)
+y = np.linspace(-3, 3, 2000)
+z = np.sin(x[np.newaxis, :] * 2) * np.cos(y[:, np.newaxis] * 2) \
+    + np.exp(-(x[np.newaxis, :] ** 2 + y[:, np.newaxis] ** 2))
+
+p = contour(z, x, y, levels=12)
+p.setTitle('%d x %d contour' % z.shape)
+
+show()
@@ -0,0 +1,20 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# 10^6 scattered points drawn as hexagonal bins with a log color scale.
+
+n = 1000000
+x = np.random.standard_normal(n)
+y = 2 * x + np.random.standard_normal(n)
+
+p = density(x, y, 'hex', 12, scale='log')
+p.setTitle('%d points' % n)
+
+show()
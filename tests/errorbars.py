@@ -0,0 +1,21 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# A noisy series with a confidence band and error bars. The band and the
+# error bars are each drawn as one item, at the points the line is drawn at.
+
+x = np.linspace(0, 20, 200000)
+y = np.sin(x) + np.random.normal(0, 0.05, len(x))
+err = 0.2 + 0.1 * np.cos(x / 3)
+
+errorbar(x, y, yerr=err, formatString='b- ')
+fillBetween(np.sin(x) - 2 * err, np.sin(x) + 2 * err)
+
+show()
@@ -0,0 +1,21 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# A 2000x3000 field drawn as a single image. Zooming and panning only
+# resample the part of the field that can be seen.
+
+x = np.linspace(-3, 3, 3000)
+y = np.linspace(-2, 2, 2000)
+z = np.sin(x[np.newaxis, :] ** 2 + y[:, np.newaxis] ** 2) * np.exp(-y[:, np.newaxis] ** 2 / 4)
+
+p = heatmap(z, extent=(-3, 3, -2, 2), colormap='viridis')
+p.setTitle('%d x %d heatmap' % z.shape)
+
+show()
@@ -0,0 +1,21 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# 10^7 latency samples binned in batches, with a log count axis.
+
+h = hist(np.random.lognormal(0, 0.5, 10 ** 6), bins=200, range=(0, 10))
+for i in range(9):
+    h.add(np.random.lognormal(0, 0.5, 10 ** 6))
+
+p = h.plot()
+p.axis('left').setLog()
+p.setTitle('%d samples' % h.counts().sum())
+
+show()
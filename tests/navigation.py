@@ -0,0 +1,19 @@
+#!/usr/bin/python2
+
+import sys
+import math
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# Scroll to zoom, drag to pan, and shift-drag or right-drag to zoom to a box.
+
+n = 1000000
+x = range(n)
+y = [math.sin(i / 1000.) + math.sin(i / 37.) / 10. for i in x]
+
+p = plot(x, y, 'b- ')
+p.setTitle('%d points' % n)
+
+show()
@@ -0,0 +1,28 @@
+#!/usr/bin/python2
+# -*- coding: utf-8 -*-
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# A Figure is recorded into a DisplayList twice. Nothing changed in between,
+# so the two recordings are identical, even though most of their ops are not
+# clipped. Non-ASCII text is recorded as it is.
+
+fig = figure()
+x = np.linspace(0, 10, 200)
+p = plot(x, np.sin(x), 'b-o')
+p.setTitle({'text': u'sin(θ) for 0 ≤ θ ≤ 10'})
+
+first = fig.record()
+second = fig.record()
+
+assert first.diff(first) == ([], [])
+assert first.diff(second) == ([], [])
+assert u'sin(θ) for 0 ≤ θ ≤ 10' in first._strings
+
+show()
@@ -0,0 +1,20 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# Values of both signs that span many orders of magnitude. The left Axis is
+# linear between -1 and 1, and logarithmic beyond.
+
+x = np.linspace(-15, 15, 100000)
+y = np.sinh(x)
+
+p = plot(x, y, 'k- ')
+p.axis('left').setSymlog(10, 1.0)
+
+show()
@@ -0,0 +1,22 @@
+#!/usr/bin/python2
+
+import sys
+
+import numpy as np
+
+sys.path.insert(1, '../')
+
+from plotter import *
+
+# A year of one-second samples. The datetime64 array is converted to epoch
+# seconds in one step, and the bottom Axis shows calendar ticks.
+
+n = 365 * 86400
+x = np.datetime64('2015-01-01T00:00:00') + np.arange(n).astype('timedelta64[s]')
+y = np.cumsum(np.random.randn(n))
+
+p = plot(x, y, 'b- ')
+p.axis('bottom').setTime()
+p.setTitle('%d samples' % n)
+
+show()
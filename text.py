@@ -109,5 +109,6 @@ class Text(Artist):
                                         self._y,
                                         self._ox,
                                         self._oy,
+                                        item=self._oldItem(),
                                         **props)
 
@@ -1,5 +1,36 @@
 
 import math
+import time
+import bisect
+import calendar
+import datetime
+
+import numpy as np
+
+def roundToStep(values, step, anchor=0.0):
+    """
+    Return values, which are anchor plus multiples of step, as a list of
+    floats with the error of computing them rounded off, such as
+    3 * 0.1 = 0.30000000000000004. This keeps the values clean to label, and
+    keeps ticks far from 0 apart.
+
+    The values are rounded to the decimal places of step (one more than its
+    leading digit, for steps such as 0.25). If anchor is not a multiple of
+    step, then they are rounded to 12 significant digits instead, if that is
+    finer, so that the decimal places of anchor are kept.
+    """
+
+    values = [float(v) for v in values]
+    step = abs(float(step))
+    if not (step > 0 and np.isfinite(step)):
+        return values
+
+    digits = max(0, 1 - int(math.floor(math.log10(step))))
+    ratio = float(anchor) / step
+    largest = max(abs(v) for v in values) if values else 0
+    if abs(ratio - round(ratio)) > 1e-9 and largest > 0 and np.isfinite(largest):
+        digits = max(digits, 11 - int(math.floor(math.log10(largest))))
+    return [round(v, digits) for v in values]
 
 class Locator(object):
     """
@@ -193,8 +224,13 @@ class SpacedLocator(Locator):
     Define tick locations by spacing ticks by 'base'. If 'anchor' is specified,
     then ticks will be spaced starting from there instead of from the starting
     edge of the axis.
+
+    If base is so small compared with the data range that there would be
+    more than _maxLocations ticks, then only every few of them are used.
     """
 
+    _maxLocations = 1000
+
     def __init__(self, base=1.0, anchor=None):
         """
         **Constructor**
@@ -238,39 +274,27 @@ class SpacedLocator(Locator):
         at the first location >= 'end'.
 
         If anchor is specified, then the ticks are spaced off of the anchor
-        value. The closed values beyond or equal to 'start' and 'end' will
+        value. The closest values beyond or equal to 'start' and 'end' will
         be included.
         """
 
         base = self._base
         anchor = self._anchor
-        locs = []
         if anchor is None:
-            loc = start
-
-            while loc < end:
-                locs.append(loc)
-                loc += base
-
-            locs.append(loc)
-
-        # use anchor
-        else:
-            loc = anchor
-            while loc > start:
-                locs.insert(0, loc)
-                loc -= base
+            anchor = start
 
-            locs.insert(0, loc)
+        span = float(end) - float(start)
+        if not np.isfinite(span) or span < 0:
+            return [float(start)]
 
-            loc = anchor + base
-            while loc < end:
-                locs.append(loc)
-                loc += base
-
-            locs.append(loc)
-
-        return locs
+        # Each location is computed from its index, so no error accumulates.
+        # If base is so small that there would be too many locations, then
+        # only every few of them are used.
+        first = int(math.floor((start - anchor) / base))
+        last = int(math.ceil((end - anchor) / base))
+        stride = max(int(math.ceil((last - first + 1) / float(self._maxLocations))), 1)
+        first -= first % stride
+        return roundToStep([anchor + i * base for i in range(first, last + stride, stride)], base, anchor)
 
     def setValues(self, **kwargs):
         """
@@ -285,12 +309,101 @@ class SpacedLocator(Locator):
         self.setBase(base)
         self.setAnchor(anchor)
 
-class LogLocator(Locator):
+class AutoLocator(Locator):
     """
-    Define tick locations in a logarithmic fashion.
+    Define tick locations at round numbers: multiples of 1, 2 or 5 times a
+    power of 10. The smallest such step that gives at most maxTicks ticks in
+    the data range is chosen.
+
+    The step is found in closed form and every location is computed from
+    its index, so no error accumulates and the number of locations is
+    always bounded. One location beyond each end of the data range is
+    included, so that minor ticks can be spaced up to the edges of the Axis.
+
+    For minor ticks, each interval between two major ticks is split into 5
+    (for steps of 1 or 5) or 4 (for steps of 2) parts.
     """
 
-# TODO need to take care of symlog
+    _mantissas = (1, 2, 5, 10)
+
+    def __init__(self, maxTicks=7):
+        """
+        **Constructor**
+
+        maxTicks
+            The largest number of ticks to create in the data range.
+        """
+
+        Locator.__init__(self)
+
+        self._maxTicks = 7
+        self.setMaxTicks(maxTicks)
+
+    def setMaxTicks(self, maxTicks):
+        """
+        Set the largest number of ticks. maxTicks must be an int of at
+        least 2.
+        """
+        if isinstance(maxTicks, int) and maxTicks >= 2:
+            self._maxTicks = maxTicks
+
+    def step(self, start, end):
+        """
+        Return the step between ticks for the data range start to end, or 0
+        if the range is empty or not finite.
+        """
+
+        span = abs(float(end) - float(start))
+        if not (span > 0 and np.isfinite(span)):
+            return 0
+
+        raw = span / (self._maxTicks - 1)
+        magnitude = pow(10.0, math.floor(math.log10(raw)))
+        for mantissa in self._mantissas:
+            if mantissa * magnitude >= raw:
+                return mantissa * magnitude
+
+    def locations(self, start, end, axisType='major'):
+        """
+        Return a list of round numbers from at or below start to at or
+        above end.
+        """
+
+        if start > end:
+            start, end = end, start
+
+        if axisType == 'minor':
+            # Split one major interval
+            span = float(end) - float(start)
+            if not (span > 0 and np.isfinite(span)):
+                return [float(start), float(end)]
+            mantissa = span / pow(10.0, math.floor(math.log10(span)))
+            parts = 4 if round(mantissa) == 2 else 5
+            return roundToStep([start + span * i / parts for i in range(parts)] + [end], span / parts)
+
+        step = self.step(start, end)
+        if step == 0:
+            return [float(start), float(end)]
+
+        first = int(math.floor(start / step))
+        last = int(math.ceil(end / step))
+        return roundToStep([i * step for i in range(first, last + 1)], step)
+
+    def setValues(self, **kwargs):
+        """
+        Accepted keywords:
+
+        * maxTicks
+
+        """
+        maxTicks = kwargs.pop('maxTicks', None)
+        self.setMaxTicks(maxTicks)
+
+class LogLocator(Locator):
+    """
+    Define tick locations in a logarithmic fashion. For an Axis with a symlog
+    scaling, use SymlogLocator instead.
+    """
 
     def __init__(self, base=10, subdivisions=[1]):
         """
@@ -364,6 +477,289 @@ class LogLocator(Locator):
         self.setSubdivisions(subdivisions)
 
 
+class SymlogLocator(Locator):
+    """
+    Define tick locations for an Axis with a symlog scaling: 0, and the
+    orders of magnitude of base above linearThreshold, on both sides of 0.
+
+    If the data range spans more than maxDecades orders of magnitude on
+    either side of 0, then only every few of them are used, so the number
+    of locations is always bounded.
+    """
+
+    def __init__(self, base=10, linearThreshold=1.0, subdivisions=[1], maxDecades=8):
+        """
+        **Constructor**
+
+        base
+            The base of the logarithm. Defaults to 10.
+
+        linearThreshold
+            The value where the Axis changes from linear to logarithmic.
+            This should be the same as the Axis' linear threshold.
+
+        subdivisions
+            The list of locations within one order of magnitude that should
+            be created, like for LogLocator.
+
+        maxDecades
+            The largest number of orders of magnitude to create locations
+            for on each side of 0.
+        """
+
+        Locator.__init__(self)
+
+        self._base = 10
+        self._linearThreshold = 1.0
+        self._subdivisions = [1]
+        self._maxDecades = 8
+        self.setBase(base)
+        self.setLinearThreshold(linearThreshold)
+        self.setSubdivisions(subdivisions)
+        self.setMaxDecades(maxDecades)
+
+    def setBase(self, base):
+        """
+        Set the base of the logarithm.
+        """
+        if isinstance(base, (int, float)) and base > 1:
+            self._base = base
+
+    def setLinearThreshold(self, linearThreshold):
+        """
+        Set the value where the Axis changes from linear to logarithmic.
+        """
+        if isinstance(linearThreshold, (int, float)) and linearThreshold > 0:
+            self._linearThreshold = float(linearThreshold)
+
+    def setSubdivisions(self, subdivisions):
+        """
+        Set the subdivisions of the logarithm.
+        """
+        if isinstance(subdivisions, (list, tuple)):
+            self._subdivisions = list(subdivisions)
+
+    def setMaxDecades(self, maxDecades):
+        """
+        Set the largest number of orders of magnitude on each side of 0.
+        """
+        if isinstance(maxDecades, int) and maxDecades >= 1:
+            self._maxDecades = maxDecades
+
+    def locations(self, start, end, axisType='major'):
+        """
+        Return a sorted list of locations between start and end. For major
+        ticks, the closest location beyond each end is included as well, so
+        that minor ticks can be spaced up to the edges of the Axis.
+        """
+
+        if start > end:
+            start, end = end, start
+        if not (np.isfinite(start) and np.isfinite(end)):
+            return []
+
+        threshold = self._linearThreshold
+        base = self._base
+
+        # The number of orders of magnitude above the threshold that the
+        # range reaches, plus one to go beyond the end
+        largest = max(abs(start), abs(end))
+        decades = 1
+        if largest > threshold:
+            decades = int(math.ceil(math.log(largest / threshold, base))) + 1
+        stride = max(int(math.ceil(decades / float(self._maxDecades))), 1)
+
+        positive = [m * threshold * pow(base, k)
+                    for k in range(0, decades + stride, stride) for m in self._subdivisions]
+        locs = sorted(set([-loc for loc in positive] + [0.0] + positive))
+
+        first = bisect.bisect_left(locs, start)
+        last = bisect.bisect_right(locs, end)
+        if axisType == 'major':
+            first = max(first - 1, 0)
+            last += 1
+        return locs[first:last]
+
+    def setValues(self, **kwargs):
+        """
+        Accepted keywords:
+
+        * base
+        * linearThreshold
+        * subdivisions
+        * maxDecades
+
+        """
+        self.setBase(kwargs.pop('base', None))
+        self.setLinearThreshold(kwargs.pop('linearThreshold', None))
+        self.setSubdivisions(kwargs.pop('subdivisions', None))
+        self.setMaxDecades(kwargs.pop('maxDecades', None))
+
+def epochSeconds(values):
+    """
+    Convert values to a numpy array of seconds since the Unix epoch (UTC),
+    which is how DateLocator and DateLabeler expect time data.
+
+    values can be a numpy datetime64 array, which is converted without
+    creating a datetime object per value, or a sequence of datetime.datetime
+    instances (taken as UTC), or numbers, which are returned as floats.
+    """
+
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        seconds = values.astype('datetime64[us]').astype(np.int64) / 1e6
+        seconds[np.isnat(values)] = np.nan
+        return seconds
+
+    try:
+        return np.asarray(values, dtype=float)
+    except TypeError:
+        epoch = datetime.datetime(1970, 1, 1)
+        return np.array([np.nan if v is None else (v - epoch).total_seconds() for v in values.ravel()],
+                        dtype=float).reshape(values.shape)
+
+class DateLocator(Locator):
+    """
+    Define tick locations for time data, where the data coordinates are
+    seconds since the Unix epoch (UTC); see epochSeconds().
+
+    The ticks are on calendar boundaries: whole seconds, minutes, hours,
+    days, days of the month, months or years. The smallest step that gives
+    at most maxTicks ticks over the data range is chosen, and the ticks are
+    computed directly from the start of the range, so the work done only
+    depends on the number of ticks.
+    """
+
+    # Steps in seconds that divide a day evenly, and can be found by
+    # rounding the epoch value
+    _fixedSteps = [0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5,
+                   1, 2, 5, 10, 15, 30,
+                   60, 120, 300, 600, 900, 1800,
+                   3600, 7200, 10800, 21600, 43200,
+                   86400, 172800]
+
+    # Steps that follow the calendar, as (unit, step, approximate seconds)
+    _calendarSteps = [('monthday', 7, 7 * 86400),
+                      ('monthday', 14, 14 * 86400),
+                      ('month', 1, 2629746),
+                      ('month', 2, 2 * 2629746),
+                      ('month', 3, 3 * 2629746),
+                      ('month', 6, 6 * 2629746)]
+
+    _yearSeconds = 31556952
+
+    def __init__(self, maxTicks=7):
+        """
+        **Constructor**
+
+        maxTicks
+            The largest number of ticks to create in the data range.
+        """
+
+        Locator.__init__(self)
+
+        self._maxTicks = 7
+        self.setMaxTicks(maxTicks)
+
+    def setMaxTicks(self, maxTicks):
+        """
+        Set the largest number of ticks. maxTicks must be an int of at
+        least 2.
+        """
+        if isinstance(maxTicks, int) and maxTicks >= 2:
+            self._maxTicks = maxTicks
+
+    def step(self, start, end):
+        """
+        Return the step that is used between start and end, as a 2-tuple of
+        (unit, step). unit is 'second', 'monthday', 'month' or 'year'.
+        """
+
+        span = abs(float(end) - float(start))
+        maxTicks = self._maxTicks
+
+        for step in self._fixedSteps:
+            if span / step <= maxTicks:
+                return ('second', step)
+        for (unit, step, seconds) in self._calendarSteps:
+            if span / seconds <= maxTicks:
+                return (unit, step)
+
+        # Years are stepped by 1, 2 or 5 times a power of 10
+        years = span / self._yearSeconds / maxTicks
+        magnitude = pow(10, math.floor(math.log10(max(years, 1))))
+        for factor in (1, 2, 5, 10):
+            if factor * magnitude >= years:
+                return ('year', int(factor * magnitude))
+
+    def locations(self, start, end, axisType='major'):
+        """
+        Return a list of data coordinates between start and end, on
+        calendar boundaries.
+        """
+
+        start = float(start)
+        end = float(end)
+        if start > end:
+            start, end = end, start
+        if not (np.isfinite(start) and np.isfinite(end)):
+            return []
+
+        (unit, step) = self.step(start, end)
+
+        if unit == 'second':
+            first = math.ceil(start / step)
+            last = math.floor(end / step)
+            return [float(i * step) for i in np.arange(first, last + 1)]
+
+        # Walk the calendar from the first boundary of the step at or before
+        # start: the start of its year, or of its month
+        try:
+            (year, month) = time.gmtime(math.floor(start))[:2]
+        except (ValueError, OverflowError):
+            return []
+        day = 1
+        if unit == 'year':
+            year -= year % step
+            month = 1
+        elif unit == 'month':
+            month -= (month - 1) % step
+
+        locs = []
+        while True:
+            loc = calendar.timegm((year, month, day, 0, 0, 0))
+            if loc > end:
+                break
+            if loc >= start:
+                locs.append(float(loc))
+
+            if unit == 'year':
+                year += step
+            elif unit == 'month':
+                month += step
+            elif unit == 'monthday':
+                # Days 1, 8, 15 and 22, or 1 and 15, of each month
+                day += step
+                if day > 28 - step + 1:
+                    day = 1
+                    month += 1
+            if month > 12:
+                month -= 12
+                year += 1
+
+        return locs
+
+    def setValues(self, **kwargs):
+        """
+        Accepted keywords:
+
+        * maxTicks
+
+        """
+        maxTicks = kwargs.pop('maxTicks', None)
+        self.setMaxTicks(maxTicks)
+
+
 # TODO it doesn't seem like labeler needs to be instantiated. maybe it does when given
 # a list of values to print out, instead of using the locations given to it
 class Labeler(object):
@@ -459,3 +855,82 @@ class NullLabeler(Labeler):
     def labels(self, locations):
         return [''] * len(locations)
 
+class DateLabeler(Labeler):
+    """
+    Labels for time data, where the locations are seconds since the Unix
+    epoch (UTC), such as those of a DateLocator.
+
+    If no format is given, then one is chosen from the spacing of the
+    locations: years, months, days, minutes, seconds or fractions of a
+    second. Minutes and seconds are shown with the date if the locations
+    are on more than one day. The format follows time.strftime().
+
+    Labels are cached, since the same locations are labelled again every
+    time an Axis is drawn.
+    """
+
+    # The largest number of labels to keep
+    _cacheSize = 1000
+
+    def __init__(self, fmt=None):
+        self._fmt = None
+        self._cache = {}
+        self.setFormatter(fmt)
+
+    def setFormatter(self, fmt):
+        if isinstance(fmt, str) or fmt is None:
+            self._fmt = fmt
+
+    def _format(self, locations):
+        """Return the format to use for locations."""
+
+        if self._fmt is not None:
+            return self._fmt
+
+        spacing = 86400.0
+        days = 0
+        if len(locations) > 1:
+            spacing = min(np.diff(sorted(locations)))
+            days = math.floor(max(locations) / 86400) - math.floor(min(locations) / 86400)
+
+        if spacing >= 365 * 86400:
+            return '%Y'
+        elif spacing >= 28 * 86400:
+            return '%b %Y'
+        elif spacing >= 86400:
+            return '%b %d'
+
+        # Times of day also show the date if the locations are on more than
+        # one day
+        date = '%b %d ' if days > 0 else ''
+        if spacing >= 60:
+            return date + '%H:%M'
+        elif spacing >= 1:
+            return date + '%H:%M:%S'
+        return None
+
+    def _label(self, loc, fmt):
+        seconds = math.floor(loc)
+        try:
+            t = time.gmtime(seconds)
+        except (ValueError, OverflowError):
+            return str(loc)
+
+        if fmt is None:
+            # Fractions of a second are shown after the seconds
+            return time.strftime('%H:%M:%S', t) + ('%.3f' % (loc - seconds))[1:]
+        return time.strftime(fmt, t)
+
+    def labels(self, locations):
+        fmt = self._format(locations)
+
+        if len(self._cache) > self._cacheSize:
+            self._cache.clear()
+
+        strings = []
+        for loc in locations:
+            key = (fmt, loc)
+            if key not in self._cache:
+                self._cache[key] = self._label(loc, fmt)
+            strings.append(self._cache[key])
+        return strings
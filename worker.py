@@ -0,0 +1,154 @@
+
+import threading
+import traceback
+
+class PrepareJob(object):
+    """
+    A request to prepare a Figure for drawing.
+
+    A job is created by PrepareWorker.submit(). It is cancelled when a newer
+    job is submitted to the same worker, and the Figure checks for this while
+    it prepares so that stale work is abandoned as early as possible.
+    """
+
+    def __init__(self, figure, commit):
+        """
+        **Constructor**
+
+        figure
+            The Figure to prepare.
+
+        commit
+            A function that is called with this job once the Figure has been
+            prepared. It is called in the worker thread.
+        """
+
+        self._figure = figure
+        self._commit = commit
+        self._cancelled = False
+        self._prepared = None
+
+    def figure(self):
+        """Return the Figure being prepared."""
+        return self._figure
+
+    def cancel(self):
+        """Cancel this job. Work that has not been done yet is skipped."""
+        self._cancelled = True
+
+    def cancelled(self):
+        """Return whether this job has been cancelled."""
+        return self._cancelled
+
+    def prepared(self):
+        """
+        Return the dictionary of prepared data, or None if the Figure has not
+        been prepared yet.
+        """
+        return self._prepared
+
+    def run(self):
+        """
+        Prepare the Figure, and then commit the job if it was not cancelled
+        in the meantime.
+        """
+
+        prepared = self._figure.prepare(self)
+        if prepared is not None and not self.cancelled():
+            self._prepared = prepared
+            self._commit(self)
+
+class PrepareWorker(object):
+    """
+    Runs PrepareJobs one at a time in a background thread.
+
+    Only the most recent request matters, so submitting a job cancels the one
+    that is running and replaces the one that is waiting (if any).
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = None   # the job waiting to be run
+        self._current = None   # the job being run
+        self._thread = None
+        self._stopped = False
+
+    def submit(self, figure, commit):
+        """
+        Create a PrepareJob for figure and queue it to be run, cancelling any
+        older job. Return the new job.
+
+        See PrepareJob for the meaning of commit.
+        """
+
+        job = PrepareJob(figure, commit)
+
+        self._condition.acquire()
+        try:
+            for old in (self._pending, self._current):
+                if old is not None:
+                    old.cancel()
+            self._pending = job
+            self._stopped = False
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run)
+                self._thread.setDaemon(True)
+                self._thread.start()
+
+            self._condition.notify()
+        finally:
+            self._condition.release()
+
+        return job
+
+    def stop(self):
+        """
+        Cancel the job that is running and the one that is waiting, and end
+        the worker thread once the running job returns. Submitting a job
+        afterwards starts a new thread.
+        """
+
+        self._condition.acquire()
+        try:
+            for job in (self._pending, self._current):
+                if job is not None:
+                    job.cancel()
+            self._pending = None
+            self._stopped = True
+            self._condition.notify()
+        finally:
+            self._condition.release()
+
+    def _run(self):
+        """
+        The worker thread's main loop.
+        """
+
+        while True:
+            self._condition.acquire()
+            try:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._pending is None:
+                    self._thread = None
+                    return
+                job = self._pending
+                self._pending = None
+                self._current = job
+            finally:
+                self._condition.release()
+
+            try:
+                job.run()
+            except Exception:
+                # A failed job must not stop the worker; the next draw will
+                # try again from scratch.
+                traceback.print_exc()
+
+            # Do not hold on to the Figure while waiting for the next job
+            job = None
+
+            self._condition.acquire()
+            self._current = None
+            self._condition.release()